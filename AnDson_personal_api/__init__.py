@@ -2,6 +2,13 @@ from .exceptions import *
 from ._funcs import *
 
 from .review import Review
+from .episode import Episode, BingeSession
 from .view import View
 from .anime import Anime
-from .database import Database
\ No newline at end of file
+from .database import Database, Page
+from .snapshot import Snapshot
+from .readonly import ReadOnlyList
+from .changes import ChangeEvent, DeleteCounts, read_change_log
+from .autosave import Autosaver, AutosaveStats
+from .batch import map_databases, FileResult
+from .server import serve, make_server
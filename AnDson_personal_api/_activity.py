@@ -0,0 +1,115 @@
+from __future__ import annotations
+from array import array
+
+
+_GROUP_BYS = (None, "source", "is_new", "tag")
+_GRANULARITIES = ("month", "year")
+_MEASURES = ("views", "times_view")
+
+
+def _bincount(indices, minlength:int, weights=None) -> list:
+    # like numpy.bincount: counts[i] is the number (or the total weight) of i in indices
+    counts = [0] * minlength
+    if weights is None:
+        for index in indices:
+            counts[index] += 1
+    else:
+        for index, weight in zip(indices, weights):
+            counts[index] += weight
+    return counts
+
+
+class _ActivityColumns:
+    # Columnar form of the view info and view record of every view in a database.
+    # important: It's built by one pass over the raw dict, every month-string and date-string is parsed only once.
+    #            A view is active in every month of its duration,
+    #              or in the month of its last_episode_date if the duration is null or empty.
+    def __init__(self, raw_dict:dict) -> None:
+        # one entry per (view, active month)
+        self.entry_views = array("l")
+        self.entry_months = array("l")  # year * 12 + month - 1
+        # one entry per view
+        self.view_times = array("l")  # times_view, null is counted as 0
+        self.view_is_new = []
+        self.view_sources = []
+        self.view_animes = array("l")  # index of the anime in anime_tags
+        # one entry per anime
+        self.anime_tags = []
+
+        for anime_object in raw_dict["animes"]["_anime_objects"].values():
+            anime_index = len(self.anime_tags)
+            self.anime_tags.append(tuple(anime_object["tags"]))
+            for view_object in anime_object["views"]["_view_objects"].values():
+                view_index = len(self.view_times)
+                months = set()
+                if view_object["duration"]:
+                    for month_string in view_object["duration"]:
+                        months.add(int(month_string[0:4]) * 12 + int(month_string[5:7]) - 1)
+                elif view_object["last_episode_date"] is not None:
+                    date_string = view_object["last_episode_date"]
+                    months.add(int(date_string[0:4]) * 12 + int(date_string[5:7]) - 1)
+                for month in months:
+                    self.entry_views.append(view_index)
+                    self.entry_months.append(month)
+
+                self.view_times.append(view_object["times_view"] or 0)
+                self.view_is_new.append(view_object["is_new"])
+                self.view_sources.append(view_object["source"])
+                self.view_animes.append(anime_index)
+
+    def _view_groups(self, group_by:str|None) -> tuple[list, list[tuple[int]]]:
+        # Returns (group values, group codes of each view). A view may belong to several groups when grouping by tag.
+        if group_by is None:
+            return [None], [(0,)] * len(self.view_times)
+        if group_by == "tag":
+            values = {}
+            anime_codes = []
+            for tags in self.anime_tags:
+                tags = tuple(dict.fromkeys(tags)) or (None,)  # repeated tags are counted once
+                anime_codes.append(tuple(values.setdefault(tag, len(values)) for tag in tags))
+            return list(values), [anime_codes[anime_index] for anime_index in self.view_animes]
+        view_values = self.view_sources if group_by == "source" else self.view_is_new
+        values = {}
+        view_codes = [(values.setdefault(value, len(values)),) for value in view_values]
+        return list(values), view_codes
+
+    def timeseries(self, granularity:str, group_by:str|None, measure:str) -> dict:
+        if not self.entry_months:
+            return {}
+        if granularity == "month":
+            entry_views, periods = self.entry_views, self.entry_months
+        else:  # a view active in several months of a year is counted once in the year
+            view_years = sorted({(view_index, month // 12) for view_index, month in zip(self.entry_views, self.entry_months)})
+            entry_views = array("l", (view_index for view_index, _ in view_years))
+            periods = array("l", (year for _, year in view_years))
+        first_period = min(periods)
+        period_count = max(periods) - first_period + 1
+
+        group_values, view_codes = self._view_groups(group_by)
+        indices = array("l")
+        weights = None if measure == "views" else array("l")
+        for view_index, period in zip(entry_views, periods):
+            for code in view_codes[view_index]:
+                indices.append(code * period_count + period - first_period)
+                if weights is not None:
+                    weights.append(self.view_times[view_index])
+        counts = _bincount(indices, len(group_values) * period_count, weights)
+
+        rtn = {}
+        for code, group_value in enumerate(group_values):
+            series = {}
+            for offset in range(period_count):
+                count = counts[code * period_count + offset]
+                if count:
+                    series[_period_string(granularity, first_period + offset)] = count
+            if series:
+                rtn[group_value] = series
+        if group_by is None:
+            return rtn.get(None, {})
+        return rtn
+
+
+def _period_string(granularity:str, period:int) -> str:
+    if granularity == "month":
+        return f"{period // 12:04d}-{period % 12 + 1:02d}"
+    return f"{period:04d}"
@@ -1,34 +1,71 @@
 import re
+import unicodedata
+from datetime import date
 
 
+# month 01-12 and day 01-31 are checked by the patterns, compiled once
+_MONTH_PATTERN = re.compile(r"\d{4}-(?:0[1-9]|1[0-2])")
+_DATE_PATTERN = re.compile(r"\d{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12]\d|3[01])")
+
 def _is_month_string(month_string: str) -> bool:
     # This function will not check whether the argument is string or not
-    pattern = r'^\d{4}-\d{2}$'
-    if re.match(pattern, month_string):
-        month = int(month_string.split("-")[1])
-        if month >= 1 and month <= 12:
-            return True
-        else:
-            return False
-    else:
-        return False
-    
+    return _MONTH_PATTERN.fullmatch(month_string) is not None
+
 def _is_date_string(date_string: str) -> bool:
     # This function will not check whether the argument is string or not
-    pattern = r'^\d{4}-\d{2}-\d{2}$'
-    if re.match(pattern, date_string):
-        string_section = date_string.split("-")
-        month = int(string_section[1])
-        day = int(string_section[2])
-        if month >= 1 and month <= 12:
-            if day >= 1 and day <= 31:
-                return True
-            else:
-                return False
-        else:
-            return False
-    else:
-        return False
-    
+    return _DATE_PATTERN.fullmatch(date_string) is not None
+
 def _is_available_ranking(ranking: int) -> bool:
-    return ranking >= 0 and ranking <= 10
\ No newline at end of file
+    return ranking >= 0 and ranking <= 10
+
+def _date_string_to_day(date_string: str) -> int:
+    # date-string(yyyy-mm-dd) -> day number(proleptic Gregorian ordinal)
+    # raises ValueError if the string is not a real date, e.g. "2024-02-30"
+    return date.fromisoformat(date_string).toordinal()
+
+def _day_to_date_string(day: int) -> str:
+    return date.fromordinal(day).isoformat()
+
+
+_NAME_NORMALIZATIONS = ("nfkc", "casefold", "kana", "whitespace", "punctuation")
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}  # ァ-ヶ -> ぁ-ゖ
+
+def _normalize_name(name: str, normalization: tuple[str]) -> str:
+    # The key of a title/alias in the normalized name catalog. The steps in `normalization` are always done in this order:
+    #   "nfkc": full-width/half-width forms -> the normal forms, "casefold": case-insensitive, "kana": katakana -> hiragana,
+    #   "whitespace": remove spaces, "punctuation": remove punctuation marks
+    if "nfkc" in normalization:
+        name = unicodedata.normalize("NFKC", name)
+    if "casefold" in normalization:
+        name = name.casefold()
+    if "kana" in normalization:
+        name = name.translate(_KATAKANA_TO_HIRAGANA)
+    remove_whitespace = "whitespace" in normalization
+    remove_punctuation = "punctuation" in normalization
+    if remove_whitespace or remove_punctuation:
+        name = "".join(char for char in name
+                       if not (remove_whitespace and char.isspace())
+                       and not (remove_punctuation and unicodedata.category(char).startswith("P")))
+    return name
+
+
+def _select_ids(targets, node_objects:dict, get_id_by_name, wrapper_class:type, database, parent_path:tuple, wrap, err_msg:str) -> list:
+    # ids of the nodes chosen by the argument of database.delete_animes, anime.delete_views and view.delete_reviews:
+    #   a function(wrapper) -> bool, or an iterable of wrappers and names. Nodes which not exist are skipped.
+    if callable(targets):
+        return [node_id for node_id in list(node_objects) if targets(wrap(node_id))]
+    if isinstance(targets, str) or not hasattr(targets, "__iter__"):
+        raise TypeError(err_msg)
+    node_ids = {}  # keeps the order and drops the repeated ones
+    for target in targets:
+        if isinstance(target, str):
+            node_id = get_id_by_name(target)
+        elif isinstance(target, wrapper_class):
+            if target._database is not database or target._path[:-1] != parent_path:
+                continue  # a node of another database/anime/view
+            node_id = target._path[-1]
+        else:
+            raise TypeError(err_msg)
+        if node_id is not None and node_id in node_objects:
+            node_ids[node_id] = None
+    return list(node_ids)
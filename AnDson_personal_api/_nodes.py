@@ -0,0 +1,201 @@
+from __future__ import annotations
+import sys
+
+from .readonly import ReadOnlyList
+
+
+def _intern(value):
+    # values like source, item, tags and month-strings repeat in a lot of nodes, keep one copy of each
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+def _intern_list(values:list|None) -> list|None:
+    if not isinstance(values, (list, tuple, ReadOnlyList)):  # None, or a broken value left for the validator
+        return values
+    try:
+        return list(map(sys.intern, values))
+    except TypeError:  # a broken item left for the validator
+        return [_intern(value) for value in values]
+
+
+class _EpisodeRange(list):
+    # The episode_range of a view/review: a list which keeps {episode name: count} next to its items,
+    #   so `name in episode_range` is O(1) instead of a scan of the list.
+    # important: Every method changing the list keeps the counts, a copy(deepcopy, pickle) is an _EpisodeRange too.
+    __slots__ = ("_counts",)
+
+    def __init__(self, values=()) -> None:
+        super().__init__(values)
+        self._count_items()
+
+    def _count_items(self) -> None:
+        self._counts = dict.fromkeys(self, 1)  # hint: Items are almost never repeated, it's the fast path.
+        if len(self._counts) != len(self):
+            self._counts = {}
+            for value in self:
+                self._counts[value] = self._counts.get(value, 0) + 1
+
+    def __contains__(self, value) -> bool:
+        try:
+            return value in self._counts
+        except TypeError:  # unhashable value can't be an episode name
+            return False
+
+    def __reduce__(self):
+        return (_EpisodeRange, (list(self),))
+
+    def append(self, value) -> None:
+        super().append(value)
+        self._counts[value] = self._counts.get(value, 0) + 1
+
+    def remove(self, value) -> None:
+        super().remove(value)
+        self._counts[value] -= 1
+        if self._counts[value] == 0:
+            del self._counts[value]
+
+    # rarely used, the counts are rebuilt
+    def extend(self, values) -> None:
+        super().extend(values)
+        self._count_items()
+
+    def insert(self, index, value) -> None:
+        super().insert(index, value)
+        self._count_items()
+
+    def pop(self, index=-1):
+        value = super().pop(index)
+        self._count_items()
+        return value
+
+    def clear(self) -> None:
+        super().clear()
+        self._counts = {}
+
+    def __setitem__(self, index, value) -> None:
+        super().__setitem__(index, value)
+        self._count_items()
+
+    def __delitem__(self, index) -> None:
+        super().__delitem__(index)
+        self._count_items()
+
+    def __iadd__(self, values):
+        super().__iadd__(values)
+        self._count_items()
+        return self
+
+    def __imul__(self, times):
+        super().__imul__(times)
+        self._count_items()
+        return self
+
+def _episode_range(values:list|None) -> _EpisodeRange|None:
+    if not isinstance(values, (list, tuple, ReadOnlyList)):  # None(all episodes), or a broken value left for the validator
+        return values
+    return _EpisodeRange(_intern_list(values))
+
+
+class _Node:
+    # A compact record used instead of a dict for the nodes which are numerous in a database.
+    # important: It supports the part of the dict interface used on raw dict nodes (node["field"], node["field"] = value,
+    #              "field" in node, get, keys, items), so code reading the raw dict doesn't care about it.
+    #            Values are stored in __slots__, so the field names are not repeated in every node.
+    #            The wrappers(View, Review, Episode) read the fields as attributes(node.title), it's several times faster
+    #              than node["title"]. Changes still go through node["field"] = value, see _extras.
+    # hint: _extras is None, except for a node loaded from a file with missing or unknown fields:
+    #         (names of the missing fields, {unknown field: value}).
+    #       A missing field holds None: it's not "in" the node and not saved until it's set.
+    #       Unknown fields (e.g. written by a newer api) are kept so nothing is lost when saving.
+    __slots__ = ("_extras",)
+    _CLASS = None  # the "_class" value in the AnDson file
+    _FIELDS = ()
+    _FIELD_SET = frozenset()
+    _JSON_KEYS = frozenset({"_class"})
+
+    def __init__(self, **fields) -> None:
+        for field in self._FIELDS:
+            setattr(self, field, fields[field])
+        self._extras = None
+
+    def __getitem__(self, key:str):
+        if key in self._FIELD_SET:
+            return getattr(self, key)
+        if key == "_class":
+            return self._CLASS
+        if self._extras is not None and key in self._extras[1]:
+            return self._extras[1][key]
+        raise KeyError(key)
+
+    def __setitem__(self, key:str, value) -> None:
+        if key not in self._FIELD_SET:
+            raise KeyError(key)
+        setattr(self, key, value)
+        if self._extras is not None and key in self._extras[0]:
+            self._extras = (self._extras[0] - {key}, self._extras[1])
+
+    def __contains__(self, key:str) -> bool:
+        if key in self._FIELD_SET:
+            return self._extras is None or key not in self._extras[0]
+        if key == "_class":
+            return True
+        return self._extras is not None and key in self._extras[1]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def get(self, key:str, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def keys(self) -> tuple[str]:
+        if self._extras is None:
+            return ("_class",) + self._FIELDS
+        missing, unknown = self._extras
+        return ("_class",) + tuple(field for field in self._FIELDS if field not in missing) + tuple(unknown)
+
+    def values(self) -> tuple:
+        return tuple(self[key] for key in self.keys())
+
+    def items(self) -> tuple[tuple]:
+        return tuple((key, self[key]) for key in self.keys())
+
+    def _to_json(self) -> dict:
+        return dict(self.items())
+
+    @classmethod
+    def _from_json(cls, json_object:dict) -> _Node:
+        # hint: It's called for every node when a file is loaded, so __init__ and its keyword arguments are skipped.
+        node = cls.__new__(cls)
+        for field, value in zip(cls._FIELDS, map(json_object.get, cls._FIELDS)):
+            setattr(node, field, value)
+        node._extras = None
+        if len(json_object) != len(cls._FIELDS) + 1 or not json_object.keys() <= cls._JSON_KEYS:
+            node._extras = (cls._FIELD_SET - json_object.keys(),
+                            {key: value for key, value in json_object.items() if key not in cls._JSON_KEYS})
+        return node
+
+
+class _ViewNode(_Node):
+    __slots__ = _FIELDS = ("title", "is_new", "times_view", "source", "episode_range", "duration", "last_episode_date",
+                           "reviews", "detailed_view_record")
+    _FIELD_SET = frozenset(_FIELDS)
+    _JSON_KEYS = _FIELD_SET | {"_class"}
+    _CLASS = "View"
+
+class _ReviewNode(_Node):
+    __slots__ = _FIELDS = ("title", "item", "episode_range", "ranking", "comment")
+    _FIELD_SET = frozenset(_FIELDS)
+    _JSON_KEYS = _FIELD_SET | {"_class"}
+    _CLASS = "Review"
+
+class _EpisodeNode(_Node):
+    __slots__ = _FIELDS = ("name", "type", "length")
+    _FIELD_SET = frozenset(_FIELDS)
+    _JSON_KEYS = _FIELD_SET | {"_class"}
+    _CLASS = "Episode"
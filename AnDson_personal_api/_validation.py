@@ -0,0 +1,250 @@
+from __future__ import annotations
+from collections.abc import Mapping
+from datetime import date
+from typing import Callable, NamedTuple, Optional
+
+from .exceptions import StringFormatError, NotAvailableRankingError
+from ._funcs import _is_month_string, _is_date_string, _is_available_ranking
+from ._nodes import _ViewNode, _ReviewNode, _EpisodeNode
+from .readonly import ReadOnlyList
+
+
+class _Rule(NamedTuple):
+    # the rule of a field, shared by the mutators(arguments) and the whole-document validator(stored values)
+    value_type: type                  # type of the value, or of the items if `sequence`
+    noun: str                         # for the messages, e.g. "string", "month-string(format: yyyy-mm)"
+    nullable: bool = False
+    sequence: bool = False            # a tuple(arguments) or a list(stored values) of value_type
+    check: Optional[Callable] = None  # format check after the type check, fails with `error`
+    error: type = StringFormatError
+    wording: Optional[str] = None       # message of a wrong argument after the name, if it's not the generated one
+    item_wording: Optional[str] = None  # the same for a wrong item of a sequence field
+
+
+_RULES = {
+    "Anime": {
+        "title": _Rule(str, "string"),
+        "aliases": _Rule(str, "string", sequence=True, wording="must be a tuple of strings"),
+        "tags": _Rule(str, "string", sequence=True, wording="must be a tuple of strings")},
+    "View": {
+        "title": _Rule(str, "string"),
+        "is_new": _Rule(bool, "boolean", nullable=True),
+        "times_view": _Rule(int, "integer", nullable=True),
+        "source": _Rule(str, "string", nullable=True),
+        "episode_range": _Rule(str, "string", nullable=True, sequence=True),
+        "duration": _Rule(str, "month-string(format: yyyy-mm)", nullable=True, sequence=True, check=_is_month_string,
+                          item_wording="must be a tuple of month-string(format: yyyy-mm) or None"),
+        "last_episode_date": _Rule(str, "date-string(format: yyyy-mm-dd)", nullable=True, check=_is_date_string)},
+    "Review": {
+        "title": _Rule(str, "string"),
+        "item": _Rule(str, "string", nullable=True),
+        "episode_range": _Rule(str, "string", nullable=True, sequence=True, wording="must be a tuple of strings"),
+        "ranking": _Rule(int, "integer between 0 and 10", nullable=True, check=_is_available_ranking, error=NotAvailableRankingError,
+                         wording="must be a integer between 0 and 10"),
+        "comment": _Rule(str, "string", nullable=True, wording="must be a string")},
+    "Episode": {
+        "name": _Rule(str, "string"),
+        "type": _Rule(str, "string", nullable=True),
+        "minutes": _Rule(int, "integer", nullable=True),
+        "is_precise": _Rule(bool, "boolean")},
+}
+
+
+def _compile_rule(rule:_Rule, sequence_type:type|None) -> Callable[[object], Optional[type]]:
+    # Returns a function which returns None if the value follows the rule, otherwise the exception class to raise.
+    # sequence_type is tuple for arguments and list for stored values, None checks a single item of a sequence field.
+    value_type, check, error, nullable = rule.value_type, rule.check, rule.error, rule.nullable
+    # a ReadOnlyList of the database(e.g. anime.tags) can be given where a tuple is
+    accepted_types = (tuple, ReadOnlyList) if sequence_type is tuple else sequence_type
+    if rule.sequence and sequence_type is not None:
+        def validate(value):
+            if value is None:
+                return None if nullable else TypeError
+            if not isinstance(value, accepted_types):
+                return TypeError
+            for item in value:
+                if not isinstance(item, value_type):
+                    return TypeError
+                if check is not None and not check(item):
+                    return error
+            return None
+    else:
+        nullable = nullable and (sequence_type is not None)  # an item of a sequence is never None
+        def validate(value):
+            if value is None:
+                return None if nullable else TypeError
+            if not isinstance(value, value_type):
+                return TypeError
+            if check is not None and not check(value):
+                return error
+            return None
+    return validate
+
+def _message(rule:_Rule, name:str, sequence_type:type|None) -> str:
+    # hint: The wordings keep the messages the mutators raised before the rules table, e.g. "a integer".
+    if sequence_type is tuple and rule.wording is not None:
+        return f"{name} {rule.wording}."
+    if sequence_type is None and rule.item_wording is not None:
+        return f"{name} {rule.item_wording}."
+    if rule.sequence and sequence_type is not None:
+        message = f"{name} must be a {sequence_type.__name__} of {rule.noun}"
+    else:
+        message = f"{name} must be a {rule.noun}"
+    if rule.nullable and sequence_type is not None:
+        message += " or None"
+    return message + "."
+
+
+# compiled once when the module is imported, {(kind, field): validate function}
+_ARGUMENT_CHECKS = {(kind, field): _compile_rule(rule, tuple) for kind, rules in _RULES.items() for field, rule in rules.items()}
+_ITEM_CHECKS = {(kind, field): _compile_rule(rule, None) for kind, rules in _RULES.items() for field, rule in rules.items() if rule.sequence}
+_STORED_CHECKS = {(kind, field): _compile_rule(rule, list) for kind, rules in _RULES.items() for field, rule in rules.items()}
+
+
+# {(kind, field): (value_type, nullable, check, compiled check)}, value_type is None for sequences(no fast path)
+_ARGUMENT_RULES = {(kind, field): (None if rule.sequence else rule.value_type, rule.nullable, rule.check, _ARGUMENT_CHECKS[kind, field])
+                   for kind, rules in _RULES.items() for field, rule in rules.items()}
+
+
+def _validate(kind:str, field:str, value) -> None:
+    # checks an argument of a mutator, e.g. _validate("View", "duration", new_value)
+    # hint: A valid scalar is accepted here without calling the compiled check, it's the common case of the setters.
+    value_type, nullable, check, compiled_check = _ARGUMENT_RULES[kind, field]
+    if value_type is not None:
+        if value is None:
+            if nullable:
+                return None
+        elif isinstance(value, value_type) and (check is None or check(value)):
+            return None
+    error = compiled_check(value)
+    if error is not None:
+        raise error(_message(_RULES[kind][field], field, tuple))
+
+def _validate_item(kind:str, field:str, value, name:str) -> None:
+    # checks a new item of a sequence field, e.g. _validate_item("View", "duration", new_month, "new_month")
+    error = _ITEM_CHECKS[kind, field](value)
+    if error is not None:
+        raise error(_message(_RULES[kind][field], name, None))
+
+
+# whole-document validation
+_MAX_DAY = date.max.toordinal()
+
+
+class _Violations:
+    # collects "node path: message" of every violation
+    def __init__(self) -> None:
+        self.errors = []
+
+    def add(self, path:str, message:str) -> None:
+        self.errors.append(f"{path}: {message}")
+
+    def check_fields(self, path:str, kind:str, node) -> None:
+        # the fields of the rules table, and the fields the api doesn't know(kept by the node, see _Node._from_json)
+        for field in node.keys() - _RULES[kind].keys() - _CONTAINER_FIELDS[kind] - {"_class"}:
+            self.add(path, f"unknown field '{field}'.")
+        for field, rule in _RULES[kind].items():
+            if kind == "Episode" and field in ("minutes", "is_precise"):
+                continue  # stored in "length"
+            if field not in node:
+                self.add(path, f"missing field '{field}'.")
+            elif _STORED_CHECKS[kind, field](node[field]) is not None:
+                self.add(f"{path}/{field}", _message(rule, field, list))
+
+    def check_container(self, path:str, container, objects_key:str, last_id_key:str) -> Mapping:
+        # {"_last_xxx_id": integer, "_xxx_objects": {id: node}}, returns the objects, or {} if the container is broken
+        if not isinstance(container, dict) or not isinstance(container.get(objects_key), Mapping) \
+                or not isinstance(container.get(last_id_key), int):
+            self.add(path, f"must be {{'{last_id_key}': integer, '{objects_key}': {{id: object}}}}.")
+            return {}
+        last_id = container[last_id_key]
+        for node_id in container[objects_key]:
+            if not isinstance(node_id, int) or node_id <= 0:
+                self.add(f"{path}/{node_id}", "id must be a positive integer.")
+            elif node_id > last_id:
+                self.add(f"{path}/{node_id}", f"id is greater than {last_id_key}({last_id}).")
+        return container[objects_key]
+
+    def check_unique(self, names:dict, name, path:str, what:str) -> None:
+        # names: {name: path of the node which has it}
+        if not isinstance(name, str):
+            return None
+        if name in names:
+            self.add(path, f"{what} '{name}' is the same as {names[name]}.")
+        else:
+            names[name] = path
+
+
+_CONTAINER_FIELDS = {"Anime": {"views", "episodes"}, "View": {"reviews", "detailed_view_record"}, "Review": set(), "Episode": {"length"}}
+
+
+def _find_violations(raw_dict:dict) -> list[str]:
+    """
+    Check the whole raw dict in one pass, returns "node path: message" of every violation(empty if it's valid).
+    """
+    violations = _Violations()
+    anime_objects = violations.check_container("animes", raw_dict.get("animes"), "_anime_objects", "_last_anime_id")
+    anime_names = {}
+    for anime_id, anime in anime_objects.items():
+        path = f"animes/{anime_id}"
+        if not isinstance(anime, dict) or anime.get("_class") != "Anime":
+            violations.add(path, "must be an Anime-object.")
+            continue
+        violations.check_fields(path, "Anime", anime)
+        violations.check_unique(anime_names, anime.get("title"), f"{path}/title", "title")
+        for alias_index, alias in enumerate(anime.get("aliases") or ()):
+            violations.check_unique(anime_names, alias, f"{path}/aliases/{alias_index}", "alias")
+
+        episode_objects = violations.check_container(f"{path}/episodes", anime.get("episodes"), "_episode_objects", "_last_episode_id")
+        episode_names = {}
+        for episode_id, episode in episode_objects.items():
+            episode_path = f"{path}/episodes/{episode_id}"
+            if not isinstance(episode, _EpisodeNode):
+                violations.add(episode_path, "must be an Episode-object.")
+                continue
+            violations.check_fields(episode_path, "Episode", episode)
+            violations.check_unique(episode_names, episode.get("name"), f"{episode_path}/name", "episode name")
+            length = episode.get("length")
+            if length is not None and (not isinstance(length, dict) or length.keys() != {"is_precise", "minutes"}
+                                       or _STORED_CHECKS["Episode", "minutes"](length["minutes"]) is not None
+                                       or _STORED_CHECKS["Episode", "is_precise"](length["is_precise"]) is not None):
+                violations.add(f"{episode_path}/length", "length must be {'is_precise': boolean, 'minutes': integer} or None.")
+
+        view_objects = violations.check_container(f"{path}/views", anime.get("views"), "_view_objects", "_last_view_id")
+        view_titles = {}
+        for view_id, view in view_objects.items():
+            view_path = f"{path}/views/{view_id}"
+            if not isinstance(view, _ViewNode):
+                violations.add(view_path, "must be a View-object.")
+                continue
+            violations.check_fields(view_path, "View", view)
+            violations.check_unique(view_titles, view.get("title"), f"{view_path}/title", "view title")
+            _check_watch_record(violations, f"{view_path}/detailed_view_record", view.get("detailed_view_record"), episode_objects)
+
+            review_objects = violations.check_container(f"{view_path}/reviews", view.get("reviews"), "_review_objects", "_last_review_id")
+            review_titles = {}
+            for review_id, review in review_objects.items():
+                review_path = f"{view_path}/reviews/{review_id}"
+                if not isinstance(review, _ReviewNode):
+                    violations.add(review_path, "must be a Review-object.")
+                    continue
+                violations.check_fields(review_path, "Review", review)
+                violations.check_unique(review_titles, review.get("title"), f"{review_path}/title", "review title")
+    return violations.errors
+
+def _check_watch_record(violations:_Violations, path:str, watch_record, episode_objects:dict) -> None:
+    from .episode import _WatchRecord  # episode.py is imported after this module
+
+    if not isinstance(watch_record, _WatchRecord):
+        violations.add(path, 'must be {"_class": "Detailed View Record", "episodes": [episode-id], "days": [day-number]}.')
+        return None
+    if len(watch_record.episode_ids) != len(watch_record.days):
+        violations.add(path, "episodes and days must have the same length.")
+    if len(set(watch_record.episode_ids)) != len(watch_record.episode_ids):
+        violations.add(path, "an episode is recorded more than once.")
+    for episode_id in watch_record.episode_ids:
+        if episode_id not in episode_objects:
+            violations.add(path, f"episode {episode_id} not exists in the anime.")
+    for day in watch_record.days:
+        if not 1 <= day <= _MAX_DAY:
+            violations.add(path, f"day {day} is not a day number of a date.")
@@ -1,9 +1,15 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING, Optional
 
-from .exceptions import AnimeRemovedError, RepeatedAnimeTitleError, RepeatedViewTitleError, StringFormatError
-from ._funcs import _is_month_string, _is_date_string
+from .exceptions import AnimeRemovedError, RepeatedAnimeTitleError, RepeatedViewTitleError, RepeatedEpisodeNameError
+from ._validation import _validate, _validate_item
 from .view import View
+from .episode import Episode, _WatchRecord
+from .similarity import _SimilarityIndex
+from ._nodes import _ViewNode, _EpisodeNode, _intern, _intern_list, _episode_range
+from ._funcs import _select_ids
+from .readonly import ReadOnlyList
+from .changes import ChangeEvent, DeleteCounts, _total
 
 if TYPE_CHECKING:
     from .database import Database
@@ -17,6 +23,10 @@ class Anime:
     #            Therefore, an Anime instance will exist even though it has been removed in the database.
     #            It's important to return an error message when somebody uses method of Anime instance but the
     #              data is actually removed in the database.
+    # important: The anime data is looked up from the database on every access instead of being kept in the instance,
+    #              because a writer replaces it with a copy when a snapshot of the database shares it.
+    __slots__ = ("_database", "_id", "_loaded_view_title_catalog", "_loaded_episode_name_catalog", "_node", "_node_generation")
+
     def __init__(self, database:Database, anime_id:int) -> None:
         """
         warning: Please create or get an Anime instance with database.create_anime or database.get_anime or database.get_all_animes\n
@@ -25,9 +35,51 @@ class Anime:
         self._database = database
         self._id = anime_id
 
-        self._anime_data = self._database._raw_dict["animes"]["_anime_objects"][anime_id]
-        self._view_title_catalog = {self._anime_data["views"]["_view_objects"][view_id]["title"]: view_id for view_id in self._anime_data["views"]["_view_objects"]}
+        # catalogs are built on the first access, so creating an Anime instance is O(1). see _view_title_catalog
+        self._loaded_view_title_catalog = None
+        self._loaded_episode_name_catalog = None
+
+        # the anime object is cached, see _anime_data
+        self._node = None
+        self._node_generation = -1
+
+
+    @property
+    def _anime_data(self) -> dict:
+        # hint: The anime object is looked up again only when the database replaced it(see database._anime_generations).
+        generation = self._database._anime_generations.get(self._id, 0)
+        if generation != self._node_generation:
+            self._node = self._database._raw_dict["animes"]["_anime_objects"][self._id]
+            self._node_generation = generation
+        return self._node
 
+    @property
+    def _view_title_catalog(self) -> dict:
+        # {view-title: view-id}
+        if self._loaded_view_title_catalog is None:
+            view_objects = self._anime_data["views"]["_view_objects"]
+            self._loaded_view_title_catalog = {view_objects[view_id]["title"]: view_id for view_id in view_objects}
+        return self._loaded_view_title_catalog
+
+    @_view_title_catalog.setter
+    def _view_title_catalog(self, new_catalog:dict) -> None:
+        self._loaded_view_title_catalog = new_catalog
+
+    @property
+    def _episode_name_catalog(self) -> dict:
+        # {episode-name: episode-id}
+        if self._loaded_episode_name_catalog is None:
+            episode_objects = self._anime_data["episodes"]["_episode_objects"]
+            self._loaded_episode_name_catalog = {episode_objects[episode_id]["name"]: episode_id for episode_id in episode_objects}
+        return self._loaded_episode_name_catalog
+
+    @_episode_name_catalog.setter
+    def _episode_name_catalog(self, new_catalog:dict) -> None:
+        self._loaded_episode_name_catalog = new_catalog
+
+    @property
+    def _path(self) -> tuple[int]:  # see ChangeEvent
+        return (self._id,)
 
     def _checking_existence(self) -> None:
         if self._id not in self._database._raw_dict["animes"]["_anime_objects"]:
@@ -53,8 +105,7 @@ class Anime:
     @title.setter
     def title(self, new_title:str):
         self._checking_existence()
-        if not isinstance(new_title, str):
-            raise TypeError("title must be a string")
+        _validate("Anime", "title", new_title)
         
         old_title = self.title
         if old_title == new_title:  # if the new title is same as the old one, do nothing.
@@ -63,24 +114,28 @@ class Anime:
             err_msg = f"Anime title and Alases should be unique, the new title '{new_title}' has existed in the database."
             raise RepeatedAnimeTitleError(err_msg)
         
-        self._anime_data["title"] = new_title
-        self._database.anime_name_catalog.pop(old_title)
-        self._database.anime_name_catalog[new_title] = self._id
+        with self._database._mutating(self._id, ChangeEvent("set", "Anime", self._path, "title", old_title, new_title)):
+            self._anime_data["title"] = new_title
+            self._database._unregister_names(self._id, (old_title,))
+            self._database._register_names(self._id, (new_title,))
+            self._database._page_keys_changed("title")
 
 
     @property
-    def aliases(self) -> tuple[str]:
+    def aliases(self) -> ReadOnlyList:
+        """
+        A read-only view of the aliases, `alias in anime.aliases` is O(1). Use anime.aliases.to_tuple() for a copy.
+        """
         self._checking_existence()
-        return tuple(self._anime_data["aliases"])
+        return ReadOnlyList(self._anime_data["aliases"], self._has_alias)
+
+    def _has_alias(self, name:str) -> bool:
+        return self._database.anime_name_catalog.get(name) == self._id and name != self._anime_data["title"]
     
     @aliases.setter
     def aliases(self, new_aliases:tuple[str]):
         self._checking_existence()
-        if not isinstance(new_aliases, tuple):
-            raise TypeError("aliases must be a tuple of strings")
-        for new_alias in new_aliases:
-            if not isinstance(new_alias, str):
-                raise TypeError("aliases must be a tuple of strings")
+        _validate("Anime", "aliases", new_aliases)
         
         old_aliases = self._anime_data["aliases"]
         new_aliases = set(new_aliases) # aliases can't repeated
@@ -94,11 +149,11 @@ class Anime:
                 err_msg = f"Anime title and Alases should be unique, the alias '{new_alias}' has existed in the database."
                 raise RepeatedAnimeTitleError(err_msg)
         
-        self._anime_data["aliases"] = list(new_aliases)
-        for old_alias in old_aliases:
-            self._database.anime_name_catalog.pop(old_alias)
-        for new_alias in new_aliases:
-            self._database.anime_name_catalog[new_alias] = self._id
+        event = ChangeEvent("set", "Anime", self._path, "aliases", old_aliases, list(new_aliases))
+        with self._database._mutating(self._id, event):
+            self._anime_data["aliases"] = event.new
+            self._database._unregister_names(self._id, old_aliases)
+            self._database._register_names(self._id, event.new)
 
     def add_alias(self, new_alias:str):
         """
@@ -106,16 +161,16 @@ class Anime:
         if the alias has exist in anime.aliases, it will do nothing.
         """
         self._checking_existence()
-        if not isinstance(new_alias, str):
-            raise TypeError("alias must be a string")
+        _validate_item("Anime", "aliases", new_alias, "alias")
         if new_alias in self._database.anime_name_catalog:
             if new_alias in self._anime_data["aliases"]:  # if the alias is in the old aliases set, skip it.
                 return None
             err_msg = f"Anime title and Alases should be unique, the new alias '{new_alias}' has existed in the database."
             raise RepeatedAnimeTitleError(err_msg)
         
-        self._anime_data["aliases"].append(new_alias)
-        self._database.anime_name_catalog[new_alias] = self._id
+        with self._database._mutating(self._id, ChangeEvent("add", "Anime", self._path, "aliases", new=new_alias)):
+            self._anime_data["aliases"].append(new_alias)
+            self._database._register_names(self._id, (new_alias,))
 
     def remove_alias(self, alias:str):
         """
@@ -124,24 +179,32 @@ class Anime:
         wrong datatype of the argument will not raise any exception but be viewed as it not exists in anime.aliases.
         """
         self._checking_existence()
-        self._anime_data["aliases"].remove(alias)
-        self._database.anime_name_catalog.pop(alias)
+        with self._database._mutating(self._id, ChangeEvent("remove", "Anime", self._path, "aliases", old=alias)):
+            self._anime_data["aliases"].remove(alias)
+            self._database._unregister_names(self._id, (alias,))
 
 
     @property
-    def tags(self):
+    def tags(self) -> ReadOnlyList:
+        """
+        A read-only view of the tags, `tag in anime.tags` is O(1). Use anime.tags.to_tuple() for a copy.
+        """
         self._checking_existence()
-        return tuple(self._anime_data["tags"])
+        return ReadOnlyList(self._anime_data["tags"], self._has_tag)
+
+    def _has_tag(self, tag:str) -> bool:
+        return self._database._has_tag(self._id, tag)
     
     @tags.setter
     def tags(self, new_tags):
-        self._checking_existence
-        if not isinstance(new_tags, tuple):
-            raise TypeError("tags must be a tuple of strings")
-        for tag in new_tags:
-            if not isinstance(tag, str):
-                raise TypeError("tags must be a tuple of strings")
-        self._anime_data["tags"] = list(new_tags)
+        self._checking_existence()
+        _validate("Anime", "tags", new_tags)
+        event = ChangeEvent("set", "Anime", self._path, "tags", self._anime_data["tags"], _intern_list(new_tags))
+        with self._database._mutating(self._id, event):
+            self._database._unregister_tags(self._id, self._anime_data["tags"])
+            self._anime_data["tags"] = event.new
+            self._database._register_tags(self._id, self._anime_data["tags"])
+            self._database._activity_changed()
 
     def add_tag(self, new_tag:str):
         """
@@ -149,11 +212,13 @@ class Anime:
         if the tag has existed in anime.tags, it will do nothing.
         """
         self._checking_existence()
-        if not isinstance(new_tag, str):
-                raise TypeError("tag must be a string")
-        if new_tag in self._anime_data["tags"]:
+        _validate_item("Anime", "tags", new_tag, "tag")
+        if self._has_tag(new_tag):
             return None
-        self._anime_data["tags"].append(new_tag)
+        with self._database._mutating(self._id, ChangeEvent("add", "Anime", self._path, "tags", new=new_tag)):
+            self._anime_data["tags"].append(_intern(new_tag))
+            self._database._register_tags(self._id, (new_tag,))
+            self._database._activity_changed()
 
     def remove_tag(self, tag:str):
         """
@@ -162,7 +227,10 @@ class Anime:
         wrong datatype of the argument will not raise any exception but be viewed as it not exists in anime.tags.
         """
         self._checking_existence()
-        self._anime_data["tags"].remove(tag)
+        with self._database._mutating(self._id, ChangeEvent("remove", "Anime", self._path, "tags", old=tag)):
+            self._anime_data["tags"].remove(tag)
+            self._database._unregister_tags(self._id, (tag,))
+            self._database._activity_changed()
 
 
     @property
@@ -194,63 +262,46 @@ class Anime:
         self._checking_existence()
         
         # Checking datatype of args
-        if not isinstance(title, str):
-            raise TypeError("title must be a string.")
-        if is_new is not None:
-            if not isinstance(is_new, bool):
-                raise TypeError("is_new must be a boolean or None.")
-        if times_view is not None: 
-            if not isinstance(times_view, int):
-                raise TypeError("times_view must be a integer or None.")
-        if source is not None:
-            if not isinstance(source, str):
-                raise TypeError("source must be a string or None.")
+        _validate("View", "title", title)
+        _validate("View", "is_new", is_new)
+        _validate("View", "times_view", times_view)
+        _validate("View", "source", source)
+        _validate("View", "episode_range", episode_range)
+        _validate("View", "duration", duration)
+        _validate("View", "last_episode_date", last_episode_date)
         if episode_range is not None:
-            if not isinstance(episode_range, tuple):
-                raise TypeError("episode_range must be a tuple of string or None.")
-            for episode in episode_range:
-                if not isinstance(episode, str):
-                    raise TypeError("episode_range must be a tuple of string or None.")
             episode_range = list(episode_range)
         if duration is not None:
-            if not isinstance(duration, tuple):
-                raise TypeError("duration must be a tuple of month-string(format: yyyy-mm) or None.")
-            for month in duration:
-                if not isinstance(month, str):
-                    raise TypeError("duration must be a tuple of month-string(format: yyyy-mm) or None.")
-                if not _is_month_string(month):
-                    raise StringFormatError("duration must be a tuple of month-string(format: yyyy-mm) or None.")
             duration = list(duration)
-        if last_episode_date is not None:
-            if not isinstance(last_episode_date, str):
-                raise TypeError("last_episode_date must be a date-string(format: yyyy-mm-dd) or None.")
-            if not _is_date_string(last_episode_date):
-                raise StringFormatError("last_episode_date must be a date-string(format: yyyy-mm-dd) or None.")
-            
+
         # Checking whether the title has existed
         if title in self._view_title_catalog:
             err_msg = f"View title should be unique under the anime, the title '{title}' has existed in the views of the anime."
             raise RepeatedViewTitleError(err_msg)
         
         # Adding view object into the database
-        new_view_object = {
-            "_class": "View",
-            "title": title,
+        new_view_object = _ViewNode(
+            title=title,
             # view info
-            "is_new": is_new,
-            "times_view": times_view,
-            "source": source,
+            is_new=is_new,
+            times_view=times_view,
+            source=_intern(source),
             # view record
-            "episode_range": episode_range,
-            "duration": duration,
-            "last_episode_date": last_episode_date,
+            episode_range=_episode_range(episode_range),
+            duration=_intern_list(duration),
+            last_episode_date=_intern(last_episode_date),
             # review
-            "reviews": {"_last_review_id": 0,
-                        "_review_objects":{}},
-            }
-        self._last_view_id += 1
-        self._anime_data["views"]["_view_objects"][self._last_view_id] = new_view_object
-        self._view_title_catalog[title] = self._last_view_id
+            reviews={"_last_review_id": 0,
+                     "_review_objects":{}},
+            # detailed view record
+            detailed_view_record=_WatchRecord(),
+            )
+        event = ChangeEvent("create", "View", (self._id, self._last_view_id + 1), new=new_view_object)
+        with self._database._mutating(self._id, event):
+            self._last_view_id += 1
+            self._anime_data["views"]["_view_objects"][self._last_view_id] = new_view_object
+            self._view_title_catalog[title] = self._last_view_id
+            self._database._activity_changed()
 
         #return View object
         return View(self._database, self, self._last_view_id)
@@ -272,16 +323,155 @@ class Anime:
         Get a tuple of all views under the anime.
         """
         self._checking_existence()
-        rtn = tuple(View(self._database, self, view_id) for view_id in self._anime_data["views"]["_view_objects"])
+        rtn = tuple(self.iter_views())
         return rtn
+
+    def iter_views(self):
+        """
+        Yields the views under the anime one by one, without building a tuple of all of them.
+
+        warning: Don't create or remove views of the anime while iterating, use get_all_views instead.
+        """
+        self._checking_existence()
+        for view_id in self._anime_data["views"]["_view_objects"]:
+            yield View(self._database, self, view_id)
     
     def clear_views(self) -> None:
         """
         Remove all view object under the anime.
         """
         self._checking_existence()
-        self._view_title_catalog = {}
-        self._anime_data["views"]["_view_objects"] = {}
+        with self._database._mutating(self._id, ChangeEvent("clear", "Anime", self._path, "views")):
+            self._view_title_catalog = {}
+            self._anime_data["views"]["_view_objects"] = {}
+            self._database._activity_changed()
+
+    def delete_views(self, views) -> DeleteCounts:
+        """
+        Remove many views and their reviews at once.\n
+        `views`: a function `views(view) -> bool` choosing the views to remove,
+          or an iterable of View objects and titles of the views. Views which not exist are skipped.\n
+        Returns DeleteCounts(views, reviews) of the removed nodes.
+        """
+        with self._database.batch():
+            self._checking_existence()
+            view_ids = _select_ids(views, self._anime_data["views"]["_view_objects"], lambda title: self._view_title_catalog.get(title),
+                                   View, self._database, self._path, lambda view_id: View(self._database, self, view_id),
+                                   "views must be a function or an iterable of View objects and titles")
+            return _total([self._delete_view(view_id) for view_id in view_ids])
+
+    def _delete_view(self, view_id:int) -> DeleteCounts:
+        # removes an existing view, used by delete_views and view.destroy
+        with self._database._mutating(self._id, ChangeEvent("destroy", "View", (self._id, view_id),
+                                                            old=self._anime_data["views"]["_view_objects"][view_id])):
+            view_object = self._anime_data["views"]["_view_objects"].pop(view_id)
+            if self._loaded_view_title_catalog is not None:
+                # hint: the catalog of this wrapper may not know a view created through another Anime object
+                self._loaded_view_title_catalog.pop(view_object["title"], None)
+            self._database._activity_changed()
+        return DeleteCounts(views=1, reviews=len(view_object["reviews"]["_review_objects"]))
+
+
+    @property
+    def _last_episode_id(self):  #anime.last_episode_id is actually a value in raw dict
+        self._checking_existence()
+        return self._anime_data["episodes"]["_last_episode_id"]
+
+    @_last_episode_id.setter
+    def _last_episode_id(self, new_value):
+        self._checking_existence()
+        self._anime_data["episodes"]["_last_episode_id"] = new_value
+
+
+    def create_episode(self, name:str, type:Optional[str]=None, minutes:Optional[int]=None, is_precise:bool=True) -> Episode:
+        """
+        Create an episode object. \n\n
+
+        `name`: The name of the episode, it must be a unique string under the anime.\n
+        `type`: The type of the episode, e.g. "common", "OVA", "SP". It must be a string but it's optional.\n
+        `minutes`: The length of the episode in minutes. It's a integer but it's optional.\n
+        `is_precise`: Whether `minutes` is the precise length. It's ignored when `minutes` is None.
+        """
+        self._checking_existence()
+
+        # Checking datatype of args
+        _validate("Episode", "name", name)
+        _validate("Episode", "type", type)
+        _validate("Episode", "minutes", minutes)
+        if minutes is not None:
+            _validate("Episode", "is_precise", is_precise)
+
+        # Checking whether the name has existed
+        if name in self._episode_name_catalog:
+            err_msg = f"Episode name should be unique under the anime, the name '{name}' has existed in the episodes of the anime."
+            raise RepeatedEpisodeNameError(err_msg)
+
+        # Adding episode object into the database
+        new_episode_object = _EpisodeNode(
+            name=name,
+            type=_intern(type),
+            length=None if minutes is None else {"is_precise": is_precise, "minutes": minutes},
+            )
+        event = ChangeEvent("create", "Episode", (self._id, self._last_episode_id + 1), new=new_episode_object)
+        with self._database._mutating(self._id, event):
+            self._last_episode_id += 1
+            self._anime_data["episodes"]["_episode_objects"][self._last_episode_id] = new_episode_object
+            self._episode_name_catalog[name] = self._last_episode_id
+
+        #return Episode object
+        return Episode(self._database, self, self._last_episode_id)
+
+    def get_episode(self, name:str) -> Episode:
+        """
+        Get Episode object with name.\n
+        Returns `None` if the name not exists in the episode list of the anime.\n
+        If the datatype of name is wrong, it will be viewed as the name not found.
+        """
+        self._checking_existence()
+        if name in self._episode_name_catalog:
+            return Episode(self._database, self, self._episode_name_catalog[name])
+        else:
+            return None
+
+    def get_all_episodes(self) -> tuple[Episode]:
+        """
+        Get a tuple of all episodes under the anime.
+        """
+        self._checking_existence()
+        rtn = tuple(Episode(self._database, self, episode_id) for episode_id in self._anime_data["episodes"]["_episode_objects"])
+        return rtn
+
+    def clear_episodes(self) -> None:
+        """
+        Remove all episode object under the anime. The detailed view records of all views will be cleared too.
+        """
+        self._checking_existence()
+        with self._database._mutating(self._id, ChangeEvent("clear", "Anime", self._path, "episodes")):
+            for view_object in self._anime_data["views"]["_view_objects"].values():
+                view_object["detailed_view_record"].clear()
+            self._episode_name_catalog = {}
+            self._anime_data["episodes"]["_episode_objects"] = {}
+            self._database._activity_changed()
+
+
+    def similar(self, k:int=10, include_reviews:bool=False) -> tuple[tuple[Anime, float]]:
+        """
+        "More like this": find at most k animes which are similar to the anime.\n
+        Similarity is the jaccard similarity of the tags, estimated by MinHash.
+        If `include_reviews` is True, the item/ranking profile of the reviews is compared too.\n
+        Returns a tuple of (anime, approximate similarity between 0 and 1), the most similar first.\n
+        hint: Only animes sharing a locality-sensitive hashing bucket are compared, so animes with low similarity may be missing.
+        """
+        self._checking_existence()
+        if not isinstance(k, int) or isinstance(k, bool):
+            raise TypeError("k must be a integer")
+        if k < 1:
+            raise ValueError("k must be a positive integer")
+        if include_reviews not in self._database._similarity_indexes:
+            self._database._similarity_indexes[include_reviews] = _SimilarityIndex(include_reviews)
+        similarity_index = self._database._similarity_indexes[include_reviews]
+        scores = similarity_index.query(self._database._raw_dict["animes"]["_anime_objects"], self._id, k)
+        return tuple((Anime(self._database, anime_id), score) for anime_id, score in scores)
 
 
     def destory(self):
@@ -289,7 +479,4 @@ class Anime:
         remove the anime itself from the database
         """
         self._checking_existence()
-        self._database.anime_name_catalog.pop(self._anime_data["title"])
-        for alias in self._anime_data["aliases"]:
-            self._database.anime_name_catalog.pop(alias)
-        self._database._raw_dict["animes"]["_anime_objects"].pop(self._id)
+        self._database._delete_anime(self._id)
@@ -0,0 +1,211 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+import atexit
+import json
+import threading
+import time
+
+from .database import _json_default, _write_file_atomically
+
+if TYPE_CHECKING:
+    from .database import Database
+
+
+class AutosaveStats(NamedTuple):
+    # metrics of an Autosaver, see autosaver.stats
+    saves: int                  # number of finished saves
+    failed_saves: int
+    changes_saved: int          # number of mutations written to the file
+    pending_changes: int        # mutations not saved yet
+    bytes_written: int          # bytes written to the file by all saves
+    bytes_serialized: int       # bytes of the changed animes which were serialized again
+    write_amplification: float  # bytes_written / bytes_serialized, 0.0 before the first save
+    last_save_seconds: float
+    mean_save_seconds: float
+    max_save_seconds: float
+    last_error: Optional[str]
+
+
+class Autosaver:
+    # Saves a database to a file in a background thread, created by database.enable_autosave.
+    # important: The mutators mark the anime they change as dirty(see database._mutating).
+    #            A save takes a snapshot of the database and only serializes the dirty animes again,
+    #              the json of the other animes is reused from the last save, so writers are only blocked for O(1).
+    #            The whole database is saved when the autosaver starts.
+    #            A save happens `interval` seconds after the first unsaved change, or as soon as there are `max_changes` unsaved changes,
+    #              so a burst of changes is written by one save.
+    # warning: The whole file is still rewritten by every save, see stats.write_amplification.
+    def __init__(self, database:Database, file_path:str, interval:float, max_changes:int) -> None:
+        """
+        warning: Please use database.enable_autosave() to create an Autosaver. Don't use Autosaver() directly!
+        """
+        self._database = database
+        self._file_path = file_path
+        self._interval = interval
+        self._max_changes = max_changes
+
+        self._condition = threading.Condition()  # guards the dirty state below, taken after database._lock
+        self._dirty_anime_ids = set()
+        self._dirty_all = True  # nothing has been serialized yet
+        self._pending_changes = 0
+        self._first_change_time = None
+        self._closed = False
+
+        self._save_lock = threading.Lock()  # only one save writes the file at a time
+        self._anime_jsons = {}  # {anime-id: json of the anime object when it was saved last time}
+
+        self._saves = 0
+        self._failed_saves = 0
+        self._changes_saved = 0
+        self._bytes_written = 0
+        self._bytes_serialized = 0
+        self._last_save_seconds = 0.0
+        self._total_save_seconds = 0.0
+        self._max_save_seconds = 0.0
+        self._last_error = None
+
+        self._thread = threading.Thread(target=self._run, name="AnDson autosave", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+
+    def _mark_dirty(self, anime_id:int|None) -> None:
+        # called by database._mutating, None means every anime may be changed
+        with self._condition:
+            if anime_id is None:
+                self._dirty_all = True
+            else:
+                self._dirty_anime_ids.add(anime_id)
+            if self._pending_changes == 0:
+                self._first_change_time = time.monotonic()
+            self._pending_changes += 1
+            if self._pending_changes == 1 or self._pending_changes >= self._max_changes:
+                self._condition.notify()
+
+    def _run(self) -> None:
+        self.flush()  # the whole database is written when autosave is enabled
+        while True:
+            with self._condition:
+                # hint: _dirty_all without pending changes is left by a failed first save, it's retried after the interval too.
+                while not self._closed and self._pending_changes == 0 and not self._dirty_all:
+                    self._condition.wait()
+                if self._closed:  # close() saves the rest
+                    return None
+                deadline = self._first_change_time + self._interval
+                while not self._closed and self._pending_changes < self._max_changes:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if self._closed:
+                    return None
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Save the unsaved changes now. It will do nothing if there are no unsaved changes.
+        """
+        with self._save_lock:
+            with self._database._lock:
+                with self._condition:
+                    if self._pending_changes == 0 and not self._dirty_all:
+                        return None
+                    snapshot = self._database.snapshot()
+                    dirty_anime_ids, dirty_all, changes = self._dirty_anime_ids, self._dirty_all, self._pending_changes
+                    self._dirty_anime_ids, self._dirty_all, self._pending_changes = set(), False, 0
+
+            start_time = time.perf_counter()
+            try:
+                written, serialized = self._save(snapshot, dirty_anime_ids, dirty_all)
+            except Exception as error:
+                with self._condition:  # try again in the next save
+                    self._dirty_anime_ids |= dirty_anime_ids
+                    self._dirty_all = self._dirty_all or dirty_all
+                    if self._pending_changes == 0:
+                        self._first_change_time = time.monotonic()
+                    self._pending_changes += changes
+                self._failed_saves += 1
+                self._last_error = f"{type(error).__name__}: {error}"
+                return None
+            save_seconds = time.perf_counter() - start_time
+
+            self._saves += 1
+            self._changes_saved += changes
+            self._bytes_written += written
+            self._bytes_serialized += serialized
+            self._last_save_seconds = save_seconds
+            self._total_save_seconds += save_seconds
+            self._max_save_seconds = max(self._max_save_seconds, save_seconds)
+            self._last_error = None
+
+    def _save(self, snapshot, dirty_anime_ids:set, dirty_all:bool) -> tuple[int, int]:
+        # writes the snapshot to the file, returns (bytes written, bytes serialized again)
+        anime_objects = snapshot._raw_dict["animes"]["_anime_objects"]
+        if dirty_all:
+            self._anime_jsons = {}
+            dirty_anime_ids = anime_objects
+        serialized = 0
+        for anime_id in dirty_anime_ids:
+            if anime_id in anime_objects:
+                anime_json = json.dumps(anime_objects[anime_id], default=_json_default)
+                self._anime_jsons[anime_id] = anime_json
+                serialized += len(anime_json)
+            else:
+                self._anime_jsons.pop(anime_id, None)
+
+        # the same text as json.dumps(raw_dict) in save_AnDson, "animes" is the last key of the raw dict
+        head = {key: value for key, value in snapshot._raw_dict.items() if key != "animes"}
+        parts = [json.dumps(head)[:-1],
+                 ', "animes": {"_last_anime_id": ', json.dumps(snapshot._last_anime_id), ', "_anime_objects": {',
+                 ", ".join(f'"{anime_id}": {self._anime_jsons[anime_id]}' for anime_id in sorted(self._anime_jsons)),
+                 "}}}"]
+        data = "".join(parts).encode()
+        _write_file_atomically(self._file_path, data)
+        return len(data), serialized
+
+    def close(self) -> None:
+        """
+        Save the unsaved changes and stop autosaving. It will do nothing if the autosaver has been closed.\n
+        warning: Don't call it inside database.batch(), it waits for the background thread which may be waiting for the batch.
+        """
+        with self._condition:
+            if self._closed:
+                return None
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
+        atexit.unregister(self.close)
+        if self._database._autosaver is self:
+            self._database._autosaver = None
+
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def stats(self) -> AutosaveStats:
+        """
+        Returns the metrics of the autosaver, see AutosaveStats.
+        """
+        with self._condition:
+            pending_changes = self._pending_changes
+        return AutosaveStats(
+            saves=self._saves,
+            failed_saves=self._failed_saves,
+            changes_saved=self._changes_saved,
+            pending_changes=pending_changes,
+            bytes_written=self._bytes_written,
+            bytes_serialized=self._bytes_serialized,
+            write_amplification=self._bytes_written / self._bytes_serialized if self._bytes_serialized else 0.0,
+            last_save_seconds=self._last_save_seconds,
+            mean_save_seconds=self._total_save_seconds / self._saves if self._saves else 0.0,
+            max_save_seconds=self._max_save_seconds,
+            last_error=self._last_error)
@@ -0,0 +1,122 @@
+from __future__ import annotations
+from typing import Callable, NamedTuple, Optional, Any, Iterable
+
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from .database import Database
+from .anime import Anime
+from .view import View
+from .review import Review
+from .episode import Episode
+
+
+_POOL_RETRIES = 2  # pools running all unfinished chunks together, before the chunks are run alone
+
+
+class FileResult(NamedTuple):
+    # result of one file in map_databases, `error` is None if fn succeeded
+    path: str
+    value: Any
+    error: Optional[Exception]
+
+
+def _process_file(fn:Callable[[Database], Any], path:str) -> FileResult:
+    # runs in the worker process, an exception only fails its own file
+    try:
+        value = fn(Database(path))
+        if isinstance(value, (Database, Anime, View, Review, Episode)):
+            raise TypeError("fn must return compact results(e.g. numbers, dicts, arrays), not objects of the database.")
+        pickle.dumps(value)  # the value must be sent back to the parent
+    except Exception as error:
+        try:
+            pickle.dumps(error)
+        except Exception:
+            error = RuntimeError(f"{type(error).__name__}: {error}")
+        return FileResult(path, None, error)
+    return FileResult(path, value, None)
+
+def _process_chunk(fn:Callable[[Database], Any], paths:list[str]) -> list[FileResult]:
+    return [_process_file(fn, path) for path in paths]
+
+def _run_in_pool(fn:Callable[[Database], Any], chunks:list[list[str]], chunk_indexes:list[int], workers:int,
+                 finish:Callable[[int, list[FileResult]], None]) -> dict[int, BrokenProcessPool]:
+    # runs the chunks of chunk_indexes in a new pool and calls finish(chunk_index, results of the chunk) for every finished chunk.
+    # Returns {chunk_index: error} of the chunks which are not finished because a worker process died.
+    # important: A dead worker breaks the pool, every chunk which is not finished then fails with BrokenProcessPool,
+    #              not only the chunk the worker was running.
+    broken = {}
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunk_indexes))) as executor:
+        futures = {executor.submit(_process_chunk, fn, chunks[chunk_index]): chunk_index for chunk_index in chunk_indexes}
+        for future in as_completed(futures):
+            chunk_index = futures[future]
+            try:
+                chunk_results = future.result()
+            except BrokenProcessPool as error:
+                broken[chunk_index] = error
+                continue
+            except Exception as error:  # e.g. fn can't be sent to the worker
+                chunk_results = [FileResult(path, None, error) for path in chunks[chunk_index]]
+            finish(chunk_index, chunk_results)
+    return broken
+
+
+def map_databases(paths:Iterable[str], fn:Callable[[Database], Any], workers:Optional[int]=None, chunksize:int=1,
+                  progress:Optional[Callable[[int, int], None]]=None) -> list[FileResult]:
+    """
+    Load every AnDson file in `paths` and call `fn(database)` in a pool of `workers` processes(default: number of cpus).\n
+    `fn` must be a function defined at the top level of a module, so it can be sent to the worker processes.
+      It should return a compact result(numbers, dicts, arrays ...), the database itself is never sent back.\n
+    `chunksize`: the number of files sent to a worker at a time, use a larger one for a lot of small files.\n
+    `progress`: called as `progress(done, total)` in this process after every chunk.\n
+    Returns a list of FileResult(path, value, error) in the order of `paths`.
+      An error(e.g. WrongDatabaseError of a broken file) only fails its own file, it's stored in FileResult.error.
+      If a worker process dies(e.g. it's killed or crashes), the unfinished chunks are run again in a new pool,
+      and a chunk which is still unfinished after that is run alone, so only the files of the chunk which kills its worker
+      get the error(BrokenProcessPool).\n
+    With `workers=1` the files are processed in this process.
+    """
+    paths = list(paths)
+    if not callable(fn):
+        raise TypeError("fn must be callable")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if not isinstance(workers, int) or isinstance(workers, bool):
+        raise TypeError("workers must be a integer or None")
+    if not isinstance(chunksize, int) or isinstance(chunksize, bool):
+        raise TypeError("chunksize must be a integer")
+    if workers <= 0 or chunksize <= 0:
+        raise ValueError("workers and chunksize must be positive")
+
+    chunks = [paths[start:start + chunksize] for start in range(0, len(paths), chunksize)]
+    results = []  # [list of FileResult of a chunk], in the order of chunks
+    done = 0
+    if workers == 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            results.append(_process_chunk(fn, chunk))
+            done += len(chunk)
+            if progress is not None:
+                progress(done, len(paths))
+    else:
+        results = [None] * len(chunks)
+
+        def finish(chunk_index:int, chunk_results:list[FileResult]) -> None:
+            nonlocal done
+            results[chunk_index] = chunk_results
+            done += len(chunk_results)
+            if progress is not None:
+                progress(done, len(paths))
+
+        unfinished = list(range(len(chunks)))
+        for _ in range(_POOL_RETRIES):
+            if not unfinished:
+                break
+            unfinished = sorted(_run_in_pool(fn, chunks, unfinished, workers, finish))
+        for chunk_index in unfinished:
+            # hint: Alone in its pool, a dead worker can only be killed by its own chunk.
+            broken = _run_in_pool(fn, chunks, [chunk_index], 1, finish)
+            if broken:
+                finish(chunk_index, [FileResult(path, None, broken[chunk_index]) for path in chunks[chunk_index]])
+    return [file_result for chunk_results in results for file_result in chunk_results]
@@ -0,0 +1,116 @@
+from __future__ import annotations
+from typing import NamedTuple, Optional, Any, Iterator
+import json
+
+
+class ChangeEvent(NamedTuple):
+    # One change of a database, sent to the subscribers of the database(see database.subscribe).
+    # `op`:    "create" | "destroy" | "clear" | "set" | "add" | "remove"
+    # `kind`:  the node type which is changed: "Database" | "Anime" | "View" | "Review" | "Episode"
+    # `path`:  ids of the node, () for Database, (anime-id,) for Anime, (anime-id, view-id) for View,
+    #            (anime-id, view-id, review-id) for Review, (anime-id, episode-id) for Episode.
+    # `field`: the changed field for "set"/"add"/"remove", the cleared children("animes", "views", "reviews", "episodes") for "clear".
+    # `old`, `new`: json-like values before/after the change.
+    #            "create" has the new node as `new`, "destroy" has the removed node as `old`, "clear" has neither.
+    #            "add"/"remove" has the added item as `new`/the removed item as `old`.
+    #            Items of "detailed_view_record" are [episode-id, date-string].
+    op: str
+    kind: str
+    path: tuple
+    field: Optional[str] = None
+    old: Any = None
+    new: Any = None
+
+    def _to_json(self) -> list:
+        return [self.op, self.kind, list(self.path), self.field, self.old, self.new]
+
+    @classmethod
+    def _from_json(cls, json_list:list) -> ChangeEvent:
+        op, kind, path, field, old, new = json_list
+        return cls(op, kind, tuple(path), field, old, new)
+
+
+class DeleteCounts(NamedTuple):
+    # numbers of the removed nodes, returned by database.delete_animes, anime.delete_views and view.delete_reviews
+    animes: int = 0
+    views: int = 0
+    reviews: int = 0
+    episodes: int = 0
+
+def _total(counts:list[DeleteCounts]) -> DeleteCounts:
+    return DeleteCounts(*(sum(column) for column in zip(DeleteCounts(), *counts)))
+
+
+def _freeze(value, json_default):
+    # a copy of value which will not change with the database and can be written as json
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return json.loads(json.dumps(value, default=json_default))
+
+def _is_dropped(event:ChangeEvent, dropped:set) -> bool:
+    # whether the event changes a node of `dropped`({(kind, path)}) or one of its children,
+    #   or records an episode of `dropped` in a detailed view record
+    path = event.path
+    if not path:
+        return False
+    if ("Anime", path[:1]) in dropped:
+        return True
+    if len(path) >= 2 and ("Episode" if event.kind == "Episode" else "View", path[:2]) in dropped:
+        return True
+    if len(path) == 3 and ("Review", path) in dropped:
+        return True
+    if event.field == "detailed_view_record" and event.op != "clear":
+        item = event.old if event.op == "remove" else event.new  # [episode-id, date-string]
+        return ("Episode", (path[0], item[0])) in dropped
+    return False
+
+def _coalesce(events:list[ChangeEvent]) -> list[ChangeEvent]:
+    # Merge the events of a batch:
+    #   a node created and destroyed in the same batch is dropped with all changes under it,
+    #     and with the detailed view record items of it if it's an episode.
+    #     hint: Its id is not reused, the events of the nodes created later still have their own ids.
+    #   "set"s of the same field of the same node are merged into one, and dropped if the value is set back.
+    #   an item "add"ed to a list field(aliases, tags, episode_range, duration) and "remove"d again is dropped with both events.
+    created = {(event.kind, event.path) for event in events if event.op == "create"}
+    dropped = {(event.kind, event.path) for event in events if event.op == "destroy" and (event.kind, event.path) in created}
+    if dropped:
+        events = [event for event in events if not _is_dropped(event, dropped)]
+
+    rtn = []
+    last_set = {}  # {(kind, path, field): index in rtn}
+    last_add = {}  # {(kind, path, field, item): index in rtn}
+    for event in events:
+        key = (event.kind, event.path, event.field)
+        if event.op == "set" and key in last_set:
+            index = last_set[key]
+            rtn[index] = rtn[index]._replace(new=event.new)
+            continue
+        if event.op == "remove" and isinstance(event.old, str) and (*key, event.old) in last_add:
+            # hint: an item is only added if it's not in the list, so adding and removing it leaves the list unchanged
+            rtn[last_add.pop((*key, event.old))] = None
+            continue
+        if event.op == "set" and event.field != "detailed_view_record":
+            last_set[key] = len(rtn)
+        else:  # anything else in between ends the merging of the node
+            for other_key in [other_key for other_key in last_set if other_key[:2] == key[:2]]:
+                del last_set[other_key]
+        if event.op == "add" and isinstance(event.new, str):
+            last_add[(*key, event.new)] = len(rtn)
+        elif event.op == "set":  # the list is replaced, an item removed later may come from the new list
+            for other_key in [other_key for other_key in last_add if other_key[:3] == key]:
+                del last_add[other_key]
+        rtn.append(event)
+    return [event for event in rtn if event is not None and not (event.op == "set" and event.old == event.new)]
+
+
+def read_change_log(file_path:str) -> Iterator[tuple[int, tuple[ChangeEvent]]]:
+    """
+    Read a change log written by database.subscribe_log.\\n
+    Yields (database version after the batch, tuple of ChangeEvent) for every batch, in order.
+    """
+    with open(file_path, "r") as log_file:
+        for line in log_file:
+            if not line.strip():
+                continue
+            batch = json.loads(line)
+            yield batch["version"], tuple(ChangeEvent._from_json(event) for event in batch["events"])
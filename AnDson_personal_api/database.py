@@ -1,11 +1,101 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable, NamedTuple, Optional, Any
 
 import json
+import operator
+import os
+from bisect import bisect_right
+import sys
+import threading
+import weakref
+from array import array
+from collections.abc import Mapping
+from contextlib import contextmanager
+from copy import deepcopy
 
 from .anime import Anime
-from .exceptions import RepeatedAnimeTitleError, WrongDatabaseError
+from .view import View
+from .review import Review
+from .episode import BingeSession, _WatchRecord, _episodes_per_day, _binge_sessions
+from ._activity import _ActivityColumns, _GROUP_BYS, _GRANULARITIES, _MEASURES
+from ._nodes import _Node, _ViewNode, _ReviewNode, _EpisodeNode, _intern, _intern_list, _episode_range
+from ._funcs import _date_string_to_day, _normalize_name, _NAME_NORMALIZATIONS, _select_ids
+from .changes import ChangeEvent, DeleteCounts, _coalesce, _freeze, _total, read_change_log
+from ._validation import _validate, _find_violations
+from .exceptions import RepeatedAnimeTitleError, WrongDatabaseError, AmbiguousAnimeNameError, InvalidDatabaseError
 
+if TYPE_CHECKING:
+    from .snapshot import Snapshot
+    from .autosave import Autosaver
+
+
+_PAGE_ORDERS = ("id", "title")
+
+
+class Page(NamedTuple):
+    # a page of database.page_animes
+    items: tuple[Anime]
+    next_cursor: Optional[Any]  # pass it as `after` to get the next page, None if it's the last page
+
+
+_ABSENT = object()  # an anime which doesn't exist, see _copy_on_write
+
+
+class _Mutation:
+    # the context manager of database._mutating
+    # hint: It's a plain class instead of a @contextmanager generator, it's entered by every mutation.
+    __slots__ = ("database", "anime_id", "events")
+
+    def __init__(self, database:Database, anime_id:int|None, events:tuple[ChangeEvent]) -> None:
+        self.database = database
+        self.anime_id = anime_id
+        self.events = events
+
+    def __enter__(self) -> None:
+        database = self.database
+        database._lock.acquire()
+        if not database._snapshots:
+            return None  # fast path: nothing to preserve
+        try:
+            destroying = any(event.op == "destroy" and event.kind == "Anime" for event in self.events)
+            database._copy_on_write(self.anime_id, destroying)
+        except BaseException:
+            database._lock.release()
+            raise
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        database = self.database
+        try:
+            if database._similarity_indexes:
+                for similarity_index in database._similarity_indexes.values():
+                    similarity_index.mark_dirty(self.anime_id)
+            if exc_type is not None:
+                return False  # a failed mutator has not changed the raw dict, nothing is saved, cached or sent
+            database._version += 1
+            if database._autosaver is not None:
+                database._autosaver._mark_dirty(self.anime_id)
+            if database._subscribers:
+                # values are copied now, they may be changed by the next mutation before the batch ends
+                database._pending_events.extend(event._replace(old=_freeze(event.old, _json_default), new=_freeze(event.new, _json_default))
+                                                for event in self.events)
+        finally:
+            database._lock.release()
+        if database._pending_events and database._batch_depth == 0:
+            database._flush_events()
+        return False
+
+
+_ACTIVITY_FIELDS = ("tags", "is_new", "times_view", "source", "duration", "last_episode_date", "detailed_view_record")
+
+def _changes_activity(event:ChangeEvent) -> bool:
+    # whether a replayed event changes the data activity_timeseries reads, see database._activity_changed
+    if event.op == "create":
+        return event.kind in ("Anime", "View")
+    if event.op == "destroy":
+        return event.kind != "Review"  # destroying an episode removes it from the detailed view records
+    if event.op == "clear":
+        return event.field != "reviews"
+    return event.field in _ACTIVITY_FIELDS
 
 def _version_check(raw_dict: dict):  # To be complete in the future
     if raw_dict["_edition"] != "AnDson Personal":
@@ -25,8 +115,133 @@ def _get_anime_name_catalog(raw_dict:dict) -> dict:
         for alias in anime["aliases"]:
             anime_name_catalog[alias] = anime_id
     return anime_name_catalog
+
+def _get_normalized_name_catalog(raw_dict:dict, normalization:tuple[str]) -> dict:
+    # {normalized name: {anime-id: how many names(title and aliases) of the anime have the normalized name}}
+    # hint: A name made only of punctuation or whitespace is normalized to "", it's not in the catalog.
+    normalized_name_catalog = {}
+    for anime_id, anime in raw_dict["animes"]["_anime_objects"].items():
+        for name in (anime["title"], *anime["aliases"]):
+            key = _normalize_name(name, normalization)
+            if not key:
+                continue
+            counts = normalized_name_catalog.setdefault(key, {})
+            counts[anime_id] = counts.get(anime_id, 0) + 1
+    return normalized_name_catalog
+
+def _get_tag_catalog(raw_dict:dict) -> dict:
+    # {tag: {anime-id: how many times the tag appears in anime.tags}}, for O(1) `tag in anime.tags`
+    tag_catalog = {}
+    for anime_id, anime in raw_dict["animes"]["_anime_objects"].items():
+        for tag in anime["tags"]:
+            counts = tag_catalog.setdefault(tag, {})
+            counts[anime_id] = counts.get(anime_id, 0) + 1
+    return tag_catalog
             
 
+def _decrease_count(catalog:dict, key, anime_id:int) -> None:
+    # for the {key: {anime-id: count}} catalogs
+    counts = catalog[key]
+    counts[anime_id] -= 1
+    if counts[anime_id] == 0:
+        del counts[anime_id]
+        if not counts:
+            del catalog[key]
+
+
+def _json_object_hook(json_object:dict) -> dict:
+    # json turns every key into string, but anime/view/review/episode ids are integers in python.
+    for objects_key in ("_anime_objects", "_view_objects", "_review_objects", "_episode_objects"):
+        if objects_key in json_object:
+            json_object[objects_key] = {int(node_id) if node_id.isdigit() else node_id: node
+                                        for node_id, node in json_object[objects_key].items()}
+
+    node_class = json_object.get("_class")
+    if node_class == "Detailed View Record":
+        try:
+            return _WatchRecord._from_json(json_object)
+        except (KeyError, TypeError, ValueError, OverflowError):
+            return json_object  # broken, it's reported by Database(file_path, validate=True)
+    if node_class == "Anime":
+        if "episodes" not in json_object:  # files saved before episodes were supported
+            json_object["episodes"] = {"_last_episode_id": 0, "_episode_objects": {}}
+        _convert_field(json_object, "tags", _intern_list)
+    elif node_class == "View":
+        if "detailed_view_record" not in json_object:
+            json_object["detailed_view_record"] = _WatchRecord()
+        _convert_field(json_object, "source", _intern)
+        _convert_field(json_object, "last_episode_date", _intern)
+        _convert_field(json_object, "episode_range", _episode_range)
+        _convert_field(json_object, "duration", _intern_list)
+        return _ViewNode._from_json(json_object)
+    elif node_class == "Review":
+        _convert_field(json_object, "item", _intern)
+        _convert_field(json_object, "episode_range", _episode_range)
+        return _ReviewNode._from_json(json_object)
+    elif node_class == "Episode":
+        _convert_field(json_object, "type", _intern)
+        return _EpisodeNode._from_json(json_object)
+    return json_object
+
+def _convert_field(json_object:dict, field:str, convert:Callable) -> None:
+    # a missing field stays missing, so the validator can report it
+    if field in json_object:
+        json_object[field] = convert(json_object[field])
+
+def _json_default(value):
+    if isinstance(value, (_Node, _WatchRecord)):
+        return value._to_json()
+    if isinstance(value, Mapping):  # the anime objects of a snapshot
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _node_category(value) -> str|None:
+    # which node type the memory of value belongs to in memory_report, None means the same as its parent
+    if isinstance(value, _Node):
+        return value._CLASS
+    if isinstance(value, _WatchRecord):
+        return "Detailed View Record"
+    if isinstance(value, dict) and value.get("_class") == "Anime":
+        return "Anime"
+    return None
+
+def _add_memory_usage(report:dict, root, category:str, seen:set) -> None:
+    # adds the bytes of every object reachable from root to report, each object is counted only once
+    stack = [(root, category)]
+    while stack:
+        value, category = stack.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        if isinstance(value, str):
+            report["strings"] += sys.getsizeof(value)
+            continue
+        category = _node_category(value) or category
+        report[category] += sys.getsizeof(value)
+        if isinstance(value, dict):
+            children = [*value.keys(), *value.values()]
+        elif isinstance(value, (list, tuple, set, frozenset)):
+            children = value
+        elif isinstance(value, _Node):
+            children = [getattr(value, field) for field in value._FIELDS] + [value._extras]
+        elif isinstance(value, _WatchRecord):
+            children = (value.episode_ids, value.days, value._loaded_positions)
+        else:
+            children = ()
+        stack.extend((child, category) for child in children)
+
+
+def _write_file_atomically(file_path:str, data:bytes) -> None:
+    # the file is either the old one or the new one, even if the process is killed while writing
+    temp_path = file_path + ".tmp"
+    with open(temp_path, "wb") as temp_file:
+        temp_file.write(data)
+        temp_file.flush()
+        os.fsync(temp_file.fileno())
+    os.replace(temp_path, file_path)
+
+
 def _load_AnDson(file_path:str) -> dict:
     """
     load data from an existing AnDson.json to AnDson object in python
@@ -34,18 +249,47 @@ def _load_AnDson(file_path:str) -> dict:
     # important: An AnDson file can be load in multiple process at the same time.
     #            This api just provide a way to loading data from AnDson to python, 
     #              editing data in python and saving from python to AnDson.
-    json_file = open(file_path,"r")
-    raw_dict = json.load(json_file)  
+    json_file = open(file_path,"rb")
+    data = json_file.read()
     json_file.close()
+    raw_dict = json.loads(data, object_hook=_json_object_hook)
     _version_check(raw_dict)
     return raw_dict
 
 
+class _ChangeLogWriter:
+    # subscriber of a database which appends every batch of change events to a file as a json line
+    def __init__(self, database:Database, file_path:str) -> None:
+        self._database = database
+        self._log_file = open(file_path, "a")
+
+    def __call__(self, events:tuple[ChangeEvent]) -> None:
+        batch = {"version": self._database._version, "events": [event._to_json() for event in events]}
+        self._log_file.write(json.dumps(batch) + "\n")
+        self._log_file.flush()
+
+    def close(self) -> None:
+        self._database.unsubscribe(self)
+        self._log_file.close()
+
+
 class Database:
-    def __init__(self, file_path:str=None) -> None:
+    def __init__(self, file_path:str=None, name_normalization:tuple[str]=_NAME_NORMALIZATIONS,
+                 validate:bool=False) -> None:
         """
-        use Database() to create a new database object, or use Database(file_path) to load an existing AnDson file.
+        use Database() to create a new database object, or use Database(file_path) to load an existing AnDson file.\n
+        `name_normalization` is the steps of get_anime(name, normalized=True), any of
+          "nfkc"(full-width/half-width), "casefold"(case), "kana"(katakana/hiragana), "whitespace" and "punctuation".\n
+        If `validate` is True, the whole file is checked against the schema after loading,
+          and InvalidDatabaseError is raised with every violation and its node path(see database.validate).
         """
+        if not isinstance(name_normalization, tuple):
+            raise TypeError("name_normalization must be a tuple of strings")
+        for step in name_normalization:
+            if step not in _NAME_NORMALIZATIONS:
+                raise ValueError(f"steps of name_normalization must be in {_NAME_NORMALIZATIONS}")
+        self._name_normalization = name_normalization
+
         if file_path is None:
             raw_dict = {
                 "_edition": "AnDson Personal",
@@ -54,8 +298,63 @@ class Database:
                           "_anime_objects":{}}}
         else:
             raw_dict = _load_AnDson(file_path)
+            if validate:
+                errors = _find_violations(raw_dict)
+                if errors:
+                    raise InvalidDatabaseError(errors)
         self._raw_dict = raw_dict
-        self.anime_name_catalog = _get_anime_name_catalog(self._raw_dict)
+        # catalogs are built on the first access, see anime_name_catalog
+        self._loaded_anime_name_catalog = None
+        self._loaded_tag_catalog = None
+        self._loaded_normalized_name_catalog = None
+        self._name_collisions = set()  # normalized names of more than one anime, valid while the catalog is loaded
+
+        self._version = 0  # increased by every mutation, caches are valid while it's unchanged
+        self._activity_cache = None  # (_ActivityColumns, {(granularity, group_by, measure): timeseries}), see _activity_changed
+        self._similarity_indexes = {}  # {include_reviews: _SimilarityIndex}, built by the first anime.similar()
+        self._anime_generations = {}  # {anime-id: times the anime object was replaced}, wrappers cache the nodes until it changes
+        self._page_keys = {}  # {order_by: sorted cursors of all animes}, see page_animes and _page_keys_changed
+
+        self._lock = threading.RLock()  # held by writers while they change the raw dict
+        self._snapshots = weakref.WeakSet()
+
+        self._subscribers = []  # callbacks of change events, see subscribe
+        self._batch_depth = 0
+        self._pending_events = []
+
+        self._autosaver = None  # see enable_autosave
+
+
+    @property
+    def anime_name_catalog(self) -> dict:
+        # {anime-title | anime-alias: anime-id}
+        if self._loaded_anime_name_catalog is None:
+            self._loaded_anime_name_catalog = _get_anime_name_catalog(self._raw_dict)
+        return self._loaded_anime_name_catalog
+
+    @anime_name_catalog.setter
+    def anime_name_catalog(self, new_catalog:dict) -> None:
+        self._loaded_anime_name_catalog = new_catalog
+
+    @property
+    def _tag_catalog(self) -> dict:
+        if self._loaded_tag_catalog is None:
+            self._loaded_tag_catalog = _get_tag_catalog(self._raw_dict)
+        return self._loaded_tag_catalog
+
+    @_tag_catalog.setter
+    def _tag_catalog(self, new_catalog:dict) -> None:
+        self._loaded_tag_catalog = new_catalog
+
+
+    @property
+    def _normalized_name_catalog(self) -> dict:
+        # see _get_normalized_name_catalog
+        if self._loaded_normalized_name_catalog is None:
+            catalog = _get_normalized_name_catalog(self._raw_dict, self._name_normalization)
+            self._name_collisions = {key for key, counts in catalog.items() if len(counts) > 1}
+            self._loaded_normalized_name_catalog = catalog
+        return self._loaded_normalized_name_catalog
 
 
     @property
@@ -67,15 +366,328 @@ class Database:
         self._raw_dict["animes"]["_last_anime_id"] = new_value
 
 
+    def _mutating(self, anime_id:int|None=None, *events:ChangeEvent) -> _Mutation:
+        # important: Every method which changes the raw dict must do the change inside `with database._mutating(anime_id, *events):`.
+        #            anime_id is the anime whose data is changed, None means the whole anime dict is replaced(e.g. clear_anime).
+        #            events describe the change, they are sent to the subscribers if the change succeeds.
+        #            The data must be looked up from the raw dict inside the block (e.g. anime._anime_data),
+        #              because the anime object is replaced with a copy here if a snapshot shares it.
+        return _Mutation(self, anime_id, events)
+
+    def _activity_changed(self) -> None:
+        # called inside _mutating by the mutators of the data activity_timeseries reads:
+        #   the views, their dates and view info(is_new, times_view, source), the detailed view records, the animes and their tags
+        self._activity_cache = None
+
+    def _page_keys_changed(self, order_by:str|None=None) -> None:
+        # called inside _mutating when an anime is created or destroyed(every order), or renamed(order_by="title")
+        if order_by is None:
+            self._page_keys = {}
+        else:
+            self._page_keys.pop(order_by, None)
+
+    def _flush_events(self) -> None:
+        with self._lock:
+            events = tuple(_coalesce(self._pending_events))
+            self._pending_events = []
+        if not events:
+            return None
+        for callback in list(self._subscribers):
+            try:
+                callback(events)
+            except Exception:
+                # hint: A broken subscriber can't stop the others(e.g. the change log), and the change is already done,
+                #       so the error is only reported.
+                sys.excepthook(*sys.exc_info())
+
+    @contextmanager
+    def batch(self):
+        """
+        Group changes into one batch of change events: `with database.batch(): ...`\n
+        Subscribers receive the coalesced events of the batch once when the outermost batch ends, even if it ends with an exception.
+        Other threads can't change the database during the batch.
+        """
+        outermost = False
+        try:
+            with self._lock:
+                self._batch_depth += 1
+                try:
+                    yield self
+                finally:
+                    self._batch_depth -= 1
+                    outermost = self._batch_depth == 0
+        finally:
+            if outermost:  # the changes made before an exception are kept, so their events are sent too
+                self._flush_events()
+
+    def subscribe(self, callback:Callable[[tuple[ChangeEvent]], None]) -> Callable[[tuple[ChangeEvent]], None]:
+        """
+        Call `callback(events)` after every batch of changes, events is a tuple of ChangeEvent.\n
+        An exception raised by the callback is reported with sys.excepthook, it doesn't stop the other subscribers.\n
+        A change not made in database.batch() is a batch itself. Returns the callback, pass it to unsubscribe to stop.
+        """
+        if not callable(callback):
+            raise TypeError("callback must be callable")
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback) -> None:
+        """
+        Stop calling the callback. If the callback is not subscribed, it will do nothing.
+        """
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def subscribe_log(self, file_path:str) -> _ChangeLogWriter:
+        """
+        Append every batch of change events to a change log file, one json line per batch.\n
+        Returns the log writer, use writer.close() to stop logging. Use replay_change_log to apply the log to a database.
+        """
+        writer = _ChangeLogWriter(self, file_path)
+        self.subscribe(writer)
+        return writer
+
+    def replay_change_log(self, file_path:str, after_version:int=-1) -> int:
+        """
+        Apply the changes in a change log(see subscribe_log) to the database.\n
+        Batches whose version is not greater than `after_version` are skipped.
+        Returns the version of the last applied batch(or after_version if nothing is applied).
+        """
+        last_version = after_version
+        for version, events in read_change_log(file_path):
+            if version <= after_version:
+                continue
+            with self.batch():
+                for event in events:
+                    self._apply_event(event)
+            last_version = version
+        return last_version
+
+    def _apply_event(self, event:ChangeEvent) -> None:
+        # apply a change event to the raw dict directly, catalogs are rebuilt on the next access.
+        if event.kind == "Database":
+            with self._mutating(None, event):
+                self._raw_dict["animes"]["_anime_objects"] = {}
+                self._reset_catalogs()
+                self._activity_changed()
+                self._page_keys_changed()
+            return None
+        anime_id = event.path[0]
+        with self._mutating(anime_id, event):
+            if event.op in ("create", "destroy"):
+                parent, objects_key, last_id_key = self._event_parent(event)
+                if event.kind == "Anime":
+                    self._anime_generations[anime_id] = self._anime_generations.get(anime_id, 0) + 1
+                if event.op == "create":
+                    parent[objects_key][event.path[-1]] = json.loads(json.dumps(event.new), object_hook=_json_object_hook)
+                    parent[last_id_key] = max(parent[last_id_key], event.path[-1])
+                elif event.kind == "Anime":
+                    parent[objects_key].pop(anime_id, None)  # it's moved to the snapshots sharing it, see _copy_on_write
+                else:
+                    parent[objects_key].pop(event.path[-1])
+                    if event.kind == "Episode":
+                        anime_object = self._raw_dict["animes"]["_anime_objects"][anime_id]
+                        for view_object in anime_object["views"]["_view_objects"].values():
+                            view_object["detailed_view_record"].discard(event.path[-1])
+            else:
+                node = self._event_node(event)
+                if event.op == "clear":
+                    children = node[event.field]
+                    children["_" + event.field[:-1] + "_objects"] = {}
+                    if event.field == "episodes":
+                        for view_object in node["views"]["_view_objects"].values():
+                            view_object["detailed_view_record"].clear()
+                elif event.field == "detailed_view_record":
+                    if event.op == "remove":
+                        node["detailed_view_record"].discard(event.old[0])
+                    else:
+                        node["detailed_view_record"].set_day(event.new[0], _date_string_to_day(event.new[1]))
+                elif event.op == "set" and event.field == "episode_range":
+                    node[event.field] = _episode_range(event.new)
+                elif event.op == "set":
+                    node[event.field] = _intern_list(event.new) if isinstance(event.new, list) else _intern(event.new)
+                elif event.op == "add":
+                    node[event.field].append(_intern(event.new))
+                elif event.op == "remove":
+                    node[event.field].remove(event.old)
+            self._reset_catalogs()
+            if _changes_activity(event):
+                self._activity_changed()
+            if event.kind == "Anime" and event.op in ("create", "destroy"):
+                self._page_keys_changed()
+            elif event.kind == "Anime" and event.field == "title":
+                self._page_keys_changed("title")
+
+    def _event_node(self, event:ChangeEvent):
+        anime_object = self._raw_dict["animes"]["_anime_objects"][event.path[0]]
+        if event.kind == "Anime":
+            return anime_object
+        if event.kind == "Episode":
+            return anime_object["episodes"]["_episode_objects"][event.path[1]]
+        view_object = anime_object["views"]["_view_objects"][event.path[1]]
+        if event.kind == "View":
+            return view_object
+        return view_object["reviews"]["_review_objects"][event.path[2]]
+
+    def _event_parent(self, event:ChangeEvent) -> tuple[dict, str, str]:
+        # (the dict having the objects of the node, key of the objects, key of the last id)
+        if event.kind == "Anime":
+            return self._raw_dict["animes"], "_anime_objects", "_last_anime_id"
+        anime_object = self._raw_dict["animes"]["_anime_objects"][event.path[0]]
+        if event.kind == "View":
+            return anime_object["views"], "_view_objects", "_last_view_id"
+        if event.kind == "Episode":
+            return anime_object["episodes"], "_episode_objects", "_last_episode_id"
+        return anime_object["views"]["_view_objects"][event.path[1]]["reviews"], "_review_objects", "_last_review_id"
+
+    def _reset_catalogs(self) -> None:
+        self._loaded_anime_name_catalog = None
+        self._loaded_tag_catalog = None
+        self._loaded_normalized_name_catalog = None
+
+    def _copy_on_write(self, anime_id:int|None, destroying:bool=False) -> None:
+        # destroying: the anime is being destroyed, so it's moved to the snapshots instead of being copied
+        if not self._snapshots:
+            return None
+        snapshots = list(self._snapshots)
+        anime_objects = self._raw_dict["animes"]["_anime_objects"]
+        if anime_id is None:
+            # the whole anime dict is changed, e.g. clear_anime replaces it with a new one.
+            for snapshot in snapshots:
+                for existing_id, anime_object in list(anime_objects.items()):
+                    snapshot._preserve(existing_id, anime_object)
+            return None
+        anime_object = anime_objects.get(anime_id, _ABSENT)
+        sharing_snapshots = [snapshot for snapshot in snapshots if anime_id not in snapshot._preserved]
+        if not sharing_snapshots:
+            return None
+        for snapshot in sharing_snapshots:  # must be preserved before the database is changed
+            snapshot._preserve(anime_id, anime_object)
+        if anime_object is _ABSENT:
+            return None
+        if destroying:
+            anime_objects.pop(anime_id)
+        else:
+            anime_objects[anime_id] = deepcopy(anime_object)
+            self._anime_generations[anime_id] = self._anime_generations.get(anime_id, 0) + 1
+
+    def snapshot(self) -> Snapshot:
+        """
+        Returns a point-in-time, read-only view of the database in O(1).\n
+        The snapshot supports the reading methods of Database(get_anime, get_all_animes, activity_timeseries, save_AnDson ...),
+          and it will not change when the database is changed later. Changing data through it raises ReadOnlyDatabaseError.\n
+        The snapshot is released when it's not referenced anymore.
+        """
+        from .snapshot import Snapshot  # snapshot.py imports this module
+
+        with self._lock:
+            snapshot = Snapshot(self)
+            self._snapshots.add(snapshot)
+        return snapshot
+
+
+    # important: The _register/_unregister methods are called by the mutators after the raw dict is changed.
+    #            A catalog which has not been loaded is skipped, it will be built from the changed raw dict when it's needed.
+    def _register_names(self, anime_id:int, names) -> None:
+        # names are the new title/aliases of the anime
+        if self._loaded_anime_name_catalog is not None:
+            for name in names:
+                self._loaded_anime_name_catalog[name] = anime_id
+        if self._loaded_normalized_name_catalog is not None:
+            for name in names:
+                key = _normalize_name(name, self._name_normalization)
+                if not key:  # see _get_normalized_name_catalog
+                    continue
+                counts = self._loaded_normalized_name_catalog.setdefault(key, {})
+                counts[anime_id] = counts.get(anime_id, 0) + 1
+                if len(counts) > 1:  # collision: the name is the same as a name of another anime after normalization
+                    self._name_collisions.add(key)
+
+    def _unregister_names(self, anime_id:int, names) -> None:
+        if self._loaded_anime_name_catalog is not None:
+            for name in names:
+                self._loaded_anime_name_catalog.pop(name)
+        if self._loaded_normalized_name_catalog is not None:
+            for name in names:
+                key = _normalize_name(name, self._name_normalization)
+                if not key:
+                    continue
+                _decrease_count(self._loaded_normalized_name_catalog, key, anime_id)
+                if len(self._loaded_normalized_name_catalog.get(key, ())) <= 1:
+                    self._name_collisions.discard(key)
+
+    def _register_tags(self, anime_id:int, tags) -> None:
+        if self._loaded_tag_catalog is None:
+            return None
+        for tag in tags:
+            counts = self._loaded_tag_catalog.setdefault(tag, {})
+            counts[anime_id] = counts.get(anime_id, 0) + 1
+
+    def _unregister_tags(self, anime_id:int, tags) -> None:
+        if self._loaded_tag_catalog is None:
+            return None
+        for tag in tags:
+            _decrease_count(self._loaded_tag_catalog, tag, anime_id)
+
+    def _has_tag(self, anime_id:int, tag:str) -> bool:
+        return anime_id in self._tag_catalog.get(tag, ())
+
+
     def save_AnDson(self, file_path:str) -> None:
         """
         save the Database object in python with the given path.
         """
-        json_file = open(file_path, "w")
-        json.dump(self._raw_dict, json_file)
-        json_file.close()
+        data = json.dumps(self._raw_dict, default=_json_default).encode()
+        _write_file_atomically(file_path, data)
         return None
 
+    def validate(self) -> list[str]:
+        """
+        Check the whole database against the schema in one pass.\n
+        Returns "node path: message" of every violation, e.g. "animes/3/views/2/duration: duration must be a list of ...",
+          it's empty if the database is valid.
+        """
+        with self._lock:
+            return _find_violations(self._raw_dict)
+
+
+    def enable_autosave(self, file_path:str, interval:float=5.0, max_changes:int=100) -> Autosaver:
+        """
+        Save the database to `file_path` in a background thread after it's changed.
+
+        A save happens `interval` seconds after the first unsaved change, or when there are `max_changes` unsaved changes.
+        Unsaved changes are saved when the autosaver is closed(disable_autosave, database.close) and when python exits.
+
+        Returns the Autosaver, see autosaver.stats for its metrics. An enabled autosave is disabled first.
+        """
+        if not isinstance(file_path, str):
+            raise TypeError("file_path must be a string")
+        if not isinstance(interval, (int, float)) or isinstance(interval, bool):
+            raise TypeError("interval must be a number")
+        if not isinstance(max_changes, int) or isinstance(max_changes, bool):
+            raise TypeError("max_changes must be a integer")
+        if interval <= 0 or max_changes <= 0:
+            raise ValueError("interval and max_changes must be positive")
+        from .autosave import Autosaver  # autosave.py imports this module
+
+        self.disable_autosave()
+        with self._lock:
+            self._autosaver = Autosaver(self, file_path, interval, max_changes)
+        return self._autosaver
+
+    def disable_autosave(self) -> None:
+        """
+        Save the unsaved changes and stop autosaving. It will do nothing if autosave is not enabled.
+        """
+        if self._autosaver is not None:
+            self._autosaver.close()
+
+    def close(self) -> None:
+        """
+        Save the unsaved changes of autosave. The database can still be used after closing.
+        """
+        self.disable_autosave()
+
 
     def create_anime(self, title:str, aliases:tuple[str]=(), tags:tuple[str]=()) -> Anime:
         """
@@ -84,18 +696,9 @@ class Database:
         `tags`: A tuple of tags of the anime, each of the tag should be a string.
         """
         # Checking datatype of args
-        if not isinstance(title, str):
-            raise TypeError("title must be a string")
-        if not isinstance(aliases, (tuple)):
-            raise TypeError("aliases must be a tuple of strings")
-        for alias in aliases:
-            if not isinstance(alias, str):
-                raise TypeError("aliases must be a tuple of strings")
-        if not isinstance(tags, (tuple)):
-            raise TypeError("tags must be a tuple of strings")
-        for tag in tags:
-            if not isinstance(tag, str):
-                raise TypeError("tags must be a tuple of strings")
+        _validate("Anime", "title", title)
+        _validate("Anime", "aliases", aliases)
+        _validate("Anime", "tags", tags)
 
 
         # Checking whether the inputed title and aliases unique or not
@@ -117,41 +720,253 @@ class Database:
             "_class": "Anime",
             "title": title,
             "aliases": list(aliases),
-            "tags": list(tags),
+            "tags": _intern_list(tags),
             "views": {"_last_view_id": 0,
-                      "_view_objects": {}}}
-        self._last_anime_id += 1
-        self._raw_dict["animes"]["_anime_objects"][self._last_anime_id] = new_anime_object
+                      "_view_objects": {}},
+            "episodes": {"_last_episode_id": 0,
+                         "_episode_objects": {}}}
+        event = ChangeEvent("create", "Anime", (self._last_anime_id + 1,), new=new_anime_object)
+        with self._mutating(self._last_anime_id + 1, event):
+            self._last_anime_id += 1
+            self._raw_dict["animes"]["_anime_objects"][self._last_anime_id] = new_anime_object
 
-        # Register anime title and aliases to the anime_name_catalog
-        self.anime_name_catalog[title] = self._last_anime_id
-        for alias in aliases:
-            self.anime_name_catalog[alias] = self._last_anime_id
+            # Register anime title and aliases to the catalogs
+            self._register_names(self._last_anime_id, (title, *aliases))
+            self._register_tags(self._last_anime_id, new_anime_object["tags"])
+            self._activity_changed()
+            self._page_keys_changed()
         
         #return Anime instance
         return Anime(self, self._last_anime_id)
 
-    def get_anime(self, name:str) -> Anime|None:
+    def get_anime(self, name:str, normalized:bool=False) -> Anime|None:
         """
         "name" can be title or alias \n
-        Returns an Anime instance if the name is in the database, otherwise, returns None.
+        Returns an Anime instance if the name is in the database, otherwise, returns None.\n
+        If `normalized` is True and the name is not found, the name is compared after normalization(see Database(name_normalization=)),
+          e.g. "ＳＰＹ×ＦＡＭＩＬＹ", "Spy×Family" and "SPY × FAMILY" are the same by default. It's O(1) too.
+          Raises AmbiguousAnimeNameError if more than one anime has the normalized name.
         """
         if name in self.anime_name_catalog:
             return Anime(self, self.anime_name_catalog[name])
-        else:
+        if normalized and isinstance(name, str):
+            return self._get_anime_by_normalized_name(name)
+        return None
+
+    def _get_anime_by_normalized_name(self, name:str) -> Anime|None:
+        counts = self._normalized_name_catalog.get(_normalize_name(name, self._name_normalization))
+        if not counts:
             return None
+        if len(counts) > 1:
+            titles = ", ".join(repr(self._raw_dict["animes"]["_anime_objects"][anime_id]["title"]) for anime_id in counts)
+            raise AmbiguousAnimeNameError(f"the name '{name}' matches more than one anime after normalization: {titles}")
+        return Anime(self, next(iter(counts)))
+
+    def normalize_name(self, name:str) -> str:
+        """
+        Returns the name after the normalization of the database, names with the same result are the same for get_anime(name, normalized=True).
+        """
+        if not isinstance(name, str):
+            raise TypeError("name must be a string")
+        return _normalize_name(name, self._name_normalization)
+
+    def name_collisions(self) -> dict[str, tuple[Anime]]:
+        """
+        Returns {normalized name: tuple of the animes having it} for the normalized names shared by more than one anime.
+        """
+        catalog = self._normalized_name_catalog
+        return {key: tuple(Anime(self, anime_id) for anime_id in catalog[key]) for key in sorted(self._name_collisions)}
 
     def get_all_animes(self) -> tuple[Anime]:
         """
         Returns a tuple of all animes in the database
         """
-        rtn = tuple(Anime(self,anime_id) for anime_id in self._raw_dict["animes"]["_anime_objects"])
+        rtn = tuple(self.iter_animes())
         return rtn
 
+    def iter_animes(self):
+        """
+        Yields the animes in the database one by one, without building a tuple of all of them.\n
+        warning: Don't create or remove animes while iterating, use get_all_animes instead.
+        """
+        for anime_id in self._raw_dict["animes"]["_anime_objects"]:
+            yield Anime(self, anime_id)
+
+    def iter_all_reviews(self):
+        """
+        Yields every review in the database, anime by anime and view by view.\n
+        warning: Don't create or remove animes, views or reviews while iterating.
+        """
+        for anime_id, anime_object in self._raw_dict["animes"]["_anime_objects"].items():
+            anime = None  # wrappers are only created for animes and views which have reviews
+            for view_id, view_object in anime_object["views"]["_view_objects"].items():
+                view = None
+                for review_id in view_object["reviews"]["_review_objects"]:
+                    if view is None:
+                        anime = anime or Anime(self, anime_id)
+                        view = View(self, anime, view_id)
+                    yield Review(self, anime, view, review_id)
+
+    def page_animes(self, after=None, limit:int=20, order_by:str="id") -> Page:
+        """
+        Returns a Page(items, next_cursor) of at most `limit` animes, ordered by `order_by`("id": creation order, or "title").\n
+        Use `after=None` for the first page and `after=page.next_cursor` for the next one.
+          Cursors stay valid when animes are created, renamed or removed between the pages.
+          With order_by="id", every anime which exists all the time is returned exactly once.
+          With order_by="title", it's only true for the animes which are not renamed: an anime renamed from after the cursor
+          to before it is skipped, and an anime renamed from before the cursor to after it is returned again.
+        """
+        if order_by not in _PAGE_ORDERS:
+            raise ValueError(f"order_by must be one of {_PAGE_ORDERS}")
+        if not isinstance(limit, int) or isinstance(limit, bool):
+            raise TypeError("limit must be a integer")
+        if limit <= 0:
+            raise ValueError("limit must be positive")
+
+        keys = self._page_keys.get(order_by)
+        if keys is None:
+            with self._lock:
+                anime_objects = self._raw_dict["animes"]["_anime_objects"]
+                if order_by == "id":
+                    # hint: animes are inserted in the order of their ids(ids are never reused), so the dict is already sorted,
+                    #       only a hand-edited file needs the sort.
+                    keys = list(anime_objects)
+                    if not all(map(operator.lt, keys, keys[1:])):
+                        keys.sort()
+                else:
+                    keys = sorted((anime_object["title"], anime_id) for anime_id, anime_object in anime_objects.items())
+                self._page_keys[order_by] = keys
+
+        if after is None:
+            start = 0
+        else:
+            try:
+                start = bisect_right(keys, tuple(after) if order_by == "title" else after)
+            except TypeError:
+                raise TypeError("after must be None or the next_cursor of a page with the same order_by")
+        page_keys = keys[start:start + limit]
+        if order_by == "id":
+            items = tuple(Anime(self, anime_id) for anime_id in page_keys)
+        else:
+            items = tuple(Anime(self, anime_id) for _, anime_id in page_keys)
+        next_cursor = page_keys[-1] if start + limit < len(keys) else None
+        return Page(items, next_cursor)
+
     def clear_anime(self) -> None:
         """
         remove all anime data in the Database object.
         """
         # hint: last_anime_id will not reset.
-        self.anime_name_catalog = {}
-        self._raw_dict["animes"]["_anime_objects"] = {}
\ No newline at end of file
+        with self._mutating(None, ChangeEvent("clear", "Database", (), "animes")):
+            self.anime_name_catalog = {}
+            self._tag_catalog = {}
+            self._loaded_normalized_name_catalog = {}
+            self._name_collisions = set()
+            self._raw_dict["animes"]["_anime_objects"] = {}
+            self._activity_changed()
+            self._page_keys_changed()
+
+    def delete_animes(self, animes) -> DeleteCounts:
+        """
+        Remove many animes and everything under them at once.\n
+        `animes`: a function `animes(anime) -> bool` choosing the animes to remove,
+          or an iterable of Anime objects and names(title or alias) of the animes. Animes which not exist are skipped.\n
+        Returns DeleteCounts(animes, views, reviews, episodes) of the removed nodes.
+        Subscribers receive the destroy events in one batch.
+        """
+        with self.batch():
+            anime_ids = _select_ids(animes, self._raw_dict["animes"]["_anime_objects"], lambda name: self.anime_name_catalog.get(name),
+                                    Anime, self, (), lambda anime_id: Anime(self, anime_id),
+                                    "animes must be a function or an iterable of Anime objects and names")
+            return _total([self._delete_anime(anime_id) for anime_id in anime_ids])
+
+    def _delete_anime(self, anime_id:int) -> DeleteCounts:
+        # removes an existing anime, used by delete_animes and anime.destory
+        anime_objects = self._raw_dict["animes"]["_anime_objects"]
+        anime_object = anime_objects[anime_id]
+        with self._mutating(anime_id, ChangeEvent("destroy", "Anime", (anime_id,), old=anime_object)):
+            anime_objects.pop(anime_id, None)  # it's moved to the snapshots sharing it, see _copy_on_write
+            self._unregister_names(anime_id, (anime_object["title"], *anime_object["aliases"]))
+            self._unregister_tags(anime_id, anime_object["tags"])
+            self._activity_changed()
+            self._page_keys_changed()
+        view_objects = anime_object["views"]["_view_objects"]
+        return DeleteCounts(animes=1, views=len(view_objects),
+                            reviews=sum(len(view_object["reviews"]["_review_objects"]) for view_object in view_objects.values()),
+                            episodes=len(anime_object["episodes"]["_episode_objects"]))
+
+
+    def episodes_per_day(self) -> dict[str, int]:
+        """
+        Returns {date-string: number of episodes watched on that day} over the detailed view records of all views, sorted by date.
+        """
+        days = array("l")
+        for anime_object in self._raw_dict["animes"]["_anime_objects"].values():
+            for view_object in anime_object["views"]["_view_objects"].values():
+                days.extend(view_object["detailed_view_record"].days)
+        return _episodes_per_day(days)
+
+    def binge_sessions(self, min_episodes:int=3, max_gap_days:int=0) -> tuple[tuple[View, BingeSession]]:
+        """
+        Find binge sessions of every view in the database, see view.binge_sessions.\n
+        Returns a tuple of (view, binge session), sorted by the start date of the sessions.
+        """
+        rtn = []
+        for anime_id, anime_object in self._raw_dict["animes"]["_anime_objects"].items():
+            anime = None
+            for view_id, view_object in anime_object["views"]["_view_objects"].items():
+                sessions = _binge_sessions(view_object["detailed_view_record"].days, min_episodes, max_gap_days)
+                if not sessions:
+                    continue
+                if anime is None:
+                    anime = Anime(self, anime_id)
+                view = View(self, anime, view_id)
+                rtn.extend((view, session) for session in sessions)
+        rtn.sort(key=lambda pair: pair[1].start_date)
+        return tuple(rtn)
+
+
+    def activity_timeseries(self, granularity:str="month", group_by:str|None=None, measure:str="views") -> dict:
+        """
+        Count watch activity by time.\n
+        `granularity`: "month" or "year".\n
+        `group_by`: None, "source", "is_new" or "tag". A view is counted under every tag of its anime,
+          and under None if the anime has no tag.\n
+        `measure`: "views" counts views, "times_view" sums view.times_view(null is counted as 0).\n
+        A view is active in every month of its duration, or in the month of its last_episode_date if the duration is not set.\n
+        Returns {period: value} if group_by is None, otherwise {group: {period: value}}.
+        Period is a month-string(yyyy-mm) or a year-string(yyyy), periods with no activity are omitted.\n
+        The result is cached until a view, a detailed view record, an anime or its tags is changed, don't modify it.
+        """
+        if granularity not in _GRANULARITIES:
+            raise ValueError(f"granularity must be one of {_GRANULARITIES}")
+        if group_by not in _GROUP_BYS:
+            raise ValueError(f"group_by must be one of {_GROUP_BYS}")
+        if measure not in _MEASURES:
+            raise ValueError(f"measure must be one of {_MEASURES}")
+
+        if self._activity_cache is None:
+            self._activity_cache = (_ActivityColumns(self._raw_dict), {})
+        columns, results = self._activity_cache
+        key = (granularity, group_by, measure)
+        if key not in results:
+            results[key] = columns.timeseries(granularity, group_by, measure)
+        return results[key]
+
+
+    def memory_report(self) -> dict[str, int]:
+        """
+        Returns an estimate of the bytes used by the database in memory, by node type:\n
+        "Database", "Anime", "View", "Review", "Episode", "Detailed View Record",
+        "strings"(every distinct string object, counted once even if it's shared by many nodes),
+        "catalogs"(the name and tag catalogs of the database) and "total".\n
+        hint: View, review and episode nodes are compact records instead of dicts, they use about 35% less memory,
+          but building them makes loading a file about 45% slower.
+        """
+        report = dict.fromkeys(("Database", "Anime", "View", "Review", "Episode", "Detailed View Record", "strings", "catalogs"), 0)
+        seen = set()
+        _add_memory_usage(report, self._raw_dict, "Database", seen)
+        _add_memory_usage(report, self.anime_name_catalog, "catalogs", seen)
+        _add_memory_usage(report, self._tag_catalog, "catalogs", seen)
+        report["total"] = sum(report.values())
+        return report
@@ -0,0 +1,251 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Optional, NamedTuple
+from array import array
+from collections import Counter
+
+from .exceptions import EpisodeRemovedError, RepeatedEpisodeNameError
+from ._funcs import _day_to_date_string
+from ._nodes import _EpisodeNode, _intern
+from ._validation import _validate
+from .changes import ChangeEvent
+
+if TYPE_CHECKING:
+    from .anime import Anime
+    from .database import Database
+
+
+class BingeSession(NamedTuple):
+    start_date: str  # date-string(yyyy-mm-dd)
+    end_date: str  # date-string(yyyy-mm-dd)
+    episode_count: int
+
+
+class _WatchRecord:
+    # The detailed view record of a view: which episode was watched on which day.
+    # important: It is stored as two array-backed columns instead of {episode-id: date-str},
+    #              episode_ids[i] was watched on days[i] (day number, see _date_string_to_day).
+    #            _positions is {episode-id: i} for O(1) lookups, it only has the watched episodes.
+    #              It's built on the first lookup, so loading a database doesn't pay for the records never read.
+    #            The order of the columns is not meaningful, discard moves the last record into the removed one.
+    __slots__ = ("episode_ids", "days", "_loaded_positions")
+
+    def __init__(self, episode_ids=(), days=()) -> None:
+        self.episode_ids = array("l", episode_ids)
+        self.days = array("l", days)
+        self._loaded_positions = None
+
+    @property
+    def _positions(self) -> dict[int, int]:
+        if self._loaded_positions is None:
+            self._loaded_positions = {episode_id: position for position, episode_id in enumerate(self.episode_ids)}
+        return self._loaded_positions
+
+    def __contains__(self, episode_id:int) -> bool:
+        return episode_id in self._positions
+
+    def __len__(self) -> int:
+        return len(self.episode_ids)
+
+    def get_day(self, episode_id:int) -> Optional[int]:
+        position = self._positions.get(episode_id)
+        if position is None:
+            return None
+        return self.days[position]
+
+    def set_day(self, episode_id:int, day:int) -> None:
+        position = self._positions.get(episode_id)
+        if position is not None:
+            self.days[position] = day
+        else:
+            self._positions[episode_id] = len(self.episode_ids)
+            self.episode_ids.append(episode_id)
+            self.days.append(day)
+
+    def discard(self, episode_id:int) -> None:
+        position = self._positions.pop(episode_id, None)
+        if position is None:
+            return None
+        last = len(self.episode_ids) - 1
+        if position != last:  # the last record fills the hole, so nothing after it is moved
+            moved_id = self.episode_ids[last]
+            self.episode_ids[position] = moved_id
+            self.days[position] = self.days[last]
+            self._positions[moved_id] = position
+        self.episode_ids.pop()
+        self.days.pop()
+
+    def clear(self) -> None:
+        self.episode_ids = array("l")
+        self.days = array("l")
+        self._loaded_positions = {}
+
+    def _to_json(self) -> dict:
+        return {"_class": "Detailed View Record",
+                "episodes": self.episode_ids.tolist(),
+                "days": self.days.tolist()}
+
+    @classmethod
+    def _from_json(cls, json_object:dict) -> _WatchRecord:
+        episode_ids = array("l", json_object["episodes"])
+        if episode_ids and min(episode_ids) <= 0:
+            raise ValueError("episode ids must be positive")
+        return cls(episode_ids, json_object["days"])
+
+
+def _episodes_per_day(days) -> dict:
+    # {date-str: number of episodes watched on that day}, sorted by date
+    counter = Counter(days)
+    return {_day_to_date_string(day): counter[day] for day in sorted(counter)}
+
+def _binge_sessions(days, min_episodes:int, max_gap_days:int) -> tuple[BingeSession]:
+    counter = Counter(days)
+    sessions = []
+    start = end = None
+    count = 0
+    for day in sorted(counter):
+        if start is not None and day - end <= max_gap_days:
+            end = day
+            count += counter[day]
+            continue
+        if start is not None and count >= min_episodes:
+            sessions.append(BingeSession(_day_to_date_string(start), _day_to_date_string(end), count))
+        start = end = day
+        count = counter[day]
+    if start is not None and count >= min_episodes:
+        sessions.append(BingeSession(_day_to_date_string(start), _day_to_date_string(end), count))
+    return tuple(sessions)
+
+
+class Episode:
+    __slots__ = ("_database", "_anime", "_id", "_node", "_node_generation")
+
+    def __init__(self, database:Database, anime:Anime, episode_id:int) -> None:
+        """
+        warning: Please create or get an Episode instance with anime.create_episode or anime.get_episode or anime.get_all_episodes\n
+                 Don't use Episode() directly!
+        """
+        self._database = database
+        self._anime = anime
+        self._id = episode_id
+        self._node = None  # see anime._anime_data
+        self._node_generation = -1
+
+
+    @property
+    def _episode_data(self) -> _EpisodeNode:
+        generation = self._database._anime_generations.get(self._anime._id, 0)
+        if generation != self._node_generation:
+            self._node = self._anime._anime_data["episodes"]["_episode_objects"][self._id]
+            self._node_generation = generation
+        return self._node
+
+    @property
+    def _path(self) -> tuple[int, int]:  # see ChangeEvent
+        return (self._anime._id, self._id)
+
+    def _checking_existence(self) -> None:
+        if self._anime._id not in self._database._raw_dict["animes"]["_anime_objects"]:
+            raise EpisodeRemovedError("the episode has been removed in the database.")
+        if self._id not in self._anime._anime_data["episodes"]["_episode_objects"]:
+            raise EpisodeRemovedError("the episode has been removed in the database.")
+
+
+    def __eq__(self, value: object) -> bool:
+        if not isinstance(value, Episode):
+            return False
+        if self._database is not value._database:
+            return False
+        if self._anime._id != value._anime._id:
+            return False
+        return self._id == value._id
+
+    def __hash__(self) -> int:
+        return hash((id(self._database), self._anime._id, "episode", self._id))
+
+
+    @property
+    def name(self) -> str:
+        self._checking_existence()
+        return self._episode_data.name
+
+    @name.setter
+    def name(self, new_name:str) -> None:
+        self._checking_existence()
+        _validate("Episode", "name", new_name)
+
+        old_name = self.name
+        if old_name == new_name:  # if the new name is same as the old one, do nothing.
+            return None
+        if new_name in self._anime._episode_name_catalog:
+            err_msg = f"Episode name should be unique under the anime, the new name '{new_name}' has existed in the episodes of the anime."
+            raise RepeatedEpisodeNameError(err_msg)
+
+        with self._database._mutating(self._anime._id, ChangeEvent("set", "Episode", self._path, "name", old_name, new_name)):
+            self._episode_data["name"] = new_name
+            self._anime._episode_name_catalog.pop(old_name)
+            self._anime._episode_name_catalog[new_name] = self._id
+
+
+    @property
+    def type(self) -> Optional[str]:
+        self._checking_existence()
+        return self._episode_data.type
+
+    @type.setter
+    def type(self, new_type:str|None) -> None:
+        self._checking_existence()
+        _validate("Episode", "type", new_type)
+        with self._database._mutating(self._anime._id, ChangeEvent("set", "Episode", self._path, "type", self._episode_data.type, new_type)):
+            self._episode_data["type"] = _intern(new_type)
+
+
+    @property
+    def minutes(self) -> Optional[int]:
+        """
+        The length of the episode in minutes, `None` if it's not set.
+        """
+        self._checking_existence()
+        if self._episode_data.length is None:
+            return None
+        return self._episode_data.length["minutes"]
+
+    @property
+    def is_precise(self) -> Optional[bool]:
+        """
+        Whether `minutes` is the precise length of the episode, `None` if the length is not set.
+        """
+        self._checking_existence()
+        if self._episode_data.length is None:
+            return None
+        return self._episode_data.length["is_precise"]
+
+    def set_length(self, minutes:int|None, is_precise:bool=True) -> None:
+        """
+        Set the length of the episode. Use `set_length(None)` to unset it.
+        """
+        self._checking_existence()
+        if minutes is None:
+            with self._database._mutating(self._anime._id, ChangeEvent("set", "Episode", self._path, "length", self._episode_data.length, None)):
+                self._episode_data["length"] = None
+            return None
+        _validate("Episode", "minutes", minutes)
+        _validate("Episode", "is_precise", is_precise)
+        event = ChangeEvent("set", "Episode", self._path, "length", self._episode_data.length, {"is_precise": is_precise, "minutes": minutes})
+        with self._database._mutating(self._anime._id, event):
+            self._episode_data["length"] = event.new
+
+
+    def destroy(self) -> None:
+        """
+        remove the episode itself from the anime. It will be removed from the detailed view record of every view too.
+        """
+        self._checking_existence()
+        with self._database._mutating(self._anime._id, ChangeEvent("destroy", "Episode", self._path, old=self._episode_data)):
+            # important: Nothing here may raise after the first change, so the lookups are done first.
+            anime_data = self._anime._anime_data
+            episode_object = anime_data["episodes"]["_episode_objects"].pop(self._id)
+            # the catalog of the Anime object may not know an episode created through another Anime object
+            self._anime._episode_name_catalog.pop(episode_object["name"], None)
+            for view_object in anime_data["views"]["_view_objects"].values():
+                view_object["detailed_view_record"].discard(self._id)
+            self._database._activity_changed()
@@ -3,6 +3,16 @@ class WrongDatabaseError(Exception):
     # The file is not Andson database, or the edition/version is not supported.
     pass
 
+class InvalidDatabaseError(Exception):
+    # The AnDson file doesn't follow the schema, see Database(file_path, validate=True).
+    # `errors` is the list of "node path: message" of every violation.
+    def __init__(self, errors:list[str]) -> None:
+        super().__init__(errors)
+        self.errors = errors
+
+    def __str__(self) -> str:
+        return f"{len(self.errors)} violation(s) in the database:\n" + "\n".join(self.errors)
+
 
 
 class AnimeRemovedError(Exception):
@@ -17,6 +27,10 @@ class ReviewRemovedError(Exception):
     # the review has been removed in the database
     pass
 
+class EpisodeRemovedError(Exception):
+    # the episode has been removed in the database
+    pass
+
 
 
 class RepeatedAnimeTitleError(Exception):
@@ -31,6 +45,20 @@ class RepeatedReviewTitleError(Exception):
     # Review title should be unique under each view
     pass
 
+class RepeatedEpisodeNameError(Exception):
+    # Episode name should be unique under each anime
+    pass
+
+class AmbiguousAnimeNameError(Exception):
+    # the normalized name matches more than one anime, see database.get_anime(name, normalized=True)
+    pass
+
+
+
+class ReadOnlyDatabaseError(Exception):
+    # the database can't be changed, e.g. it's a snapshot
+    pass
+
 
 
 class StringFormatError(Exception):
@@ -0,0 +1,67 @@
+from __future__ import annotations
+from collections.abc import Sequence
+from typing import Callable, Optional
+
+
+class ReadOnlyList(Sequence):
+    # An immutable view of a list stored in the database, returned by properties like anime.tags.
+    # important: It doesn't copy the list, len/iteration/indexing read the stored list directly,
+    #              so in-place changes (e.g. anime.add_tag) are visible through it.
+    #            Slicing and `+` return tuples, and it's accepted where a tuple is (e.g. anime.tags = anime.tags + ("new",)).
+    #            `contains` is an optional O(1) membership test backed by a catalog of the database.
+    #            Use to_tuple() if you need a snapshot which will not change.
+    __slots__ = ("_data", "_contains")
+
+    def __init__(self, data:list, contains:Optional[Callable[[object], bool]]=None) -> None:
+        self._data = data
+        self._contains = contains
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self._data[index])
+        return self._data[index]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __reversed__(self):
+        return reversed(self._data)
+
+    def __contains__(self, value) -> bool:
+        if self._contains is None:
+            return value in self._data
+        try:
+            return self._contains(value)
+        except TypeError:  # unhashable value can't be in a catalog
+            return False
+
+    def __eq__(self, value: object) -> bool:
+        if isinstance(value, ReadOnlyList):
+            return self._data == value._data
+        if isinstance(value, (tuple, list)):
+            return len(self._data) == len(value) and all(a == b for a, b in zip(self._data, value))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __add__(self, value):
+        if isinstance(value, (ReadOnlyList, tuple)):
+            return tuple(self._data) + tuple(value)
+        return NotImplemented
+
+    def __radd__(self, value):
+        if isinstance(value, tuple):
+            return value + tuple(self._data)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ReadOnlyList({self._data!r})"
+
+    def to_tuple(self) -> tuple:
+        """
+        Returns a tuple copy of the current items.
+        """
+        return tuple(self._data)
@@ -1,8 +1,11 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING, Optional
 
-from .exceptions import ReviewRemovedError, RepeatedReviewTitleError, NotAvailableRankingError
-from ._funcs import _is_available_ranking
+from .exceptions import ReviewRemovedError, RepeatedReviewTitleError
+from ._validation import _validate, _validate_item
+from ._nodes import _ReviewNode, _intern, _episode_range
+from .readonly import ReadOnlyList
+from .changes import ChangeEvent
 
 if TYPE_CHECKING:
     from .view import View
@@ -11,6 +14,8 @@ if TYPE_CHECKING:
 
 
 class Review:
+    __slots__ = ("_database", "_anime", "_view", "_id", "_node", "_node_generation")
+
     def __init__(self, database:Database, anime:Anime, view:View, review_id:str) -> None:
         """
         warning: Please create or get a Review instance with view.add_review or view.get_ewview or view.get_all_reviews\n
@@ -20,16 +25,28 @@ class Review:
         self._anime = anime
         self._view = view
         self._id = review_id
+        self._node = None  # see anime._anime_data
+        self._node_generation = -1
+
 
-        self._review_data = self._view._view_data["reviews"]["_review_objects"][self._id]
+    @property
+    def _review_data(self) -> _ReviewNode:
+        generation = self._database._anime_generations.get(self._anime._id, 0)
+        if generation != self._node_generation:
+            self._node = self._view._view_data.reviews["_review_objects"][self._id]
+            self._node_generation = generation
+        return self._node
 
+    @property
+    def _path(self) -> tuple[int, int, int]:  # see ChangeEvent
+        return (self._anime._id, self._view._id, self._id)
 
     def _checking_existence(self) -> None:
         if self._anime._id not in self._database._raw_dict["animes"]["_anime_objects"]:
             raise ReviewRemovedError("the review has been removed in the database.")
         if self._view._id not in self._anime._anime_data["views"]["_view_objects"]:
             raise ReviewRemovedError("the review has been removed in the database.")
-        if self._id not in self._view._view_data["reviews"]["_review_objects"]:
+        if self._id not in self._view._view_data.reviews["_review_objects"]:
             raise ReviewRemovedError("the review has been removed in the database.")
         
 
@@ -51,13 +68,12 @@ class Review:
     @property
     def title(self) -> str:
         self._checking_existence()
-        return self._review_data["title"]
+        return self._review_data.title
     
     @title.setter
     def title(self, new_title:str) -> None:
         self._checking_existence()
-        if not isinstance(new_title, str):
-            raise TypeError("title must be a string")
+        _validate("Review", "title", new_title)
 
         old_title = self.title
         if old_title == new_title:  # if the new title is same as the old one, do nothing.
@@ -66,92 +82,96 @@ class Review:
             err_msg = f"Review title should be unique under the view, the new title '{new_title}' has existed in the reviews of the view."
             raise RepeatedReviewTitleError(err_msg)
 
-        self._review_data["title"] = new_title
-        self._view._review_title_catalog.pop(old_title)
-        self._view._review_title_catalog[new_title] = self._id
+        with self._database._mutating(self._anime._id, ChangeEvent("set", "Review", self._path, "title", old_title, new_title)):
+            self._review_data["title"] = new_title
+            self._view._review_title_catalog.pop(old_title)
+            self._view._review_title_catalog[new_title] = self._id
 
     
     @property
     def item(self) -> Optional[str]:
         self._checking_existence()
-        return self._review_data["item"]
+        return self._review_data.item
     
     @item.setter
     def item(self, new_item: str|None) -> None:
         self._checking_existence()
-        if new_item is not None:
-            if not isinstance(new_item, str):
-                raise TypeError("item must be a string or None.")
-        self._review_data["item"] = new_item
+        _validate("Review", "item", new_item)
+        with self._database._mutating(self._anime._id, ChangeEvent("set", "Review", self._path, "item", self._review_data.item, new_item)):
+            self._review_data["item"] = _intern(new_item)
 
     
     @property
-    def episode_range(self) -> Optional[tuple[str]]:
+    def episode_range(self) -> Optional[ReadOnlyList]:
+        """
+        A read-only view of the episode range, or None if it's not set(means all). Use review.episode_range.to_tuple() for a copy.
+        """
         self._checking_existence()
-        return tuple(self._review_data["episode_range"])
+        if self._review_data.episode_range is None:
+            return None
+        return ReadOnlyList(self._review_data.episode_range)
 
     @episode_range.setter
     def episode_range(self, new_range):
-        self._checking_existence
-        if not isinstance(new_range, tuple):
-            raise TypeError("episode_range must be a tuple of strings")
-        for episode in new_range:
-            if not isinstance(episode, str):
-                raise TypeError("episode_range must be a tuple of strings")
-        self._review_data["episode_range"] = list(new_range)
+        self._checking_existence()
+        _validate("Review", "episode_range", new_range)
+        event = ChangeEvent("set", "Review", self._path, "episode_range", self._review_data.episode_range, _episode_range(new_range))
+        with self._database._mutating(self._anime._id, event):
+            self._review_data["episode_range"] = event.new
 
     def episode_range_add(self, new_range: str) -> None:
         """
         Add new episode into episode_range.\n
         the argument new_range is the name of the new episode, it must be a string.\n
-        If the new_range has existed in episode_range, it will do nothing.
+        If the new_range has existed in episode_range, or episode_range is None(all episodes), it will do nothing.
         """
         self._checking_existence()
-        if not isinstance(new_range, str):
-            raise TypeError("new_range must be a string")
+        _validate_item("Review", "episode_range", new_range, "new_range")
         
-        if new_range in self._review_data["episode_range"]:
+        episode_range = self._review_data.episode_range
+        if episode_range is None or new_range in episode_range:  # O(1), see _EpisodeRange
             return None
-        self._review_data["episode_range"].append(new_range)
+        with self._database._mutating(self._anime._id, ChangeEvent("add", "Review", self._path, "episode_range", new=new_range)):
+            self._review_data.episode_range.append(_intern(new_range))
 
     def episode_range_remove(self, episode_name:str) -> None:
         """
         Remove an episode from episode_range by the given episode_name.\n
         if the episode_name not exists in review.episode_range, it will do nothing.\n
-        wrong datatype of the argument will not raise any exception but be viewed as it not exists in review.episode_range.
+        wrong datatype of the argument will not raise any exception but be viewed as it not exists in review.episode_range.\n
+        Raises ValueError if episode_range is None(all episodes), set it with a tuple of episode names first.
         """
         self._checking_existence()
-        self._review_data["episode_range"].remove(episode_name)
+        if self._review_data.episode_range is None:
+            raise ValueError("episode_range is None(all episodes), an episode can't be removed from it.")
+        with self._database._mutating(self._anime._id, ChangeEvent("remove", "Review", self._path, "episode_range", old=episode_name)):
+            self._review_data.episode_range.remove(episode_name)
 
 
     @property
     def ranking(self) -> Optional[int]:
         self._checking_existence()
-        return self._review_data["ranking"]
+        return self._review_data.ranking
     
     @ranking.setter
     def ranking(self, new_ranking: int|None) -> None:
         self._checking_existence()
-        if new_ranking is not None:
-            if not isinstance(new_ranking, int):
-                raise TypeError("ranking must be a integer between 0 and 10.")
-            if not _is_available_ranking(new_ranking):
-                raise NotAvailableRankingError("ranking must be a integer between 0 and 10.")
-        self._review_data["ranking"] = new_ranking
+        _validate("Review", "ranking", new_ranking)
+        with self._database._mutating(self._anime._id, ChangeEvent("set", "Review", self._path, "ranking", self._review_data.ranking, new_ranking)):
+            self._review_data["ranking"] = new_ranking
 
     
     @property
     def comment(self) -> Optional[str]:
         self._checking_existence()
-        return self._review_data["comment"]
+        return self._review_data.comment
     
     @comment.setter
     def comment(self, new_comment: str|None) -> None:
         self._checking_existence()
-        if new_comment is not None:
-            if not isinstance(new_comment, str):
-                raise TypeError("comment must be a string")
-        self._review_data["comment"] = new_comment
+        _validate("Review", "comment", new_comment)
+        with self._database._mutating(self._anime._id, ChangeEvent("set", "Review", self._path, "comment", self._review_data.comment, new_comment)):
+            self._review_data["comment"] = new_comment
 
 
     def destroy(self) -> None:
@@ -159,5 +179,4 @@ class Review:
         remove the review itself from the database
         """
         self._checking_existence()
-        self._view._review_title_catalog.pop(self._review_data["title"])
-        self._view["reviews"]["_review_objects"].pop(self._id)
+        self._view._delete_review(self._id)
@@ -0,0 +1,271 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Optional
+
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from .exceptions import AmbiguousAnimeNameError
+
+if TYPE_CHECKING:
+    from .database import Database
+    from .anime import Anime
+    from .view import View
+    from .review import Review
+
+
+# GET endpoints, names and titles in the path are url-encoded:
+#   /                                                  summary of the database
+#   /animes?after=&limit=&order_by=                    a page of animes, `after` is the json of the next_cursor of the last page
+#   /animes/<name>                                     an anime by title or alias(normalized, see database.get_anime)
+#   /animes/<name>/similar?k=                          similar animes
+#   /animes/<name>/views/<title>                       a view
+#   /animes/<name>/views/<title>/reviews/<title>       a review
+#   /search?q=                                         animes having a name which contains q after normalization
+#   /stats/activity?granularity=&group_by=&measure=    database.activity_timeseries
+#   /stats/episodes_per_day                            database.episodes_per_day
+_MAX_CACHED_RESPONSES = 1024
+
+
+class _HTTPError(Exception):
+    def __init__(self, status:int, message:str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+def _anime_json(anime:Anime) -> dict:
+    return {"title": anime.title,
+            "aliases": list(anime.aliases),
+            "tags": list(anime.tags),
+            "views": [view.title for view in anime.iter_views()],
+            "episodes": [{"name": episode.name, "type": episode.type, "minutes": episode.minutes, "is_precise": episode.is_precise}
+                         for episode in anime.get_all_episodes()]}
+
+def _view_json(view:View) -> dict:
+    return {"title": view.title,
+            "is_new": view.is_new,
+            "times_view": view.times_view,
+            "source": view.source,
+            "episode_range": None if view.episode_range is None else list(view.episode_range),
+            "duration": None if view.duration is None else list(view.duration),
+            "last_episode_date": view.last_episode_date,
+            "watched_episodes": [[episode.name, date] for episode, date in view.watched_episodes],
+            "reviews": [review.title for review in view.iter_reviews()]}
+
+def _review_json(review:Review) -> dict:
+    return {"title": review.title,
+            "item": review.item,
+            "episode_range": None if review.episode_range is None else list(review.episode_range),
+            "ranking": review.ranking,
+            "comment": review.comment}
+
+
+def _query_value(query:dict, key:str, default:Optional[str]=None) -> Optional[str]:
+    return query.get(key, [default])[-1]
+
+def _query_int(query:dict, key:str, default:int) -> int:
+    value = _query_value(query, key)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise _HTTPError(400, f"{key} must be a integer")
+
+
+def _get_anime(database:Database, name:str) -> Anime:
+    try:
+        anime = database.get_anime(name, normalized=True)
+    except AmbiguousAnimeNameError as error:
+        raise _HTTPError(409, str(error))
+    if anime is None:
+        raise _HTTPError(404, f"the anime '{name}' not exists in the database.")
+    return anime
+
+def _get_view(anime:Anime, title:str) -> View:
+    view = anime.get_view(title)
+    if view is None:
+        raise _HTTPError(404, f"the view '{title}' not exists in the anime.")
+    return view
+
+def _route(database:Database, path:str, query:dict):
+    # returns the json-like value of a GET request
+    parts = [unquote(part) for part in path.strip("/").split("/")] if path.strip("/") else []
+    if not parts:
+        return {"edition": database._raw_dict["_edition"],
+                "version": database._raw_dict["_version"],
+                "anime_count": len(database._raw_dict["animes"]["_anime_objects"])}
+
+    if parts[0] == "animes":
+        if len(parts) == 1:
+            after = _query_value(query, "after")
+            try:
+                after = None if after is None else json.loads(after)
+                page = database.page_animes(after=after, limit=_query_int(query, "limit", 20), order_by=_query_value(query, "order_by", "id"))
+            except (ValueError, TypeError) as error:
+                raise _HTTPError(400, str(error))
+            return {"items": [anime.title for anime in page.items], "next_cursor": page.next_cursor}
+        anime = _get_anime(database, parts[1])
+        if len(parts) == 2:
+            return _anime_json(anime)
+        if len(parts) == 3 and parts[2] == "similar":
+            try:
+                scores = anime.similar(k=_query_int(query, "k", 10))
+            except ValueError as error:
+                raise _HTTPError(400, str(error))
+            return [{"title": similar_anime.title, "score": score} for similar_anime, score in scores]
+        if len(parts) >= 4 and parts[2] == "views":
+            view = _get_view(anime, parts[3])
+            if len(parts) == 4:
+                return _view_json(view)
+            if len(parts) == 6 and parts[4] == "reviews":
+                review = view.get_review(parts[5])
+                if review is None:
+                    raise _HTTPError(404, f"the review '{parts[5]}' not exists in the view.")
+                return _review_json(review)
+
+    elif parts == ["search"]:
+        keyword = database.normalize_name(_query_value(query, "q", ""))
+        anime_ids = set()
+        for key, counts in database._normalized_name_catalog.items():
+            if keyword in key:
+                anime_ids.update(counts)
+        anime_objects = database._raw_dict["animes"]["_anime_objects"]
+        return sorted(anime_objects[anime_id]["title"] for anime_id in anime_ids)
+
+    elif parts == ["stats", "activity"]:
+        try:
+            return database.activity_timeseries(granularity=_query_value(query, "granularity", "month"),
+                                                group_by=_query_value(query, "group_by"),
+                                                measure=_query_value(query, "measure", "views"))
+        except ValueError as error:
+            raise _HTTPError(400, str(error))
+
+    elif parts == ["stats", "episodes_per_day"]:
+        return database.episodes_per_day()
+
+    raise _HTTPError(404, f"no endpoint for '{path}'")
+
+
+def _etag_matches(if_none_match:Optional[str], etag:str) -> bool:
+    if if_none_match is None:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):  # weak comparison
+            candidate = candidate[2:]
+        if candidate == etag or candidate == "*":
+            return True
+    return False
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: AnDsonServer
+
+    def do_GET(self) -> None:
+        status, etag, body = self.server._get_response(self.path)
+        if etag is not None and _etag_matches(self.headers.get("If-None-Match"), etag):
+            self.server._count("not_modified")
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return None
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")  # clients should revalidate with the ETag
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format:str, *args) -> None:
+        if not self.server._quiet:
+            super().log_message(format, *args)
+
+
+class AnDsonServer(ThreadingHTTPServer):
+    # A read-only http server of a Database, created by make_server. Requests are handled in threads.
+    # important: Responses are rendered while holding the database lock, so a response never sees a half-done change.
+    #            A rendered response is cached until the database is changed(see database._version),
+    #              and its ETag is the hash of the body, so `If-None-Match` gets a 304 as long as the data is the same.
+    daemon_threads = True
+
+    def __init__(self, database:Database, address:tuple[str, int], quiet:bool=True) -> None:
+        """
+        warning: Please use make_server() to create an AnDsonServer.
+        """
+        self._database = database
+        self._quiet = quiet
+        self._cache = {}  # {request target: (database version, status, etag, body)}
+        self._cache_lock = threading.Lock()
+        self._counts = {"requests": 0, "cache_hits": 0, "not_modified": 0}
+        super().__init__(address, _RequestHandler)
+
+    def _count(self, name:str) -> None:
+        with self._cache_lock:
+            self._counts[name] += 1
+
+    def _get_response(self, target:str) -> tuple[int, Optional[str], bytes]:
+        self._count("requests")
+        with self._cache_lock:
+            cached = self._cache.get(target)
+        if cached is not None and cached[0] == self._database._version:
+            self._count("cache_hits")
+            return cached[1:]
+
+        url = urlsplit(target)
+        with self._database._lock:
+            version = self._database._version
+            try:
+                status, value = 200, _route(self._database, url.path, parse_qs(url.query))
+            except _HTTPError as error:
+                status, value = error.status, {"error": str(error)}
+            except Exception as error:  # a bug, it's not cached
+                body = json.dumps({"error": f"{type(error).__name__}: {error}"}, ensure_ascii=False).encode()
+                return 500, None, body
+        body = json.dumps(value, ensure_ascii=False).encode()
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"' if status == 200 else None
+
+        with self._cache_lock:
+            if len(self._cache) >= _MAX_CACHED_RESPONSES and target not in self._cache:
+                self._cache.pop(next(iter(self._cache)))  # the oldest one
+            self._cache[target] = (version, status, etag, body)
+        return status, etag, body
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """
+        Returns {"requests", "cache_hits", "not_modified", "cached_responses"}.
+        """
+        with self._cache_lock:
+            return {**self._counts, "cached_responses": len(self._cache)}
+
+
+def make_server(database:Database, host:str="127.0.0.1", port:int=8000, quiet:bool=True) -> AnDsonServer:
+    """
+    Create a read-only http server which serves the database as json, see the endpoints in server.py.\n
+    Use `port=0` to get a free port(server.url). Run it with server.serve_forever(), e.g. in a thread,
+      and stop it with server.shutdown() and server.server_close().\n
+    The database can still be changed while it's served, responses are updated after the change.
+    """
+    return AnDsonServer(database, (host, port), quiet=quiet)
+
+def serve(database:Database, host:str="127.0.0.1", port:int=8000, quiet:bool=False) -> None:
+    """
+    Serve the database until the process is interrupted(Ctrl+C), see make_server.
+    """
+    server = make_server(database, host, port, quiet=quiet)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
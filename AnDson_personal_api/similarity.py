@@ -0,0 +1,111 @@
+from __future__ import annotations
+from hashlib import blake2b
+from random import Random
+
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _anime_features(anime_object:dict, include_reviews:bool) -> set:
+    # tags of the anime, and optionally the item/ranking profile of its reviews
+    features = {("tag", tag) for tag in anime_object["tags"]}
+    if include_reviews:
+        rankings = {}  # {item: [ranking]}
+        for view_object in anime_object["views"]["_view_objects"].values():
+            for review_object in view_object["reviews"]["_review_objects"].values():
+                if review_object["item"] is None or review_object["ranking"] is None:
+                    continue
+                rankings.setdefault(review_object["item"], []).append(review_object["ranking"])
+        for item, item_rankings in rankings.items():
+            # the mean ranking is bucketed by 2 so that close rankings share a feature
+            features.add(("ranking", item, round(sum(item_rankings) / len(item_rankings) / 2)))
+    return features
+
+def _feature_hash(feature:tuple) -> int:
+    # must be stable between processes, so the built-in hash() is not used
+    return int.from_bytes(blake2b(repr(feature).encode(), digest_size=4).digest(), "little")
+
+
+class _SimilarityIndex:
+    # MinHash signatures of the features of every anime, with locality-sensitive hashing buckets.
+    # important: Two animes whose signatures agree on every row of any band share a bucket,
+    #              so a query only scores the animes in its buckets instead of the whole database.
+    #            The index is updated lazily: mutations mark animes dirty and only the dirty ones are re-hashed.
+    def __init__(self, include_reviews:bool, num_perm:int=64, bands:int=16) -> None:
+        self._include_reviews = include_reviews
+        self._rows = num_perm // bands
+        random = Random(num_perm)
+        self._permutations = [(random.randrange(1, _MERSENNE_PRIME), random.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)]
+        self._signatures = {}  # {anime-id: signature}
+        self._buckets = [{} for _ in range(bands)]  # [{band of signature: {anime-id}}]
+        self._dirty = set()
+        self._all_dirty = True
+
+    def _signature(self, features:set) -> tuple[int]:
+        hashes = [_feature_hash(feature) for feature in features]
+        return tuple(min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in hashes) for a, b in self._permutations)
+
+    def _bands(self, signature:tuple[int]):
+        for band_index in range(len(self._buckets)):
+            yield band_index, signature[band_index * self._rows:(band_index + 1) * self._rows]
+
+    def _remove(self, anime_id:int) -> None:
+        signature = self._signatures.pop(anime_id, None)
+        if signature is None:
+            return None
+        for band_index, band in self._bands(signature):
+            bucket = self._buckets[band_index][band]
+            bucket.discard(anime_id)
+            if not bucket:
+                del self._buckets[band_index][band]
+
+    def _insert(self, anime_id:int, anime_object:dict) -> None:
+        features = _anime_features(anime_object, self._include_reviews)
+        if not features:  # nothing to compare with
+            return None
+        signature = self._signature(features)
+        self._signatures[anime_id] = signature
+        for band_index, band in self._bands(signature):
+            self._buckets[band_index].setdefault(band, set()).add(anime_id)
+
+    def mark_dirty(self, anime_id:int|None) -> None:
+        # anime_id None means every anime may have changed
+        if anime_id is None:
+            self._all_dirty = True
+        else:
+            self._dirty.add(anime_id)
+
+    def _refresh(self, anime_objects:dict) -> None:
+        if self._all_dirty:
+            self._signatures = {}
+            self._buckets = [{} for _ in self._buckets]
+            for anime_id, anime_object in anime_objects.items():
+                self._insert(anime_id, anime_object)
+            self._all_dirty = False
+            self._dirty = set()
+            return None
+        for anime_id in self._dirty:
+            self._remove(anime_id)
+            if anime_id in anime_objects:
+                self._insert(anime_id, anime_objects[anime_id])
+        self._dirty = set()
+
+    def query(self, anime_objects:dict, anime_id:int, k:int) -> list[tuple[int, float]]:
+        # Returns at most k (anime-id, approximate jaccard similarity), the most similar first.
+        self._refresh(anime_objects)
+        signature = self._signatures.get(anime_id)
+        if signature is None:
+            return []
+        candidates = set()
+        for band_index, band in self._bands(signature):
+            candidates |= self._buckets[band_index][band]
+        candidates.discard(anime_id)
+
+        scores = []
+        for candidate in candidates:
+            other = self._signatures[candidate]
+            same = sum(1 for row, other_row in zip(signature, other) if row == other_row)
+            scores.append((candidate, same / len(signature)))
+        scores.sort(key=lambda pair: (-pair[1], pair[0]))
+        return scores[:k]
@@ -0,0 +1,144 @@
+from __future__ import annotations
+import threading
+from collections.abc import Mapping
+
+from .database import Database, _ABSENT, _add_memory_usage
+from .anime import Anime
+from .exceptions import ReadOnlyDatabaseError
+
+
+class _SnapshotAnimeObjects(Mapping):
+    # {anime-id: anime-object} of a snapshot: the animes preserved by writers, otherwise the live ones.
+    # important: A writer always stores the old anime object in _preserved before it replaces/removes it in the database,
+    #              so reading the live dict first and _preserved second never returns a changed anime object.
+    # warning: It must not reference the snapshot, or the snapshot would be in a reference cycle
+    #          and stay in database._snapshots(still copied for by the writers) until the cyclic gc runs.
+    def __init__(self, database:Database, preserved:dict) -> None:
+        self._database = database
+        self._preserved = preserved
+
+    def _live_objects(self) -> dict:
+        return self._database._raw_dict["animes"]["_anime_objects"]
+
+    def __getitem__(self, anime_id):
+        anime_object = self._live_objects().get(anime_id, _ABSENT)
+        anime_object = self._preserved.get(anime_id, anime_object)
+        if anime_object is _ABSENT:
+            raise KeyError(anime_id)
+        return anime_object
+
+    def __contains__(self, anime_id) -> bool:
+        try:
+            self[anime_id]
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __iter__(self):
+        anime_ids = set(list(self._live_objects()))  # list() of a dict is atomic, it can't see a half-done change
+        anime_ids.update(list(self._preserved))
+        for anime_id in sorted(anime_ids):
+            if anime_id in self:
+                yield anime_id
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class Snapshot(Database):
+    # A point-in-time, read-only view of a Database, created by database.snapshot() in O(1).
+    # important: It shares every anime object with the database. The first change of an anime after the snapshot was taken
+    #              moves the old anime object to the snapshot(_preserved) and puts a copy into the database,
+    #              so writers only pay for the animes they change and readers never see a half-done change.
+    #            The database only keeps weak references of its snapshots, a snapshot is released when it's dropped.
+    def __init__(self, database:Database) -> None:
+        """
+        warning: Please use database.snapshot() to create a Snapshot. Don't use Snapshot() directly!
+        """
+        self._database = database
+        self._preserved = {}  # {anime-id: anime-object when the snapshot was taken | _ABSENT}
+        self._raw_dict = {
+            "_edition": database._raw_dict["_edition"],
+            "_version": database._raw_dict["_version"],
+            "animes": {"_last_anime_id": database._last_anime_id,
+                       "_anime_objects": _SnapshotAnimeObjects(database, self._preserved)}}
+        self._anime_name_catalog = None
+        self._loaded_tag_catalog = None
+        self._name_normalization = database._name_normalization
+        self._loaded_normalized_name_catalog = None  # built from the snapshot on the first access
+        self._name_collisions = set()
+
+        self._version = 0  # a snapshot never changes
+        self._activity_cache = None
+        self._similarity_indexes = {}
+        self._anime_generations = {}  # a snapshot never replaces an anime object
+        self._page_keys = {}
+        self._lock = threading.RLock()  # nothing changes a snapshot, it's only for the readers shared with Database
+        self._autosaver = None
+        self._subscribers = []  # batch() is shared with Database, a change inside it still raises ReadOnlyDatabaseError
+        self._batch_depth = 0
+        self._pending_events = []
+
+
+    def _preserve(self, anime_id:int, anime_object) -> None:
+        # called by the writer before the anime is changed
+        if anime_id not in self._preserved:
+            self._preserved[anime_id] = anime_object
+
+    @property
+    def anime_name_catalog(self) -> dict:
+        # built on the first access only, get_anime doesn't need it
+        if self._anime_name_catalog is None:
+            anime_name_catalog = {}
+            for anime_id, anime_object in self._raw_dict["animes"]["_anime_objects"].items():
+                anime_name_catalog[anime_object["title"]] = anime_id
+                for alias in anime_object["aliases"]:
+                    anime_name_catalog[alias] = anime_id
+            self._anime_name_catalog = anime_name_catalog
+        return self._anime_name_catalog
+
+    def _mutating(self, anime_id:int|None=None, *events):
+        raise ReadOnlyDatabaseError("a snapshot is read-only, change the database instead.")
+
+    def _has_tag(self, anime_id:int, tag:str) -> bool:
+        return tag in self._raw_dict["animes"]["_anime_objects"][anime_id]["tags"]
+
+    def snapshot(self) -> Snapshot:
+        """
+        A snapshot never changes, so it's its own snapshot.
+        """
+        return self
+
+
+    def get_anime(self, name:str, normalized:bool=False) -> Anime|None:
+        """
+        "name" can be title or alias \n
+        Returns an Anime instance of the snapshot if the name is in the snapshot, otherwise, returns None.\n
+        See database.get_anime for `normalized`.
+        """
+        anime_objects = self._raw_dict["animes"]["_anime_objects"]
+        # an unchanged anime still has the same names in the database
+        anime_id = self._database.anime_name_catalog.get(name)
+        if anime_id is not None and anime_id not in self._preserved and anime_id in anime_objects:
+            return Anime(self, anime_id)
+        # the names of changed animes are only in the preserved anime objects
+        for anime_id, anime_object in list(self._preserved.items()):
+            if anime_object is _ABSENT:
+                continue
+            if anime_object["title"] == name or name in anime_object["aliases"]:
+                return Anime(self, anime_id)
+        if normalized and isinstance(name, str):
+            return self._get_anime_by_normalized_name(name)
+        return None
+
+    def memory_report(self) -> dict[str, int]:
+        """
+        Returns an estimate of the bytes only kept alive by the snapshot(the anime objects preserved for it), by node type.
+        """
+        report = dict.fromkeys(("Database", "Anime", "View", "Review", "Episode", "Detailed View Record", "strings", "catalogs"), 0)
+        seen = set()
+        for anime_object in list(self._preserved.values()):
+            if anime_object is not _ABSENT:
+                _add_memory_usage(report, anime_object, "Anime", seen)
+        report["total"] = sum(report.values())
+        return report
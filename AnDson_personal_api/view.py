@@ -1,16 +1,24 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING, Optional
 
-from .exceptions import ViewRemovedError, RepeatedViewTitleError, StringFormatError, NotAvailableRankingError, RepeatedReviewTitleError
-from ._funcs import _is_date_string, _is_month_string, _is_available_ranking
+from .exceptions import ViewRemovedError, RepeatedViewTitleError, StringFormatError, RepeatedReviewTitleError, EpisodeRemovedError
+from ._funcs import _is_date_string, _date_string_to_day, _day_to_date_string
+from ._validation import _validate, _validate_item
 
 from .review import Review
+from ._nodes import _ViewNode, _ReviewNode, _intern, _intern_list, _episode_range
+from ._funcs import _select_ids
+from .readonly import ReadOnlyList
+from .changes import ChangeEvent, DeleteCounts, _total
+from .episode import Episode, BingeSession, _episodes_per_day, _binge_sessions
 if TYPE_CHECKING:
     from .anime import Anime
     from .database import Database
 
 
 class View():
+    __slots__ = ("_database", "_anime", "_id", "_loaded_review_title_catalog", "_node", "_node_generation")
+
     def __init__(self, database:Database, anime:Anime, view_id:int) -> None:
         """
         warning: Please create or get a View instance with anime.create_view or anime.get_view or anime.get_all_views\n
@@ -20,9 +28,34 @@ class View():
         self._anime = anime
         self._id = view_id
 
-        self._view_data = anime._anime_data["views"]["_view_objects"][self._id]
-        self._review_title_catalog = {self._view_data["reviews"]["_review_objects"][review_id]["title"]:review_id for review_id in self._view_data["reviews"]["_review_objects"]}
+        self._loaded_review_title_catalog = None  # built on the first access, see _review_title_catalog
+        self._node = None  # see anime._anime_data
+        self._node_generation = -1
+
+
+    @property
+    def _view_data(self) -> _ViewNode:
+        generation = self._database._anime_generations.get(self._anime._id, 0)
+        if generation != self._node_generation:
+            self._node = self._anime._anime_data["views"]["_view_objects"][self._id]
+            self._node_generation = generation
+        return self._node
+
+    @property
+    def _review_title_catalog(self) -> dict:
+        # {review-title: review-id}
+        if self._loaded_review_title_catalog is None:
+            review_objects = self._view_data.reviews["_review_objects"]
+            self._loaded_review_title_catalog = {review_objects[review_id]["title"]: review_id for review_id in review_objects}
+        return self._loaded_review_title_catalog
+
+    @_review_title_catalog.setter
+    def _review_title_catalog(self, new_catalog:dict) -> None:
+        self._loaded_review_title_catalog = new_catalog
 
+    @property
+    def _path(self) -> tuple[int, int]:  # see ChangeEvent
+        return (self._anime._id, self._id)
 
     def _checking_existence(self) -> None:
         if self._anime._id not in self._database._raw_dict["animes"]["_anime_objects"]:
@@ -47,13 +80,12 @@ class View():
     @property
     def title(self) -> str:
         self._checking_existence()
-        return self._view_data["title"]
+        return self._view_data.title
     
     @title.setter
     def title(self, new_title:str):
         self._checking_existence()
-        if not isinstance(new_title, str):
-            raise TypeError("title must be a string")
+        _validate("View", "title", new_title)
 
         old_title = self.title
         if old_title == new_title:  # if the new title is same as the old one, do nothing.
@@ -62,114 +94,119 @@ class View():
             err_msg = f"View title should be unique under the anime, the new title '{new_title}' has existed in the views of the anime."
             raise RepeatedViewTitleError(err_msg)
 
-        self._view_data["title"] = new_title
-        self._anime._view_title_catalog.pop(old_title)
-        self._anime._view_title_catalog[new_title] = self._id
+        with self._database._mutating(self._anime._id, ChangeEvent("set", "View", self._path, "title", old_title, new_title)):
+            self._view_data["title"] = new_title
+            self._anime._view_title_catalog.pop(old_title)
+            self._anime._view_title_catalog[new_title] = self._id
     
 
     @property
     def is_new(self) -> Optional[bool]:
         self._checking_existence()
-        return self._view_data["is_new"]
+        return self._view_data.is_new
     
     @is_new.setter
     def is_new(self, new_value: bool|None) -> None:
         self._checking_existence()
-        if new_value is not None:
-            if not isinstance(new_value, bool):
-                raise TypeError("is_new must be a boolean or None")
-        self._view_data["is_new"] = new_value
+        _validate("View", "is_new", new_value)
+        with self._database._mutating(self._anime._id, ChangeEvent("set", "View", self._path, "is_new", self._view_data.is_new, new_value)):
+            self._view_data["is_new"] = new_value
+            self._database._activity_changed()
 
     
     @property
     def times_view(self) -> Optional[int]:
         self._checking_existence()
-        return self._view_data["times_view"]
+        return self._view_data.times_view
     
     @times_view.setter
     def times_view(self, new_value: int|None) -> None:
         self._checking_existence()
-        if new_value is not None:
-            if not isinstance(new_value, int):
-                raise TypeError("times_view must be a integer or None")
-        self._view_data["times_view"] = new_value
+        _validate("View", "times_view", new_value)
+        with self._database._mutating(self._anime._id, ChangeEvent("set", "View", self._path, "times_view", self._view_data.times_view, new_value)):
+            self._view_data["times_view"] = new_value
+            self._database._activity_changed()
 
     
     @property
     def source(self) -> Optional[str]:
         self._checking_existence()
-        return self._view_data["source"]
+        return self._view_data.source
     
     @source.setter
     def source(self, new_source: str|None) -> None:
         self._checking_existence()
-        if new_source is not None:
-            if not isinstance(new_source, str):
-                raise TypeError("source must be a string or None")
-        self._view_data["source"] = new_source
+        _validate("View", "source", new_source)
+        with self._database._mutating(self._anime._id, ChangeEvent("set", "View", self._path, "source", self._view_data.source, new_source)):
+            self._view_data["source"] = _intern(new_source)
+            self._database._activity_changed()
 
 
     @property
-    def episode_range(self) -> Optional[tuple[str]]:
+    def episode_range(self) -> Optional[ReadOnlyList]:
+        """
+        A read-only view of the episode range, or None if it's not set. Use view.episode_range.to_tuple() for a copy.
+        """
         self._checking_existence()
-        return tuple(self._view_data["episode_range"])
+        if self._view_data.episode_range is None:
+            return None
+        return ReadOnlyList(self._view_data.episode_range)
     
     @episode_range.setter
     def episode_range(self, new_value: tuple[str]|None) -> None:
         self._checking_existence()
-        if new_value is not None:
-            if not isinstance(new_value, tuple):
-                raise TypeError("episode_range must be a tuple of string or None.")
-            for episode in new_value:
-                if not isinstance(episode, str):
-                    raise TypeError("episode_range must be a tuple of string or None.")
-            self._view_data["episode_range"] = list(new_value)
-        else:
-            self._view_data["episode_range"] = None
+        _validate("View", "episode_range", new_value)
+        new_value = _episode_range(new_value)
+        with self._database._mutating(self._anime._id, ChangeEvent("set", "View", self._path, "episode_range", self._view_data.episode_range, new_value)):
+            self._view_data["episode_range"] = new_value
 
     def episode_range_add(self, new_range: str) -> None:
         """
         Add new episode into episode_range.\n
         the argument new_range is the name of the new episode, it must be a string.\n
-        If the new_range has existed in episode_range, it will do nothing.
+        If the new_range has existed in episode_range, or episode_range is None(all episodes), it will do nothing.
         """
         self._checking_existence()
-        if not isinstance(new_range, str):
-            raise TypeError("new_range must be a string")
+        _validate_item("View", "episode_range", new_range, "new_range")
         
-        if new_range in self._view_data["episode_range"]:
+        episode_range = self._view_data.episode_range
+        if episode_range is None or new_range in episode_range:  # O(1), see _EpisodeRange
             return None
-        self._view_data["episode_range"].append(new_range)
+        with self._database._mutating(self._anime._id, ChangeEvent("add", "View", self._path, "episode_range", new=new_range)):
+            self._view_data.episode_range.append(_intern(new_range))
 
     def episode_range_remove(self, episode_name:str) -> None:
         """
         Remove an episode from episode_range by the given episode_name.\n
         if the episode_name not exists in view.episode_range, it will do nothing.\n
-        wrong datatype of the argument will not raise any exception but be viewed as it not exists in view.episode_range.
+        wrong datatype of the argument will not raise any exception but be viewed as it not exists in view.episode_range.\n
+        Raises ValueError if episode_range is None(all episodes), set it with a tuple of episode names first.
         """
         self._checking_existence()
-        self._view_data["episode_range"].remove(episode_name)
+        if self._view_data.episode_range is None:
+            raise ValueError("episode_range is None(all episodes), an episode can't be removed from it.")
+        with self._database._mutating(self._anime._id, ChangeEvent("remove", "View", self._path, "episode_range", old=episode_name)):
+            self._view_data.episode_range.remove(episode_name)
 
     
     @property
-    def duration(self) -> Optional[tuple[str]]:
+    def duration(self) -> Optional[ReadOnlyList]:
+        """
+        A read-only view of the duration, or None if it's not set. Use view.duration.to_tuple() for a copy.
+        """
         self._checking_existence()
-        return tuple(self._view_data["duration"])
+        if self._view_data.duration is None:
+            return None
+        return ReadOnlyList(self._view_data.duration)
     
     @duration.setter
     def duration(self, new_value: tuple[str]|None) -> None:
         self._checking_existence()
-        if new_value is not None:
-            if not isinstance(new_value, tuple):
-                raise TypeError("duration must be a tuple of month-string(format: yyyy-mm) or None.")
-            for month in new_value:
-                if not isinstance(month, str):
-                    raise TypeError("duration must be a tuple of month-string(format: yyyy-mm) or None.")
-                if not _is_month_string(month):
-                    raise TypeError("duration must be a tuple of month-string(format: yyyy-mm) or None.")
-            self._view_data["duration"] = list(new_value)
-        else:
-            self._view_data["duration"] = None
+        _validate("View", "duration", new_value)
+        new_value = _intern_list(new_value)
+        with self._database._mutating(self._anime._id, ChangeEvent("set", "View", self._path, "duration", self._view_data.duration, new_value)):
+            self._view_data["duration"] = new_value
+            self._database._activity_changed()
                 
     def duration_add(self, new_month:str) -> None:
         """
@@ -178,15 +215,14 @@ class View():
         If the new_month has existed in duration, it will do nothing.
         """
         self._checking_existence()
-        if not isinstance(new_month, str):
-            raise TypeError("new_month must be a tuple of month-string(format: yyyy-mm) or None.")
-        if not _is_month_string(new_month):
-            raise StringFormatError("new_month must be a tuple of month-string(format: yyyy-mm) or None.")
+        _validate_item("View", "duration", new_month, "new_month")
         
-        if new_month in self._view_data["duration"]:
+        if new_month in self._view_data.duration:
             return None
         
-        self._view_data["duration"].append(new_month)
+        with self._database._mutating(self._anime._id, ChangeEvent("add", "View", self._path, "duration", new=new_month)):
+            self._view_data.duration.append(_intern(new_month))
+            self._database._activity_changed()
 
     def duration_remove(self, month:str) -> None:
         """
@@ -195,34 +231,133 @@ class View():
         wrong datatype of the argument will not raise any exception but be viewed as it not exists in view.duration.
         """
         self._checking_existence()
-        self._view_data["duration"].remove(month)
+        with self._database._mutating(self._anime._id, ChangeEvent("remove", "View", self._path, "duration", old=month)):
+            self._view_data.duration.remove(month)
+            self._database._activity_changed()
 
 
     @property
     def last_episode_date(self) -> Optional[str]:
         self._checking_existence()
-        return self._view_data["last_episode_date"]
+        return self._view_data.last_episode_date
     
     @last_episode_date.setter
     def last_episode_date(self, new_value:str|None) -> None:
         self._checking_existence()
-        if new_value is not None:
-            if not isinstance(new_value, str):
-                raise TypeError("last_episode_date must be a date-string(format: yyyy-mm-dd) or None.")
-            if not _is_date_string(new_value):
-                raise StringFormatError("last_episode_date must be a date-string(format: yyyy-mm-dd) or None.")
-        self._view_data["last_episode_date"] = new_value
+        _validate("View", "last_episode_date", new_value)
+        with self._database._mutating(self._anime._id, ChangeEvent("set", "View", self._path, "last_episode_date", self._view_data.last_episode_date, new_value)):
+            self._view_data["last_episode_date"] = _intern(new_value)
+            self._database._activity_changed()
+
+
+    def _get_episode_id(self, episode:Episode|str) -> int:
+        # episode can be an Episode instance of the anime or the name of an episode of the anime
+        if isinstance(episode, Episode):
+            if episode._database is not self._database or episode._anime._id != self._anime._id:
+                raise EpisodeRemovedError("the episode is not an episode of the anime.")
+            episode._checking_existence()
+            return episode._id
+        if not isinstance(episode, str):
+            raise TypeError("episode must be an Episode or the name of an episode.")
+        if episode not in self._anime._episode_name_catalog:
+            raise EpisodeRemovedError(f"the episode '{episode}' not exists in the anime.")
+        return self._anime._episode_name_catalog[episode]
+
+    def watch_episode(self, episode:Episode|str, date:str) -> None:
+        """
+        Record that an episode of the anime was watched on the given date.\n
+        `episode` is an Episode of the anime or its name.\n
+        `date` must be a date-string(format: yyyy-mm-dd).\n
+        If the episode has been recorded, its date will be replaced.
+        """
+        self._checking_existence()
+        episode_id = self._get_episode_id(episode)
+        if not isinstance(date, str):
+            raise TypeError("date must be a date-string(format: yyyy-mm-dd).")
+        if not _is_date_string(date):
+            raise StringFormatError("date must be a date-string(format: yyyy-mm-dd).")
+        try:
+            day = _date_string_to_day(date)
+        except ValueError:
+            raise StringFormatError(f"date '{date}' is not an existing date.")
+        old_day = self._view_data.detailed_view_record.get_day(episode_id)
+        if old_day is None:
+            event = ChangeEvent("add", "View", self._path, "detailed_view_record", new=[episode_id, date])
+        else:
+            event = ChangeEvent("set", "View", self._path, "detailed_view_record", [episode_id, _day_to_date_string(old_day)], [episode_id, date])
+        with self._database._mutating(self._anime._id, event):
+            self._view_data.detailed_view_record.set_day(episode_id, day)
+            self._database._activity_changed()
+
+    def unwatch_episode(self, episode:Episode|str) -> None:
+        """
+        Remove an episode from the detailed view record.\n
+        If the episode has not been recorded, it will do nothing.
+        """
+        self._checking_existence()
+        episode_id = self._get_episode_id(episode)
+        old_day = self._view_data.detailed_view_record.get_day(episode_id)
+        if old_day is None:
+            return None
+        event = ChangeEvent("remove", "View", self._path, "detailed_view_record", old=[episode_id, _day_to_date_string(old_day)])
+        with self._database._mutating(self._anime._id, event):
+            self._view_data.detailed_view_record.discard(episode_id)
+            self._database._activity_changed()
+
+    def has_watched(self, episode:Episode|str) -> bool:
+        """
+        Whether the episode is in the detailed view record. It's O(1).
+        """
+        self._checking_existence()
+        return self._get_episode_id(episode) in self._view_data.detailed_view_record
+
+    def get_watch_date(self, episode:Episode|str) -> Optional[str]:
+        """
+        Returns the date-string when the episode was watched, or `None` if it has not been recorded.
+        """
+        self._checking_existence()
+        day = self._view_data.detailed_view_record.get_day(self._get_episode_id(episode))
+        if day is None:
+            return None
+        return _day_to_date_string(day)
+
+    @property
+    def watched_episodes(self) -> tuple[tuple[Episode, str]]:
+        """
+        A tuple of (episode, date-string) in the detailed view record, sorted by date.
+        """
+        self._checking_existence()
+        record = self._view_data.detailed_view_record
+        pairs = sorted(zip(record.days, record.episode_ids))
+        return tuple((Episode(self._database, self._anime, episode_id), _day_to_date_string(day)) for day, episode_id in pairs)
+
+    def episodes_per_day(self) -> dict[str, int]:
+        """
+        Returns {date-string: number of episodes watched on that day} of the view, sorted by date.
+        """
+        self._checking_existence()
+        return _episodes_per_day(self._view_data.detailed_view_record.days)
+
+    def binge_sessions(self, min_episodes:int=3, max_gap_days:int=0) -> tuple[BingeSession]:
+        """
+        Find binge sessions in the detailed view record.\n
+        Watch days which are at most `max_gap_days` days apart are merged into one session,
+          `max_gap_days=0` means a session is a single day and `max_gap_days=1` merges consecutive days.\n
+        Only sessions with at least `min_episodes` episodes are returned, sorted by date.
+        """
+        self._checking_existence()
+        return _binge_sessions(self._view_data.detailed_view_record.days, min_episodes, max_gap_days)
 
 
     @property
     def _last_review_id(self):  #database.last_review_id is actually a value in raw dict
         self._checking_existence()
-        return self._view_data["reviews"]["_last_review_id"]
+        return self._view_data.reviews["_last_review_id"]
 
     @_last_review_id.setter
     def _last_review_id(self, new_value):
         self._checking_existence()
-        self._view_data["reviews"]["_last_review_id"] = new_value
+        self._view_data.reviews["_last_review_id"] = new_value
 
 
     def add_review(self, title:str, item:Optional[str]=None, episode_range:Optional[tuple[str]]=None,
@@ -238,26 +373,13 @@ class View():
         self._checking_existence()
 
         # Checking datatype of args
-        if not isinstance(title, str):
-            raise TypeError("title must be a string.")
-        if item is not None:
-            if not isinstance(item, str):
-                raise TypeError("item must be a string or None.")
+        _validate("Review", "title", title)
+        _validate("Review", "item", item)
+        _validate("Review", "episode_range", episode_range)
+        _validate("Review", "ranking", ranking)
+        _validate("Review", "comment", comment)
         if episode_range is not None:
-            if not isinstance(episode_range, tuple):
-                raise TypeError("episode_range must be a tuple of string or None.")
-            for episode in episode_range:
-                if not isinstance(episode, str):
-                    raise TypeError("episode_range must be a tuple of string or None.")
             episode_range = list(episode_range)
-        if ranking is not None:
-            if not isinstance(ranking, int):
-                raise TypeError("ranking must be a integer between 0 and 10.")
-            if not _is_available_ranking(ranking):
-                raise NotAvailableRankingError("ranking must be a integer between 0 and 10.")
-        if comment is not None:
-            if not isinstance(comment, str):
-                raise TypeError("comment must be a string")
             
         # Checking whether the title has existed
         if title in self._review_title_catalog:
@@ -265,17 +387,18 @@ class View():
             raise RepeatedReviewTitleError(err_msg)
         
         # Adding review object into the database
-        new_review_object = {
-            "_class": "Review",
-            "title": title,
-            "item": item,
-            "episode_range": episode_range,
-            "ranking": ranking,
-            "comment": comment
-        }
-        self._last_review_id += 1
-        self._view_data["reviews"]["_review_objects"][self._last_review_id] = new_review_object
-        self._review_title_catalog[title] = self._last_review_id
+        new_review_object = _ReviewNode(
+            title=title,
+            item=_intern(item),
+            episode_range=_episode_range(episode_range),
+            ranking=ranking,
+            comment=comment
+        )
+        event = ChangeEvent("create", "Review", self._path + (self._last_review_id + 1,), new=new_review_object)
+        with self._database._mutating(self._anime._id, event):
+            self._last_review_id += 1
+            self._view_data.reviews["_review_objects"][self._last_review_id] = new_review_object
+            self._review_title_catalog[title] = self._last_review_id
 
         # return Review object
         return Review(self._database, self._anime, self, self._last_review_id)
@@ -297,16 +420,51 @@ class View():
         Get a tuple of all re reviews under the view.
         """
         self._checking_existence()
-        rtn = tuple(Review(self._database, self._anime, self, review_id) for review_id in self._view_data["reviews"]["_review_objects"])
+        rtn = tuple(self.iter_reviews())
         return rtn
+
+    def iter_reviews(self):
+        """
+        Yields the reviews under the view one by one, without building a tuple of all of them.
+
+        warning: Don't create or remove reviews of the view while iterating, use get_all_reviews instead.
+        """
+        self._checking_existence()
+        for review_id in self._view_data.reviews["_review_objects"]:
+            yield Review(self._database, self._anime, self, review_id)
     
     def clear_views(self) -> None:
         """
         Remove all review object under the view.
         """
         self._checking_existence()
-        self._review_title_catalog = {}
-        self._view_data["reviews"]["_review_objects"] = {}
+        with self._database._mutating(self._anime._id, ChangeEvent("clear", "View", self._path, "reviews")):
+            self._review_title_catalog = {}
+            self._view_data.reviews["_review_objects"] = {}
+
+    def delete_reviews(self, reviews) -> DeleteCounts:
+        """
+        Remove many reviews at once.\n
+        `reviews`: a function `reviews(review) -> bool` choosing the reviews to remove,
+          or an iterable of Review objects and titles of the reviews. Reviews which not exist are skipped.\n
+        Returns DeleteCounts(reviews) of the removed reviews.
+        """
+        with self._database.batch():
+            self._checking_existence()
+            review_ids = _select_ids(reviews, self._view_data.reviews["_review_objects"], lambda title: self._review_title_catalog.get(title),
+                                     Review, self._database, self._path, lambda review_id: Review(self._database, self._anime, self, review_id),
+                                     "reviews must be a function or an iterable of Review objects and titles")
+            return _total([self._delete_review(review_id) for review_id in review_ids])
+
+    def _delete_review(self, review_id:int) -> DeleteCounts:
+        # removes an existing review, used by delete_reviews and review.destroy
+        with self._database._mutating(self._anime._id, ChangeEvent("destroy", "Review", (*self._path, review_id),
+                                                                   old=self._view_data.reviews["_review_objects"][review_id])):
+            review_object = self._view_data.reviews["_review_objects"].pop(review_id)
+            if self._loaded_review_title_catalog is not None:
+                # hint: the catalog of this wrapper may not know a review added through another View object
+                self._loaded_review_title_catalog.pop(review_object["title"], None)
+        return DeleteCounts(reviews=1)
 
 
     def destroy(self) -> None:
@@ -314,5 +472,4 @@ class View():
         remove the view itself from the database
         """
         self._checking_existence()
-        self._anime._view_title_catalog.pop(self._view_data["title"])
-        self._anime["views"]["_view_objects"].pop(self._id)
+        self._anime._delete_view(self._id)
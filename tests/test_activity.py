@@ -0,0 +1,105 @@
+import pytest
+
+import AnDson_personal_api as AnDson
+from AnDson_personal_api._activity import _ActivityColumns, _GROUP_BYS, _GRANULARITIES, _MEASURES
+
+
+_KEYS = [(granularity, group_by, measure) for granularity in _GRANULARITIES for group_by in _GROUP_BYS for measure in _MEASURES]
+
+
+@pytest.fixture
+def database():
+    database = AnDson.Database()
+    anime = database.create_anime("A", (), ("action", "comedy"))
+    anime.create_episode("ep1")
+    anime.create_view("v1", is_new=True, times_view=2, source="tv", duration=("2021-12", "2022-01")).add_review("r")
+    anime.create_view("v2", is_new=False, times_view=None, source="bd", last_episode_date="2022-03-05")
+    database.create_anime("B").create_view("v", times_view=1, source="tv", duration=("2022-01",))
+    return database
+
+
+def _all_timeseries(database) -> dict:
+    return {key: database.activity_timeseries(*key) for key in _KEYS}
+
+
+def _rebuilt(database) -> dict:
+    columns = _ActivityColumns(database._raw_dict)
+    return {key: columns.timeseries(*key) for key in _KEYS}
+
+
+def test_timeseries(database):
+    assert database.activity_timeseries() == {"2021-12": 1, "2022-01": 2, "2022-03": 1}
+    assert database.activity_timeseries("year", measure="times_view") == {"2021": 2, "2022": 3}
+    assert database.activity_timeseries(group_by="source") == {"tv": {"2021-12": 1, "2022-01": 2}, "bd": {"2022-03": 1}}
+    assert database.activity_timeseries(group_by="is_new", measure="times_view") == \
+        {True: {"2021-12": 2, "2022-01": 2}, None: {"2022-01": 1}}  # a times_view of None is 0
+    assert database.activity_timeseries("year", group_by="tag") == \
+        {"action": {"2021": 1, "2022": 2}, "comedy": {"2021": 1, "2022": 2}, None: {"2022": 1}}
+    with pytest.raises(ValueError):
+        database.activity_timeseries("day")
+    with pytest.raises(ValueError):
+        database.activity_timeseries(group_by="title")
+    with pytest.raises(ValueError):
+        database.activity_timeseries(measure="minutes")
+
+
+def test_results_are_cached(database):
+    first = _all_timeseries(database)
+    assert all(database.activity_timeseries(*key) is first[key] for key in _KEYS)
+
+
+# every change of the data activity_timeseries reads
+_CHANGES = {
+    "times_view": lambda database: setattr(database.get_anime("A").get_view("v1"), "times_view", 5),
+    "is_new": lambda database: setattr(database.get_anime("A").get_view("v1"), "is_new", None),
+    "source": lambda database: setattr(database.get_anime("A").get_view("v2"), "source", "web"),
+    "duration": lambda database: setattr(database.get_anime("A").get_view("v1"), "duration", ("2023-01",)),
+    "duration_add": lambda database: database.get_anime("A").get_view("v1").duration_add("2023-01"),
+    "duration_remove": lambda database: database.get_anime("A").get_view("v1").duration_remove("2021-12"),
+    "last_episode_date": lambda database: setattr(database.get_anime("A").get_view("v2"), "last_episode_date", "2023-01-01"),
+    "tags": lambda database: setattr(database.get_anime("A"), "tags", ("drama",)),
+    "add_tag": lambda database: database.get_anime("B").add_tag("drama"),
+    "remove_tag": lambda database: database.get_anime("A").remove_tag("comedy"),
+    "create_view": lambda database: database.get_anime("B").create_view("w", duration=("2023-01",)),
+    "view_destroy": lambda database: database.get_anime("A").get_view("v2").destroy(),
+    "delete_views": lambda database: database.get_anime("A").delete_views(["v1"]),
+    "clear_views": lambda database: database.get_anime("A").clear_views(),
+    "create_anime": lambda database: database.create_anime("C", (), ("drama",)).create_view("v", duration=("2023-01",)),
+    "anime_destory": lambda database: database.get_anime("B").destory(),
+    "delete_animes": lambda database: database.delete_animes(["A"]),
+    "clear_anime": lambda database: database.clear_anime(),
+}
+
+
+@pytest.mark.parametrize("change", _CHANGES.values(), ids=_CHANGES.keys())
+def test_changes_invalidate_the_cache(database, change):
+    before = _all_timeseries(database)
+    change(database)
+    after = _all_timeseries(database)
+    assert after == _rebuilt(database)
+    assert after != before
+
+
+@pytest.mark.parametrize("change", [
+    lambda database: setattr(database.get_anime("A").get_view("v1").get_review("r"), "ranking", 8),
+    lambda database: database.get_anime("A").add_alias("a"),
+    lambda database: database.get_anime("A").create_episode("ep2"),
+    lambda database: setattr(database.get_anime("A").get_view("v1"), "title", "v3"),
+], ids=["review", "alias", "episode", "view title"])
+def test_other_changes_keep_the_cache(database, change):
+    before = _all_timeseries(database)
+    change(database)
+    assert all(database.activity_timeseries(*key) is before[key] for key in _KEYS)
+
+
+@pytest.mark.parametrize("change", _CHANGES.values(), ids=_CHANGES.keys())
+def test_replayed_changes_invalidate_the_cache(database, change, tmp_path):
+    database.save_AnDson(str(tmp_path / "base.json"))
+    writer = database.subscribe_log(str(tmp_path / "changes.log"))
+    change(database)
+    writer.close()
+
+    replayed = AnDson.Database(str(tmp_path / "base.json"))
+    _all_timeseries(replayed)
+    replayed.replay_change_log(str(tmp_path / "changes.log"))
+    assert _all_timeseries(replayed) == _rebuilt(database)
@@ -0,0 +1,121 @@
+import time
+
+import pytest
+
+import AnDson_personal_api as AnDson
+
+
+@pytest.fixture
+def database():
+    database = AnDson.Database()
+    for index in range(3):
+        database.create_anime(f"A{index}", (f"a{index}",), ("action",)).create_view("v").add_review("r")
+    yield database
+    database.close()
+
+
+def _wait_for(condition, timeout:float=5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+def _read(file_path:str) -> bytes:
+    with open(file_path, "rb") as file:
+        return file.read()
+
+
+def _saved_bytes(database, file_path:str) -> bytes:
+    database.save_AnDson(file_path)
+    return _read(file_path)
+
+
+def test_a_burst_of_changes_is_one_save(database, tmp_path):
+    autosaver = database.enable_autosave(str(tmp_path / "db.json"), interval=0.2)
+    _wait_for(lambda: autosaver.stats.saves == 1)  # the whole database is saved first
+    for index in range(30):
+        database.get_anime("A1").get_view("v").times_view = index
+    _wait_for(lambda: autosaver.stats.saves == 2)
+    time.sleep(0.4)
+    stats = autosaver.stats
+    assert (stats.saves, stats.changes_saved, stats.pending_changes) == (2, 30, 0)
+
+
+def test_max_changes_saves_before_the_interval(database, tmp_path):
+    autosaver = database.enable_autosave(str(tmp_path / "db.json"), interval=60, max_changes=5)
+    _wait_for(lambda: autosaver.stats.saves == 1)
+    for index in range(5):
+        database.get_anime("A0").add_tag(f"t{index}")
+    _wait_for(lambda: autosaver.stats.saves == 2)
+    assert autosaver.stats.changes_saved == 5
+
+
+def test_the_file_is_the_same_as_save_AnDson(database, tmp_path):
+    file_path = str(tmp_path / "db.json")
+    autosaver = database.enable_autosave(file_path, interval=60)
+    _wait_for(lambda: autosaver.stats.saves == 1)
+    assert _read(file_path) == _saved_bytes(database, str(tmp_path / "expected.json"))
+
+    # only the changed animes are serialized again, the others are reused from the last save
+    database.get_anime("A0").title = "B0"
+    database.get_anime("A2").destory()
+    database.create_anime("C", (), ("drama",))
+    autosaver.flush()
+    assert _read(file_path) == _saved_bytes(database, str(tmp_path / "expected.json"))
+    assert AnDson.Database(file_path).get_anime("B0") is not None
+    assert autosaver.stats.bytes_serialized < 2 * autosaver.stats.bytes_written
+
+
+def test_close_saves_the_pending_changes(database, tmp_path):
+    file_path = str(tmp_path / "db.json")
+    autosaver = database.enable_autosave(file_path, interval=60)
+    _wait_for(lambda: autosaver.stats.saves == 1)
+    database.get_anime("A0").add_tag("drama")
+    assert autosaver.stats.pending_changes == 1
+    database.close()
+    assert autosaver.closed and database._autosaver is None
+    assert "drama" in AnDson.Database(file_path).get_anime("A0").tags
+    autosaver.close()  # closing again does nothing
+
+
+def test_a_failed_save_is_retried(database, tmp_path, monkeypatch):
+    file_path = str(tmp_path / "db.json")
+    autosaver = database.enable_autosave(file_path, interval=60)
+    _wait_for(lambda: autosaver.stats.saves == 1)
+
+    def broken_write(file_path, data):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("AnDson_personal_api.autosave._write_file_atomically", broken_write)
+    database.get_anime("A0").add_tag("drama")
+    autosaver.flush()
+    stats = autosaver.stats
+    assert (stats.saves, stats.failed_saves, stats.pending_changes) == (1, 1, 1)
+    assert stats.last_error == "OSError: disk full"
+
+    monkeypatch.undo()
+    database.get_anime("A1").add_tag("drama")
+    autosaver.flush()
+    stats = autosaver.stats
+    assert (stats.saves, stats.failed_saves, stats.pending_changes, stats.last_error) == (2, 1, 0, None)
+    assert _read(file_path) == _saved_bytes(database, str(tmp_path / "expected.json"))
+
+
+def test_a_failed_save_is_retried_by_the_background_thread(database, tmp_path, monkeypatch):
+    file_path = str(tmp_path / "db.json")
+    failures = []
+
+    def write_after_a_failure(file_path, data):
+        if not failures:
+            failures.append(file_path)
+            raise OSError("disk full")
+        original_write(file_path, data)
+
+    from AnDson_personal_api.autosave import _write_file_atomically as original_write
+    monkeypatch.setattr("AnDson_personal_api.autosave._write_file_atomically", write_after_a_failure)
+    autosaver = database.enable_autosave(file_path, interval=0.05)
+    _wait_for(lambda: autosaver.stats.saves == 1)
+    assert autosaver.stats.failed_saves == 1
+    assert _read(file_path) == _saved_bytes(database, str(tmp_path / "expected.json"))
@@ -0,0 +1,72 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import AnDson_personal_api as AnDson
+from AnDson_personal_api.batch import map_databases
+
+
+# functions given to map_databases must be defined at the top level, so they can be sent to the worker processes
+def _count(database):
+    return len(database.get_all_animes())
+
+
+def _count_or_crash(database):
+    if database.get_anime("crash") is not None:
+        os._exit(1)  # kills the worker process
+    return len(database.get_all_animes())
+
+
+@pytest.fixture
+def paths(tmp_path):
+    paths = []
+    for index in range(8):
+        database = AnDson.Database()
+        for anime_index in range(index):
+            database.create_anime(f"a{anime_index}")
+        paths.append(str(tmp_path / f"{index}.json"))
+        database.save_AnDson(paths[-1])
+    return paths
+
+
+@pytest.mark.parametrize("workers, chunksize", [(1, 1), (3, 1), (2, 3)])
+def test_results_are_in_the_order_of_paths(paths, workers, chunksize):
+    progress = []
+    results = map_databases(paths, _count, workers=workers, chunksize=chunksize, progress=lambda *done: progress.append(done))
+    assert [result.path for result in results] == paths
+    assert [result.value for result in results] == list(range(8))
+    assert all(result.error is None for result in results)
+    assert progress[-1] == (8, 8)
+
+
+def test_an_error_only_fails_its_own_file(paths, tmp_path):
+    with open(paths[2], "w") as file:
+        file.write("not json")
+    paths.append(str(tmp_path / "missing.json"))
+    results = map_databases(paths, _count, workers=2, chunksize=2)
+    assert [result.error is None for result in results] == [True, True, False, True, True, True, True, True, False]
+    assert isinstance(results[-1].error, FileNotFoundError)
+    assert [result.value for result in results if result.error is None] == [0, 1, 3, 4, 5, 6, 7]
+
+
+def test_objects_of_the_database_are_not_sent_back(paths):
+    results = map_databases(paths[1:3], _first_anime, workers=2)
+    assert all(isinstance(result.error, TypeError) for result in results)
+
+
+def _first_anime(database):
+    return database.get_all_animes()[0]
+
+
+def test_a_dead_worker_only_fails_its_own_chunk(paths):
+    database = AnDson.Database(paths[5])
+    database.create_anime("crash")
+    database.save_AnDson(paths[5])
+    progress = []
+    results = map_databases(paths, _count_or_crash, workers=3, chunksize=2, progress=lambda *done: progress.append(done))
+    assert [result.path for result in results] == paths
+    assert [result.value for result in results] == [0, 1, 2, 3, None, None, 6, 7]
+    assert all(isinstance(result.error, BrokenProcessPool) for result in results[4:6])
+    assert all(result.error is None for result in results[:4] + results[6:])
+    assert progress[-1] == (8, 8)
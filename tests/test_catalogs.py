@@ -0,0 +1,64 @@
+import pytest
+
+import AnDson_personal_api as AnDson
+from AnDson_personal_api.database import _get_anime_name_catalog, _get_tag_catalog
+
+
+@pytest.fixture
+def file_path(tmp_path):
+    database = AnDson.Database()
+    database.create_anime("A", ("a",), ("action", "comedy"))
+    database.create_anime("B", ("b",), ("comedy",))
+    file_path = str(tmp_path / "db.json")
+    database.save_AnDson(file_path)
+    return file_path
+
+
+def _assert_catalogs_match_data(database):
+    assert database.anime_name_catalog == _get_anime_name_catalog(database._raw_dict)
+    assert database._tag_catalog == _get_tag_catalog(database._raw_dict)
+
+
+def test_catalogs_are_built_on_the_first_access(file_path):
+    database = AnDson.Database(file_path)
+    assert database._loaded_anime_name_catalog is None and database._loaded_tag_catalog is None
+    assert database.get_anime("b").title == "B"
+    assert database._loaded_tag_catalog is None  # only the needed catalog is built
+    assert database.anime_name_catalog == {"A": 1, "a": 1, "B": 2, "b": 2}
+    assert database._tag_catalog == {"action": {1: 1}, "comedy": {1: 1, 2: 1}}
+
+
+def test_mutations_before_the_first_access(file_path):
+    database = AnDson.Database(file_path)
+    anime = database.get_anime("A")  # builds the name catalog only
+    anime.title = "A2"
+    anime.tags = ("drama",)
+    database.create_anime("C", ("c",), ("drama",))
+    database.get_anime("B").destory()
+    assert database._loaded_tag_catalog is None
+    _assert_catalogs_match_data(database)
+    assert database.get_anime("A") is None
+    assert database.get_anime("A2").title == "A2"
+
+
+def test_mutations_after_the_first_access(file_path):
+    database = AnDson.Database(file_path)
+    _assert_catalogs_match_data(database)
+    anime = database.get_anime("A")
+    anime.aliases = ("x", "y")
+    anime.remove_alias("x")
+    anime.add_tag("drama")
+    anime.remove_tag("action")
+    database.get_anime("B").destory()
+    database.create_anime("B", (), ("action",))
+    _assert_catalogs_match_data(database)
+    assert database._tag_catalog == {"action": {3: 1}, "comedy": {1: 1}, "drama": {1: 1}}
+
+
+def test_snapshot_catalogs_keep_the_old_names(file_path):
+    database = AnDson.Database(file_path)
+    snapshot = database.snapshot()
+    database.get_anime("A").title = "A2"
+    assert snapshot.get_anime("A").title == "A"
+    assert snapshot.get_anime("A2") is None
+    assert database.get_anime("A2") is not None
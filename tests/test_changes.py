@@ -0,0 +1,133 @@
+import json
+
+import pytest
+
+import AnDson_personal_api as AnDson
+from AnDson_personal_api.changes import _coalesce
+from AnDson_personal_api.database import _json_default
+
+
+@pytest.fixture
+def database():
+    database = AnDson.Database()
+    anime = database.create_anime("A", ("a",), ("action",))
+    anime.create_episode("ep1")
+    view = anime.create_view("first", episode_range=("ep1",))
+    view.add_review("r1")
+    return database
+
+
+def _dump(database) -> str:
+    return json.dumps(database._raw_dict, default=_json_default, sort_keys=True)
+
+
+def _record(database) -> list:
+    batches = []
+    database.subscribe(batches.append)
+    return batches
+
+
+def test_created_and_destroyed_episode_is_dropped_with_its_watch_records(database):
+    batches = _record(database)
+    anime = database.get_anime("A")
+    view = anime.get_view("first")
+    with database.batch():
+        episode = anime.create_episode("ep2")
+        view.watch_episode(episode, "2021-03-04")
+        view.watch_episode(episode, "2021-03-05")
+        episode.destroy()
+        view.watch_episode("ep1", "2021-03-06")
+    assert batches == [(AnDson.ChangeEvent("add", "View", (1, 1), "detailed_view_record", new=[1, "2021-03-06"]),)]
+
+
+def test_created_and_destroyed_view_is_dropped_with_its_reviews(database):
+    batches = _record(database)
+    anime = database.get_anime("A")
+    with database.batch():
+        view = anime.create_view("second")
+        view.add_review("r").comment = "c"
+        view.times_view = 2
+        view.destroy()
+    assert batches == []
+
+
+def test_added_and_removed_items_cancel(database):
+    batches = _record(database)
+    anime = database.get_anime("A")
+    view = anime.get_view("first")
+    with database.batch():
+        anime.add_tag("comedy")
+        anime.add_alias("b")
+        view.episode_range_add("ep2")
+        anime.add_tag("drama")
+        anime.remove_tag("comedy")
+        anime.remove_alias("b")
+        view.episode_range_remove("ep2")
+    assert batches == [(AnDson.ChangeEvent("add", "Anime", (1,), "tags", new="drama"),)]
+
+
+def test_set_between_add_and_remove_keeps_the_events():
+    events = [AnDson.ChangeEvent("add", "Anime", (1,), "tags", new="x"),
+              AnDson.ChangeEvent("set", "Anime", (1,), "tags", ["x"], ["x", "y"]),
+              AnDson.ChangeEvent("remove", "Anime", (1,), "tags", old="x")]
+    assert _coalesce(events) == events
+
+
+def test_replay_of_coalesced_batches(database, tmp_path):
+    database.save_AnDson(str(tmp_path / "base.json"))
+    writer = database.subscribe_log(str(tmp_path / "changes.log"))
+    anime = database.get_anime("A")
+    view = anime.get_view("first")
+    with database.batch():
+        episode = anime.create_episode("ep2")
+        view.watch_episode(episode, "2021-03-04")
+        view.watch_episode("ep1", "2021-03-05")
+        episode.destroy()
+        anime.add_tag("comedy")
+        anime.add_tag("drama")
+        anime.remove_tag("comedy")
+        view.episode_range_add("ep2")
+        view.episode_range_remove("ep1")
+        view.episode_range_remove("ep2")
+        view.times_view = 1
+        view.times_view = 2
+        new_view = anime.create_view("second")
+        new_view.add_review("r")
+        new_view.destroy()
+        database.create_anime("B").create_view("v").add_review("r")
+    with database.batch():
+        database.get_anime("B").destory()
+        view.get_review("r1").ranking = 8
+        # the ids of dropped nodes are not replayed, new nodes bring the last ids up to date
+        anime.create_episode("ep3")
+        anime.create_view("third")
+    writer.close()
+
+    replayed = AnDson.Database(str(tmp_path / "base.json"))
+    replayed.replay_change_log(str(tmp_path / "changes.log"))
+    assert _dump(replayed) == _dump(database)
+
+
+def test_batch_ending_with_an_exception_sends_the_done_changes(database):
+    batches = _record(database)
+    with pytest.raises(RuntimeError):
+        with database.batch():
+            database.create_anime("B")
+            raise RuntimeError
+    assert [[(event.op, event.kind) for event in batch] for batch in batches] == [[("create", "Anime")]]
+    assert database._pending_events == []
+
+
+def test_a_raising_subscriber_doesnt_stop_the_others(database, monkeypatch):
+    reported = []
+    monkeypatch.setattr("sys.excepthook", lambda *exc_info: reported.append(exc_info[0]))
+
+    def broken(events):
+        raise ValueError("broken subscriber")
+
+    database.subscribe(broken)
+    batches = _record(database)
+    database.get_anime("A").add_tag("comedy")  # doesn't raise, the change is done
+    assert "comedy" in database.get_anime("A").tags
+    assert len(batches) == 1
+    assert reported == [ValueError]
@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+import AnDson_personal_api as AnDson
+from AnDson_personal_api.database import _json_default
+
+
+@pytest.fixture
+def database():
+    database = AnDson.Database()
+    for index in range(6):
+        anime = database.create_anime(f"A{index}", (f"a{index}",), ("odd" if index % 2 else "even",))
+        anime.create_episode("ep1")
+        for title in ("v1", "v2"):
+            view = anime.create_view(title)
+            view.watch_episode("ep1", "2022-01-01")
+            view.add_review("r1")
+            view.add_review("r2")
+    return database
+
+
+def test_delete_animes_by_function(database):
+    counts = database.delete_animes(lambda anime: "odd" in anime.tags)
+    assert counts == AnDson.DeleteCounts(animes=3, views=6, reviews=12, episodes=3)
+    assert [anime.title for anime in database.get_all_animes()] == ["A0", "A2", "A4"]
+    assert database.get_anime("a1") is None
+    assert database.anime_name_catalog == {"A0": 1, "a0": 1, "A2": 3, "a2": 3, "A4": 5, "a4": 5}
+    assert database._tag_catalog.keys() == {"even"}
+
+
+def test_delete_animes_by_names_and_objects(database):
+    other = AnDson.Database().create_anime("A3")
+    counts = database.delete_animes(["A0", "a0", database.get_anime("A1"), "missing", other])
+    assert counts.animes == 2
+    assert database.get_anime("A3") is not None  # an anime of another database is skipped
+    with pytest.raises(TypeError):
+        database.delete_animes("A2")
+    with pytest.raises(TypeError):
+        database.delete_animes([2])
+
+
+def test_removed_wrappers_raise(database):
+    anime = database.get_anime("A0")
+    view = anime.get_view("v1")
+    review = view.get_review("r1")
+    anime.delete_views(["v1"])
+    with pytest.raises(AnDson.ViewRemovedError):
+        view.title
+    with pytest.raises(AnDson.ReviewRemovedError):
+        review.title
+    database.delete_animes([anime])
+    with pytest.raises(AnDson.AnimeRemovedError):
+        anime.title
+
+
+def test_delete_views_and_reviews(database):
+    anime = database.get_anime("A0")
+    assert anime.delete_views(lambda view: view.title == "v2") == AnDson.DeleteCounts(views=1, reviews=2)
+    assert [view.title for view in anime.get_all_views()] == ["v1"]
+    view = anime.get_view("v1")
+    assert view.delete_reviews(["r2", "r2", "r3"]) == AnDson.DeleteCounts(reviews=1)
+    assert [review.title for review in view.get_all_reviews()] == ["r1"]
+    anime.create_view("v2")  # the title can be used again
+
+
+def test_delete_is_one_batch_and_replays(database, tmp_path):
+    database.save_AnDson(str(tmp_path / "base.json"))
+    batches = []
+    database.subscribe(batches.append)
+    writer = database.subscribe_log(str(tmp_path / "changes.log"))
+    database.delete_animes(lambda anime: anime.title in ("A1", "A2"))
+    database.get_anime("A3").delete_views(["v1"])
+    writer.close()
+
+    assert [[(event.op, event.kind, event.path) for event in batch] for batch in batches] == \
+        [[("destroy", "Anime", (2,)), ("destroy", "Anime", (3,))], [("destroy", "View", (4, 1))]]
+    replayed = AnDson.Database(str(tmp_path / "base.json"))
+    replayed.replay_change_log(str(tmp_path / "changes.log"))
+    assert json.dumps(replayed._raw_dict, default=_json_default) == json.dumps(database._raw_dict, default=_json_default)
+
+
+def test_delete_keeps_snapshot(database):
+    snapshot = database.snapshot()
+    database.delete_animes(lambda anime: True)
+    assert database.get_all_animes() == ()
+    assert len(snapshot.get_all_animes()) == 6
+    assert snapshot.get_anime("A5").get_view("v2").get_review("r2") is not None
+
+
+def test_delete_through_a_wrapper_with_a_stale_catalog(database):
+    events = []
+    database.subscribe(lambda batch: events.extend(batch))
+    stale_anime = database.get_anime("A0")
+    stale_anime.get_view("v1")  # builds the catalog of this wrapper
+    database.get_anime("A0").create_view("new")
+    assert stale_anime.delete_views(lambda view: True).views == 3
+    assert [event.path for event in events if event.op == "destroy"] == [(1, 1), (1, 2), (1, 3)]
+
+    stale_view = database.get_anime("A1").get_view("v1")
+    stale_view.get_review("r1")
+    database.get_anime("A1").get_view("v1").add_review("new")
+    assert stale_view.delete_reviews(lambda review: True).reviews == 3
+    assert database.get_anime("A1").get_view("v1").get_all_reviews() == ()
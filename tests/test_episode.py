@@ -0,0 +1,132 @@
+import json
+
+import pytest
+
+import AnDson_personal_api as AnDson
+
+
+@pytest.fixture
+def database():
+    database = AnDson.Database()
+    anime = database.create_anime("A")
+    for index in range(1, 6):
+        anime.create_episode(f"ep{index}", minutes=24)
+    anime.create_view("v")
+    return database
+
+
+def test_watch_and_unwatch(database):
+    anime = database.get_anime("A")
+    view = anime.get_view("v")
+    view.watch_episode("ep2", "2022-01-03")
+    view.watch_episode(anime.get_episode("ep1"), "2022-01-01")
+    assert view.has_watched("ep1")
+    assert not view.has_watched("ep3")
+    assert view.get_watch_date("ep2") == "2022-01-03"
+    assert view.get_watch_date("ep3") is None
+
+    view.watch_episode("ep2", "2022-01-02")  # the date is replaced
+    assert [(episode.name, date) for episode, date in view.watched_episodes] == [("ep1", "2022-01-01"), ("ep2", "2022-01-02")]
+
+    view.unwatch_episode("ep1")
+    view.unwatch_episode("ep1")  # not recorded, nothing happens
+    assert [episode.name for episode, _ in view.watched_episodes] == ["ep2"]
+
+
+def test_watch_arguments(database):
+    view = database.get_anime("A").get_view("v")
+    with pytest.raises(AnDson.EpisodeRemovedError):
+        view.watch_episode("ep9", "2022-01-01")
+    with pytest.raises(AnDson.EpisodeRemovedError):
+        view.watch_episode(database.create_anime("B").create_episode("ep1"), "2022-01-01")
+    with pytest.raises(TypeError):
+        view.watch_episode(1, "2022-01-01")
+    with pytest.raises(TypeError):
+        view.watch_episode("ep1", 20220101)
+    with pytest.raises(AnDson.StringFormatError):
+        view.watch_episode("ep1", "2022/01/01")
+    with pytest.raises(AnDson.StringFormatError):
+        view.watch_episode("ep1", "2022-02-30")
+    assert view.watched_episodes == ()
+
+
+def test_episodes_per_day_and_binge_sessions(database):
+    anime = database.get_anime("A")
+    view = anime.get_view("v")
+    for name, date in (("ep1", "2022-01-01"), ("ep2", "2022-01-01"), ("ep3", "2022-01-02"), ("ep4", "2022-01-05"), ("ep5", "2022-01-05")):
+        view.watch_episode(name, date)
+    other = anime.create_view("w")
+    other.watch_episode("ep1", "2022-01-02")
+
+    assert view.episodes_per_day() == {"2022-01-01": 2, "2022-01-02": 1, "2022-01-05": 2}
+    assert database.episodes_per_day() == {"2022-01-01": 2, "2022-01-02": 2, "2022-01-05": 2}
+    assert view.binge_sessions(min_episodes=2) == (AnDson.BingeSession("2022-01-01", "2022-01-01", 2),
+                                                   AnDson.BingeSession("2022-01-05", "2022-01-05", 2))
+    assert view.binge_sessions(min_episodes=3, max_gap_days=1) == (AnDson.BingeSession("2022-01-01", "2022-01-02", 3),)
+    assert view.binge_sessions(min_episodes=5, max_gap_days=3) == (AnDson.BingeSession("2022-01-01", "2022-01-05", 5),)
+    assert [(found.title, session.episode_count) for found, session in database.binge_sessions(min_episodes=2)] == \
+        [("v", 2), ("v", 2)]
+
+
+def test_destroy_and_clear_remove_the_records(database):
+    anime = database.get_anime("A")
+    view = anime.get_view("v")
+    view.watch_episode("ep1", "2022-01-01")
+    view.watch_episode("ep2", "2022-01-02")
+    episode = anime.get_episode("ep1")
+    episode.destroy()
+    with pytest.raises(AnDson.EpisodeRemovedError):
+        episode.name
+    assert anime.get_episode("ep1") is None
+    assert [episode.name for episode, _ in view.watched_episodes] == ["ep2"]
+
+    anime.clear_episodes()
+    assert anime.get_all_episodes() == ()
+    assert view.watched_episodes == ()
+
+
+def test_destroy_through_a_wrapper_with_a_stale_catalog(database):
+    events = []
+    database.subscribe(lambda batch: events.extend(batch))
+    stale_anime = database.get_anime("A")
+    stale_anime.get_episode("ep1")  # builds the catalog of this wrapper
+    anime = database.get_anime("A")
+    new_episode = anime.create_episode("new")
+    anime.get_view("v").watch_episode(new_episode, "2022-01-01")
+
+    episode = [episode for episode in stale_anime.get_all_episodes() if episode.name == "new"][0]
+    episode.destroy()
+    assert database.get_anime("A").get_episode("new") is None
+    assert database.get_anime("A").get_view("v").watched_episodes == ()
+    assert events[-1].op == "destroy" and events[-1].path == (1, 6)
+
+
+def test_records_round_trip(database, tmp_path):
+    view = database.get_anime("A").get_view("v")
+    view.watch_episode("ep3", "2021-12-31")
+    view.watch_episode("ep1", "2022-01-01")
+    file_path = str(tmp_path / "db.json")
+    database.save_AnDson(file_path)
+    loaded = AnDson.Database(file_path, validate=True)
+    assert [(episode.name, date) for episode, date in loaded.get_anime("A").get_view("v").watched_episodes] == \
+        [("ep3", "2021-12-31"), ("ep1", "2022-01-01")]
+
+
+def test_load_file_saved_without_episodes(database, tmp_path):
+    file_path = str(tmp_path / "db.json")
+    database.save_AnDson(file_path)
+    with open(file_path) as file:
+        raw = json.load(file)
+    anime = raw["animes"]["_anime_objects"]["1"]
+    del anime["episodes"]
+    del anime["views"]["_view_objects"]["1"]["detailed_view_record"]
+    with open(file_path, "w") as file:
+        json.dump(raw, file)
+
+    loaded = AnDson.Database(file_path, validate=True)
+    anime = loaded.get_anime("A")
+    assert anime.get_all_episodes() == ()
+    assert anime.get_view("v").watched_episodes == ()
+    anime.create_episode("ep1")
+    anime.get_view("v").watch_episode("ep1", "2022-01-01")
+    assert anime.get_view("v").has_watched("ep1")
@@ -0,0 +1,58 @@
+import pytest
+
+import AnDson_personal_api as AnDson
+from AnDson_personal_api.database import _get_normalized_name_catalog
+
+
+@pytest.fixture
+def database():
+    database = AnDson.Database()
+    database.create_anime("Spy×Family", ("SxF",))
+    database.create_anime("Frieren", ("葬送のフリーレン",))
+    return database
+
+
+def _assert_catalog_matches_data(database):
+    catalog = _get_normalized_name_catalog(database._raw_dict, database._name_normalization)
+    assert database._normalized_name_catalog == catalog
+    assert database._name_collisions == {key for key, counts in catalog.items() if len(counts) > 1}
+
+
+def test_names_of_only_punctuation_or_whitespace(database):
+    database.get_anime("Frieren", normalized=True)  # loads the catalog
+    database.create_anime("!", ("?", " "))
+    database.create_anime("...")
+    assert database.name_collisions() == {}
+    assert database.get_anime("!", normalized=True).title == "!"  # the exact name is found first
+    assert database.get_anime("!!", normalized=True) is None
+    assert database.get_anime("", normalized=True) is None
+    database.get_anime("!").destory()
+    _assert_catalog_matches_data(database)
+
+
+def test_catalog_follows_the_mutators(database):
+    database.get_anime("sxf", normalized=True)  # loads the catalog
+    anime = database.get_anime("Frieren")
+    anime.aliases = ("SXF", "frieren 2")
+    assert [anime.title for anime in database.name_collisions()["sxf"]] == ["Spy×Family", "Frieren"]
+    with pytest.raises(AnDson.AmbiguousAnimeNameError):
+        database.get_anime("sxf", normalized=True)
+    _assert_catalog_matches_data(database)
+
+    anime.remove_alias("SXF")
+    assert database.name_collisions() == {}
+    assert database.get_anime("sxf", normalized=True).title == "Spy×Family"
+    assert database.get_anime("FRIEREN 2", normalized=True) == anime
+    _assert_catalog_matches_data(database)
+
+    anime.title = "Sousou no Frieren"
+    assert database.get_anime("frieren", normalized=True) is None
+    assert database.get_anime("sousou no frieren", normalized=True) == anime
+    _assert_catalog_matches_data(database)
+
+    anime.add_alias("spy × family")
+    assert list(database.name_collisions()) == ["spy×family"]
+    database.get_anime("Spy×Family").destory()
+    assert database.name_collisions() == {}
+    assert database.get_anime("SPY×FAMILY", normalized=True) == anime
+    _assert_catalog_matches_data(database)
@@ -0,0 +1,41 @@
+import pytest
+
+import AnDson_personal_api as AnDson
+
+
+@pytest.fixture
+def database():
+    database = AnDson.Database()
+    for title in ("d", "b", "f", "a", "e", "c"):
+        database.create_anime(title)
+    return database
+
+
+def _titles(page) -> list:
+    return [anime.title for anime in page.items]
+
+
+def test_pages_in_id_and_title_order(database):
+    page = database.page_animes(limit=4)
+    assert _titles(page) == ["d", "b", "f", "a"]
+    assert _titles(database.page_animes(after=page.next_cursor, limit=4)) == ["e", "c"]
+    assert database.page_animes(after=page.next_cursor, limit=4).next_cursor is None
+
+    page = database.page_animes(limit=4, order_by="title")
+    assert _titles(page) == ["a", "b", "c", "d"]
+    assert _titles(database.page_animes(after=page.next_cursor, order_by="title")) == ["e", "f"]
+
+
+def test_changes_between_pages_in_id_order(database):
+    page = database.page_animes(limit=3)
+    database.get_anime("a").title = "z"
+    database.get_anime("b").destory()
+    database.create_anime("g")
+    assert _titles(database.page_animes(after=page.next_cursor)) == ["z", "e", "c", "g"]
+
+
+def test_renames_between_pages_in_title_order(database):
+    page = database.page_animes(limit=3, order_by="title")  # a, b, c
+    database.get_anime("e").title = "0"  # moved before the cursor, it's skipped
+    database.get_anime("a").title = "x"  # moved after the cursor, it's returned again
+    assert _titles(database.page_animes(after=page.next_cursor, order_by="title")) == ["d", "f", "x"]
@@ -0,0 +1,52 @@
+import pytest
+
+import AnDson_personal_api as AnDson
+
+
+@pytest.fixture
+def anime():
+    anime = AnDson.Database().create_anime("A", ("a",), ("action", "comedy"))
+    anime.create_view("v", episode_range=("ep1",), duration=("2022-01",))
+    return anime
+
+
+def test_is_a_view_of_the_stored_list(anime):
+    tags = anime.tags
+    anime.add_tag("drama")
+    assert tags == ("action", "comedy", "drama")
+    assert "drama" in tags and "horror" not in tags and [] not in tags
+    assert tags[1:] == ("comedy", "drama")
+    assert tags.to_tuple() == ("action", "comedy", "drama")
+    with pytest.raises(TypeError):
+        tags[0] = "horror"
+
+
+def test_concatenation_returns_tuples(anime):
+    assert anime.tags + ("drama",) == ("action", "comedy", "drama")
+    assert isinstance(anime.tags + ("drama",), tuple)
+    assert ("drama",) + anime.tags == ("drama", "action", "comedy")
+    assert isinstance(("drama",) + anime.tags, tuple)
+    assert anime.tags + anime.aliases == ("action", "comedy", "a")
+    with pytest.raises(TypeError):
+        anime.tags + ["drama"]
+
+
+def test_is_accepted_where_a_tuple_is(anime):
+    anime.tags = anime.tags + ("drama",)
+    anime.tags = anime.tags
+    assert anime.tags == ("action", "comedy", "drama")
+    assert anime._database._tag_catalog["drama"] == {1: 1}
+    anime.aliases = anime.aliases + ("b",)
+    assert sorted(anime.aliases) == ["a", "b"]
+
+    view = anime.get_view("v")
+    view.episode_range = view.episode_range + ("ep2",)
+    view.duration = view.duration
+    view.add_review("r", episode_range=view.episode_range)
+    other = anime._database.create_anime("B", (), anime.tags)
+    assert other.tags == anime.tags
+    anime.add_tag("horror")
+    assert "horror" not in other.tags  # the list is copied, not shared
+    assert view.episode_range == ("ep1", "ep2") and view.get_review("r").episode_range == ("ep1", "ep2")
+    with pytest.raises(TypeError, match="tags must be a tuple of strings"):
+        anime.tags = ["action"]
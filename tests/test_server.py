@@ -0,0 +1,96 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+import AnDson_personal_api as AnDson
+
+
+@pytest.fixture
+def database():
+    database = AnDson.Database()
+    anime = database.create_anime("Spy×Family", ("SxF",), ("comedy",))
+    anime.create_view("first", times_view=1).add_review("r1", ranking=8)
+    database.create_anime("Frieren", (), ("fantasy",))
+    return database
+
+
+@pytest.fixture
+def server(database):
+    server = AnDson.make_server(database, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def _get(server, target:str, headers:dict|None=None) -> tuple[int, dict, bytes]:
+    host, port = server.server_address[:2]
+    connection = http.client.HTTPConnection(host, port, timeout=5)
+    try:
+        connection.request("GET", target, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def test_get_anime_and_view(server):
+    status, headers, body = _get(server, "/animes/SxF")
+    assert status == 200
+    assert headers["Content-Type"] == "application/json; charset=utf-8"
+    assert json.loads(body)["title"] == "Spy×Family"
+
+    status, _, body = _get(server, "/animes/spy%20%C3%97%20family/views/first/reviews/r1")  # normalized name
+    assert status == 200
+    assert json.loads(body)["ranking"] == 8
+
+    status, _, body = _get(server, "/animes?limit=1&order_by=title")
+    assert status == 200
+    assert json.loads(body) == {"items": ["Frieren"], "next_cursor": ["Frieren", 2]}
+
+
+def test_etag_and_not_modified(server, database):
+    status, headers, body = _get(server, "/animes/Frieren")
+    etag = headers["ETag"]
+    status, headers, body = _get(server, "/animes/Frieren", {"If-None-Match": etag})
+    assert status == 304
+    assert body == b""
+    assert server.stats["not_modified"] == 1
+
+    # a change of another anime gives the same body, so the same etag
+    database.get_anime("SxF").add_tag("action")
+    status, headers, _ = _get(server, "/animes/Frieren", {"If-None-Match": etag})
+    assert status == 304
+
+    database.get_anime("Frieren").add_tag("adventure")
+    status, headers, body = _get(server, "/animes/Frieren", {"If-None-Match": etag})
+    assert status == 200
+    assert headers["ETag"] != etag
+    assert json.loads(body)["tags"] == ["fantasy", "adventure"]
+
+
+def test_cached_response(server):
+    _get(server, "/stats/activity")
+    _get(server, "/stats/activity")
+    assert server.stats["cache_hits"] == 1
+
+
+@pytest.mark.parametrize("target", ["/animes?limit=x", "/animes?limit=0", "/animes?order_by=rating",
+                                    "/animes/Frieren/similar?k=0", "/stats/activity?granularity=day"])
+def test_bad_request(server, target):
+    status, headers, body = _get(server, target)
+    assert status == 400
+    assert "ETag" not in headers
+    assert "error" in json.loads(body)
+
+
+@pytest.mark.parametrize("target", ["/animes/Unknown", "/animes/SxF/views/second", "/animes/SxF/views/first/reviews/r2",
+                                    "/nothing"])
+def test_not_found(server, target):
+    status, _, body = _get(server, target)
+    assert status == 404
+    assert "error" in json.loads(body)
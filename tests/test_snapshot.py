@@ -0,0 +1,102 @@
+import gc
+
+import pytest
+
+import AnDson_personal_api as AnDson
+
+
+@pytest.fixture
+def database():
+    database = AnDson.Database()
+    anime = database.create_anime("A", ("a",), ("action",))
+    view = anime.create_view("first", duration=("2020-01",))
+    view.add_review("r1", ranking=7)
+    anime.create_episode("ep1")
+    database.create_anime("B", (), ("drama",))
+    return database
+
+
+def test_snapshot_does_not_see_later_changes(database):
+    snapshot = database.snapshot()
+    anime = database.get_anime("A")
+    view = anime.get_view("first")
+    view.times_view = 3
+    view.get_review("r1").comment = "changed"
+    anime.add_tag("comedy")
+    database.create_anime("C")
+
+    old_anime = snapshot.get_anime("A")
+    old_view = old_anime.get_view("first")
+    assert old_view.times_view is None
+    assert old_view.get_review("r1").comment is None
+    assert old_anime.tags == ("action",)
+    assert snapshot.get_anime("C") is None
+
+    assert view.times_view == 3
+    assert anime.tags == ("action", "comedy")
+
+
+def test_cached_wrappers_follow_copy_on_write(database):
+    # wrappers created before the snapshot must see the copy made for the database, not the preserved object
+    anime = database.get_anime("A")
+    view = anime.get_view("first")
+    review = view.get_review("r1")
+    episode = anime.get_episode("ep1")
+    old_view = database.snapshot().get_anime("A").get_view("first")
+    assert old_view.title == "first"  # caches the shared node in the snapshot wrapper
+
+    view.times_view = 2
+    review.ranking = 9
+    episode.type = "OVA"
+    assert view.times_view == 2
+    assert review.ranking == 9
+    assert episode.type == "OVA"
+    assert database.get_anime("A").get_view("first").times_view == 2
+    assert old_view.times_view is None
+    assert old_view.get_review("r1").ranking == 7
+
+
+def test_destroyed_anime_is_kept_by_snapshot(database):
+    snapshot = database.snapshot()
+    anime_object = database._raw_dict["animes"]["_anime_objects"][1]
+    database.get_anime("A").destory()
+
+    assert database.get_anime("A") is None
+    old_anime = snapshot.get_anime("A")
+    assert old_anime is not None
+    assert snapshot._preserved[1] is anime_object  # moved, not copied
+    assert old_anime.get_view("first").get_review("r1").ranking == 7
+
+
+def test_snapshot_is_read_only(database):
+    snapshot = database.snapshot()
+    with pytest.raises(AnDson.ReadOnlyDatabaseError):
+        snapshot.get_anime("A").add_tag("x")
+    with pytest.raises(AnDson.ReadOnlyDatabaseError):
+        snapshot.create_anime("D")
+
+
+def test_clear_anime_keeps_snapshot(database):
+    snapshot = database.snapshot()
+    database.clear_anime()
+    assert database.get_all_animes() == ()
+    assert [anime.title for anime in snapshot.get_all_animes()] == ["A", "B"]
+
+
+def test_dropped_snapshot_is_released_without_gc(database):
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        snapshot = database.snapshot()
+        anime = snapshot.get_anime("A")
+        anime.get_view("first").get_review("r1").ranking
+        snapshot.get_all_animes()
+        snapshot.page_animes(order_by="title")
+        snapshot.activity_timeseries()
+        del snapshot, anime
+        assert len(database._snapshots) == 0
+        database.get_anime("A").add_tag("comedy")
+        assert database._anime_generations == {}  # nothing was copied
+    finally:
+        if gc_was_enabled:
+            gc.enable()
@@ -0,0 +1,112 @@
+import json
+
+import pytest
+
+import AnDson_personal_api as AnDson
+
+
+def _save(database, tmp_path, edit) -> str:
+    # saves the database, then changes the json of the file with edit(raw json dict)
+    file_path = str(tmp_path / "db.json")
+    database.save_AnDson(file_path)
+    with open(file_path) as file:
+        raw = json.load(file)
+    edit(raw)
+    with open(file_path, "w") as file:
+        json.dump(raw, file)
+    return file_path
+
+
+@pytest.fixture
+def database():
+    database = AnDson.Database()
+    anime = database.create_anime("A")
+    anime.create_episode("ep1", minutes=24)
+    anime.create_view("v").add_review("r")
+    return database
+
+
+def test_valid_file_round_trips(database, tmp_path):
+    file_path = _save(database, tmp_path, lambda raw: None)
+    loaded = AnDson.Database(file_path, validate=True)
+    assert loaded.validate() == []
+
+
+def test_missing_fields_are_reported(database, tmp_path):
+    def edit(raw):
+        anime = raw["animes"]["_anime_objects"]["1"]
+        del anime["views"]["_view_objects"]["1"]["source"]
+        del anime["views"]["_view_objects"]["1"]["reviews"]["_review_objects"]["1"]["comment"]
+        del anime["episodes"]["_episode_objects"]["1"]["type"]
+
+    file_path = _save(database, tmp_path, edit)
+    with pytest.raises(AnDson.InvalidDatabaseError) as error:
+        AnDson.Database(file_path, validate=True)
+    assert sorted(error.value.errors) == ["animes/1/episodes/1: missing field 'type'.",
+                                          "animes/1/views/1/reviews/1: missing field 'comment'.",
+                                          "animes/1/views/1: missing field 'source'."]
+
+
+def test_missing_field_is_read_as_none_and_not_saved(database, tmp_path):
+    def edit(raw):
+        del raw["animes"]["_anime_objects"]["1"]["views"]["_view_objects"]["1"]["source"]
+
+    loaded = AnDson.Database(_save(database, tmp_path, edit))
+    assert loaded.get_anime("A").get_view("v").source is None
+    resaved = str(tmp_path / "resaved.json")
+    loaded.save_AnDson(resaved)
+    with open(resaved) as file:
+        assert "source" not in json.load(file)["animes"]["_anime_objects"]["1"]["views"]["_view_objects"]["1"]
+
+
+def test_set_missing_field_is_saved(database, tmp_path):
+    def edit(raw):
+        del raw["animes"]["_anime_objects"]["1"]["views"]["_view_objects"]["1"]["source"]
+
+    loaded = AnDson.Database(_save(database, tmp_path, edit))
+    loaded.get_anime("A").get_view("v").source = "tv"
+    assert loaded.validate() == []
+    loaded.save_AnDson(str(tmp_path / "resaved.json"))
+    assert AnDson.Database(str(tmp_path / "resaved.json")).get_anime("A").get_view("v").source == "tv"
+
+
+def test_unknown_fields_are_kept_and_reported(database, tmp_path):
+    def edit(raw):
+        raw["animes"]["_anime_objects"]["1"]["views"]["_view_objects"]["1"]["rating"] = 5
+        raw["animes"]["_anime_objects"]["1"]["episodes"]["_episode_objects"]["1"]["aired"] = "2022-01-01"
+
+    loaded = AnDson.Database(_save(database, tmp_path, edit))
+    anime = loaded.get_anime("A")
+    assert anime.get_view("v").title == "v" and anime.get_episode("ep1").minutes == 24
+    assert sorted(loaded.validate()) == ["animes/1/episodes/1: unknown field 'aired'.", "animes/1/views/1: unknown field 'rating'."]
+    resaved = str(tmp_path / "resaved.json")
+    loaded.save_AnDson(resaved)
+    with open(resaved) as file:
+        anime = json.load(file)["animes"]["_anime_objects"]["1"]
+    assert anime["views"]["_view_objects"]["1"]["rating"] == 5
+    assert anime["episodes"]["_episode_objects"]["1"]["aired"] == "2022-01-01"
+
+
+def test_argument_messages():
+    anime = AnDson.Database().create_anime("A")
+    with pytest.raises(TypeError, match="aliases must be a tuple of strings"):
+        anime.aliases = (1,)
+    with pytest.raises(TypeError, match="times_view must be a integer or None"):
+        anime.create_view("v", times_view="1")
+
+
+def test_scalar_arguments():
+    view = AnDson.Database().create_anime("A").create_view("v")
+    review = view.add_review("r", ranking=10)
+    review.ranking = None
+    with pytest.raises(AnDson.NotAvailableRankingError, match="ranking must be a integer between 0 and 10"):
+        review.ranking = 11
+    with pytest.raises(TypeError, match="ranking must be a integer between 0 and 10"):
+        review.ranking = "1"
+    with pytest.raises(TypeError, match="title must be a string"):
+        view.title = None
+    with pytest.raises(AnDson.StringFormatError):
+        view.last_episode_date = "2022-1-1"
+    view.is_new = None
+    view.last_episode_date = "2022-01-01"
+    assert (view.is_new, view.last_episode_date, review.ranking) == (None, "2022-01-01", None)